@@ -0,0 +1,99 @@
+import threading
+import uuid
+
+from django.conf import settings
+
+
+class LocalBuffer:
+    """
+    Process-local coalescing buffer.
+
+    Used when no Redis instance is configured (local development and tests).
+    Entries only survive as long as the process that recorded them, so it is
+    not suitable for a setup where web and worker processes are separate.
+    """
+
+    _buffers = {}
+    _lock = threading.Lock()
+
+    def __init__(self, name):
+        self.name = name
+        with self._lock:
+            self._entries = self._buffers.setdefault(name, {})
+
+    def add_many(self, entries, overwrite=True):
+        with self._lock:
+            for key, value in entries.items():
+                if overwrite or str(key) not in self._entries:
+                    self._entries[str(key)] = str(value)
+
+    def drain(self):
+        with self._lock:
+            entries = dict(self._entries)
+            self._entries.clear()
+        return entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBuffer:
+    """
+    Coalescing buffer stored in a Redis hash, shared by every process.
+    """
+
+    def __init__(self, name, url):
+        import redis
+
+        self.name = name
+        self.key = f'buffer:{name}'
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.response_error = redis.ResponseError
+
+    def add_many(self, entries, overwrite=True):
+        if not entries:
+            return
+        if overwrite:
+            self.client.hset(self.key, mapping={str(key): str(value) for key, value in entries.items()})
+            return
+
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in entries.items():
+            pipeline.hsetnx(self.key, str(key), str(value))
+        pipeline.execute()
+
+    def drain(self):
+        # Renaming is atomic: entries recorded while we read end up in a fresh hash.
+        draining_key = f'{self.key}:draining:{uuid.uuid4().hex}'
+        try:
+            self.client.rename(self.key, draining_key)
+        except self.response_error as e:
+            if 'no such key' in str(e).lower():
+                return {}
+            raise
+
+        pipeline = self.client.pipeline()
+        pipeline.hgetall(draining_key)
+        pipeline.delete(draining_key)
+        entries, _ = pipeline.execute()
+        return entries
+
+    def __len__(self):
+        return self.client.hlen(self.key)
+
+
+def get_buffer(name):
+    """
+    Return the coalescing buffer called `name`.
+
+    A buffer maps keys to values; recording a key that is already buffered
+    replaces its value instead of adding a second entry, so a burst of writes
+    to the same row collapses into one entry. `drain()` atomically takes every
+    entry out of the buffer so a worker can process them in one batch.
+
+    The buffer lives in Redis when `REDIS_URL` is set, otherwise in memory.
+    """
+    url = getattr(settings, 'REDIS_URL', None)
+    if url:
+        return RedisBuffer(name, url)
+    return LocalBuffer(name)
@@ -0,0 +1,232 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from drf_yasg import openapi
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+FIELDS_PARAMETER = openapi.Parameter(
+    FIELDS_QUERY_PARAM, openapi.IN_QUERY,
+    description="Comma separated fields to return, dotted for nested ones (e.g. `id,title,startup.company_name`)",
+    type=openapi.TYPE_STRING
+)
+EXPAND_PARAMETER = openapi.Parameter(
+    EXPAND_QUERY_PARAM, openapi.IN_QUERY,
+    description="Comma separated nested objects to render (e.g. `startup,startup.industries`), "
+                "the others are returned as IDs",
+    type=openapi.TYPE_STRING
+)
+
+
+def parse_shape(value):
+    """
+    Parse a `?fields=` / `?expand=` value into a tree of names.
+
+    `id,title,startup.company_name` becomes
+    `{'id': {}, 'title': {}, 'startup': {'company_name': {}}}`. A missing
+    parameter gives None, meaning "everything".
+    """
+    if value is None:
+        return None
+
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, path.strip().split('.')):
+            node = node.setdefault(name, {})
+    return tree
+
+
+class DynamicFieldsMixin:
+    """
+    Lets clients choose the shape of a response.
+
+    - `?fields=id,title,startup.company_name` keeps only the listed fields;
+      dotted names select fields of nested serializers. Naming a nested
+      field without sub-fields keeps all of them.
+    - `?expand=startup,startup.industries` lists the nested serializers to
+      render as objects; the others are reduced to their primary keys.
+      Without `expand`, every nested serializer is rendered as before.
+
+    The shape is read from the request in the serializer context by the root
+    serializer and handed down to the nested ones. Pair it with
+    `optimize_queryset` so the query loads only what the shape needs.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        shape = self.get_shape()
+        if shape is None:
+            return fields
+        only, expand = shape
+
+        if only is not None:
+            fields = {name: field for name, field in fields.items() if name in only}
+
+        for name, field in list(fields.items()):
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if not isinstance(nested, serializers.BaseSerializer):
+                continue
+
+            if expand is not None and name not in expand:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    source=field.source if field.source != name else None,
+                    many=isinstance(field, serializers.ListSerializer),
+                    read_only=True,
+                )
+                continue
+
+            nested._shape = (
+                (only[name] or None) if only is not None else None,
+                expand[name] if expand is not None else None,
+            )
+        return fields
+
+    def get_shape(self):
+        """
+        Return the `(fields, expand)` trees applying to this serializer, or
+        None to render every field.
+        """
+        if hasattr(self, '_shape'):
+            return self._shape
+
+        root = self.parent if isinstance(self.parent, serializers.ListSerializer) else self
+        if root.parent is not None:
+            # Nested in a serializer that does not shape its children.
+            return None
+
+        request = self.context.get('request')
+        if request is None:
+            return None
+
+        only = parse_shape(request.query_params.get(FIELDS_QUERY_PARAM))
+        expand = parse_shape(request.query_params.get(EXPAND_QUERY_PARAM))
+        if only is None and expand is None:
+            return None
+        return only, expand
+
+
+def optimize_queryset(queryset, serializer, include=()):
+    """
+    Add the `only()`, `select_related()` and `prefetch_related()` calls
+    needed to render `serializer` for every row of `queryset`. `include`
+    lists columns to load on top of the serialized ones, e.g. the ordering
+    of a cursor paginator.
+
+    Forward foreign keys rendered by nested serializers are joined, to-many
+    relations are prefetched (with their own optimized querysets), and the
+    columns are restricted to the fields the serializer reads. When a
+    serializer reads anything that is not a model field (a method field, a
+    property), all the columns of that model are loaded.
+    """
+    columns = []
+    select_related = []
+    prefetches = []
+    _walk(serializer, queryset.model, '', columns, select_related, prefetches)
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only(*columns, *include)
+
+
+def _walk(serializer, model, prefix, columns, select_related, prefetches):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    needed = {model._meta.pk.name}
+    complete = True
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            complete = False
+            continue
+
+        attrs = field.source.split('.')
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            complete = False
+            continue
+
+        if not model_field.is_relation:
+            needed.add(model_field.name)
+            continue
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        related_model = model_field.related_model
+
+        if model_field.many_to_many or model_field.one_to_many:
+            # To-many relations get their own query, optimized the same way.
+            lookup = f'{prefix}{model_field.name}'
+            if isinstance(nested, serializers.BaseSerializer):
+                prefetches.append(
+                    Prefetch(lookup, queryset=_optimize_prefetch(related_model._default_manager.all(), nested))
+                )
+            else:
+                prefetches.append(lookup)
+            continue
+
+        if model_field.concrete:
+            needed.add(model_field.name)
+
+        if isinstance(nested, serializers.BaseSerializer) and len(attrs) == 1:
+            select_related.append(f'{prefix}{model_field.name}')
+            _walk(nested, related_model, f'{prefix}{model_field.name}__', columns, select_related, prefetches)
+        elif len(attrs) > 1:
+            if not _walk_source(attrs, model, prefix, columns, select_related):
+                complete = False
+
+    if complete:
+        columns.extend(f'{prefix}{name}' for name in needed)
+    else:
+        columns.extend(f'{prefix}{field.name}' for field in model._meta.concrete_fields)
+
+
+def _walk_source(attrs, model, prefix, columns, select_related):
+    """
+    Join the forward relations of a dotted `source` such as
+    `startup.company_name`. Returns False if it does not follow model fields.
+    """
+    path = prefix
+    for attr in attrs[:-1]:
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return False
+        if not model_field.is_relation or not model_field.concrete or model_field.many_to_many:
+            return False
+        path = f'{path}{attr}'
+        columns.append(path)
+        select_related.append(path)
+        model = model_field.related_model
+        path = f'{path}__'
+
+    try:
+        model._meta.get_field(attrs[-1])
+    except FieldDoesNotExist:
+        columns.extend(f'{path}{field.name}' for field in model._meta.concrete_fields)
+    else:
+        columns.extend([f'{path}{model._meta.pk.name}', f'{path}{attrs[-1]}'])
+    return True
+
+
+def _optimize_prefetch(queryset, serializer):
+    """
+    Optimize a prefetched queryset. Its columns are not restricted, since the
+    relation needs the keys back to the parent rows.
+    """
+    select_related = []
+    prefetches = []
+    _walk(serializer, queryset.model, '', [], select_related, prefetches)
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset
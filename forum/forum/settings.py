@@ -52,6 +52,40 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_TASK_DEFAULT_RETRY_DELAY = 60
 CELERY_TASK_MAX_RETRIES = 3
 
+CELERY_BEAT_SCHEDULE = {
+    # Safety net behind the signal-driven search indexer
+    "sync-project-index": {
+        "task": "projects.tasks.sync_project_index",
+        "schedule": 60.0,
+    },
+    # Safety net behind the delayed flushes of recorded startup views
+    "flush-viewed-startups": {
+        "task": "investors.tasks.flush_viewed_startups",
+        "schedule": 60.0,
+    },
+    # Full recomputation behind the incremental recommendation refreshes
+    "rebuild-recommendations": {
+        "task": "investors.tasks.rebuild_recommendations",
+        "schedule": 24 * 60 * 60.0,
+    },
+    "build-startup-neighbors": {
+        "task": "startups.tasks.build_startup_neighbors",
+        "schedule": 24 * 60 * 60.0,
+    },
+}
+
+# Redis instance shared by web and worker processes (write buffers, cache)
+REDIS_URL = os.environ.get("REDIS_URL")
+
+# Shared cache when Redis is available, per-process memory otherwise
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
 # Logging settings
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -147,6 +181,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'users.middleware.RoleProfileMiddleware',
 ]
 
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
@@ -387,3 +422,93 @@ ELASTICSEARCH_DSL = {
         'http_auth': None,
     }
 }
+
+# Project search backends (see projects.backends). The fallback answers while the
+# primary one times out or is unreachable; the primary is then skipped for
+# SEARCH_BACKEND_COOLDOWN seconds.
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'projects.backends.ElasticsearchSearchBackend')
+SEARCH_FALLBACK_BACKEND = 'projects.backends.DatabaseSearchBackend'
+SEARCH_BACKEND_TIMEOUT = 2
+SEARCH_BACKEND_COOLDOWN = 30
+
+# Serve project search results straight from the Elasticsearch `_source`
+# instead of re-reading the matching rows from Postgres.
+PROJECT_SEARCH_SOURCE_ONLY = True
+
+# Bucket width of the funding goal facet returned by project search.
+PROJECT_SEARCH_FUNDING_GOAL_INTERVAL = 50000
+
+# Ranking profiles of the project search, selected with `?ranking=`. Each one
+# wraps the text relevance in an Elasticsearch function_score (see
+# projects.ranking); an empty profile ranks on relevance alone.
+PROJECT_SEARCH_RANKING_PROFILES = {
+    'relevance': {},
+    'balanced': {
+        'recency': {'scale': '30d', 'offset': '7d', 'decay': 0.5, 'weight': 1},
+        'seeking_funding': {'weight': 1},
+        'remaining_funding': {'scale': 50, 'decay': 0.5, 'weight': 0.5},
+    },
+    'newest': {
+        'recency': {'scale': '7d', 'decay': 0.5, 'weight': 3},
+        'seeking_funding': {'weight': 0.5},
+    },
+}
+PROJECT_SEARCH_DEFAULT_RANKING = 'balanced'
+
+# Number of projects returned by the related projects endpoint, and how long
+# they are cached at most (the cache is dropped when the project is reindexed).
+PROJECT_RELATED_SIZE = 10
+PROJECT_RELATED_CACHE_TIMEOUT = 60 * 60
+
+# Subscriptions aborted by a serialization failure or a deadlock are retried
+# this many times, waiting up to SUBSCRIPTION_RETRY_BACKOFF * 2 ** attempt
+# seconds in between. Throughput metrics cover the last window of seconds.
+SUBSCRIPTION_MAX_RETRIES = 5
+SUBSCRIPTION_RETRY_BACKOFF = 0.02
+SUBSCRIPTION_METRICS_WINDOW = 300
+# Most items a bulk subscription request may carry.
+SUBSCRIPTION_BULK_MAX_ITEMS = 100
+
+# Users authenticated by JWT are cached for this many seconds, in each process
+# (keeping at most AUTH_USER_CACHE_SIZE of them) and in the shared cache.
+# Changes to a user or their profiles drop the cached copies. The cache needs
+# Redis: per-process caches could not tell the other processes about a ban or a
+# role change, so it is disabled without REDIS_URL.
+AUTH_USER_CACHE_ENABLED = bool(REDIS_URL)
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
+AUTH_USER_CACHE_SIZE = 1000
+
+# Investor portfolio summary: holdings listed, and how long it is cached at most
+# (the cache is dropped when the investor's subscriptions or saves change).
+INVESTOR_PORTFOLIO_TOP_HOLDINGS = 5
+INVESTOR_PORTFOLIO_CACHE_TIMEOUT = 5 * 60
+
+# Startup views are buffered and written to the database in bulk: as soon as
+# this many views are pending, or after this many seconds otherwise.
+VIEWED_STARTUPS_BATCH_SIZE = 1000
+VIEWED_STARTUPS_FLUSH_INTERVAL = 5
+# Views kept per user; older ones are trimmed when the buffer is flushed.
+VIEWED_STARTUPS_HISTORY_SIZE = 50
+
+# Investor recommendations: startups kept per investor, weight of each signal
+# in the score, seconds changes are batched before the affected investors are
+# recomputed, and investors scored per matrix product.
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_WEIGHTS = {'preferences': 1.0, 'saved': 0.5, 'viewed': 0.25}
+RECOMMENDATIONS_REFRESH_INTERVAL = 30
+RECOMMENDATIONS_BATCH_SIZE = 500
+
+# "Investors who viewed this also viewed": neighbors kept per startup, users
+# whose interactions are loaded at a time, and weight of views and saves.
+STARTUP_NEIGHBORS_SIZE = 10
+STARTUP_NEIGHBORS_CHUNK_USERS = 5000
+STARTUP_NEIGHBORS_WEIGHTS = {'viewed': 1.0, 'saved': 2.0}
+
+# Search document changes are buffered and flushed to Elasticsearch in bulk: as
+# soon as this many documents are pending, or after this many seconds otherwise.
+SEARCH_INDEX_BATCH_SIZE = 500
+SEARCH_INDEX_FLUSH_INTERVAL = 2
+
+# The incremental search index sync re-reads rows updated up to this many
+# seconds before its watermark, to catch transactions that committed late.
+SEARCH_SYNC_OVERLAP = 300
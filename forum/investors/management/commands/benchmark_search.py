@@ -0,0 +1,257 @@
+import json
+import math
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.db.models import Max, Min
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from projects.models import Project
+from projects.viewsets import ProjectSearchView
+from users.models import User
+
+BACKENDS = {
+    'elasticsearch': 'projects.backends.ElasticsearchSearchBackend',
+    'database': 'projects.backends.DatabaseSearchBackend',
+}
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of `values`.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'mean': statistics.fmean(values),
+        'max': max(values),
+    }
+
+
+def misspell(word):
+    """
+    Swap two adjacent letters, the typo the fuzzy search is meant to absorb.
+    """
+    if len(word) < 4:
+        return word
+    position = random.randrange(1, len(word) - 2)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+
+def sample_projects(size, attempts=10):
+    """
+    Up to `size` random projects (`id` and `title`), picked by drawing random
+    ids within the id range: `ORDER BY random()` would sort the whole table.
+    """
+    bounds = Project.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return []
+
+    sampled = {}
+    for _ in range(attempts):
+        ids = {random.randint(bounds['low'], bounds['high']) for _ in range(size * 2)}
+        sampled.update(Project.objects.filter(id__in=ids).values_list('id', 'title'))
+        if len(sampled) >= size:
+            break
+
+    # Sorted first so a given --random-seed always yields the same sample.
+    projects = [{'id': pk, 'title': title} for pk, title in sorted(sampled.items())]
+    random.shuffle(projects)
+    return projects[:size]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark project search: replay a query mix against ProjectSearchView and report '
+        'latency percentiles, backend vs Django time, queries per request and hit rate'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', default='elasticsearch',
+                            help=f"Search backend to measure: {', '.join(BACKENDS)} or a dotted path")
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Seed this many projects with populate_db before running')
+        parser.add_argument('--queries', default=None,
+                            help='JSON lines file of recorded queries to replay')
+        parser.add_argument('--save-queries', default=None,
+                            help='Write the generated query mix to this JSON lines file for later replays')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Number of measured requests')
+        parser.add_argument('--warmup', type=int, default=20,
+                            help='Number of unmeasured requests sent first')
+        parser.add_argument('--random-seed', type=int, default=42,
+                            help='Seed of the generated query mix')
+        parser.add_argument('--output', default=None,
+                            help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        random.seed(options['random_seed'])
+        backend = BACKENDS.get(options['backend'], options['backend'])
+
+        if options['seed']:
+            call_command('populate_db', users=max(options['seed'] // 100, 10), projects=options['seed'],
+                         stdout=self.stdout)
+
+        if not Project.objects.exists():
+            raise CommandError("There are no projects to search, use --seed to create some")
+
+        if options['queries']:
+            with open(options['queries']) as queries_file:
+                queries = [json.loads(line) for line in queries_file if line.strip()]
+        else:
+            queries = self.generate_queries(options['requests'])
+            if options['save_queries']:
+                with open(options['save_queries'], 'w') as queries_file:
+                    queries_file.writelines(json.dumps(query) + '\n' for query in queries)
+
+        # Measure a single backend: no failover to another one.
+        with override_settings(SEARCH_BACKEND=backend, SEARCH_FALLBACK_BACKEND=None):
+            for query in queries[:options['warmup']]:
+                self.run_query(query)
+            samples = [self.run_query(queries[index % len(queries)]) for index in range(options['requests'])]
+
+        results = self.report(samples, backend)
+        self.print_report(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def generate_queries(self, count):
+        """
+        Build a query mix from the indexed data: misspelled project titles
+        (with the title expected among the hits), status filters, empty
+        queries and faceted searches.
+        """
+        projects = sample_projects(max(count // 2, 1))
+        statuses = [choice for choice, _ in Project.STATUS_CHOICES]
+
+        # Seeded titles repeat: a hit is any project with the searched title,
+        # so each distinct title is measured once.
+        titles = list(dict.fromkeys(project['title'] for project in projects))
+
+        queries = []
+        for index in range(count):
+            kind = index % 5
+            if kind in (0, 1):
+                title = titles[index % len(titles)]
+                words = title.rstrip('.').split()
+                text = ' '.join(misspell(word) if position == 0 else word for position, word in enumerate(words))
+                queries.append({
+                    'scenario': 'fuzzy_text',
+                    'params': {'q': text},
+                    'expected_title': title,
+                })
+            elif kind == 2:
+                queries.append({'scenario': 'status_filter', 'params': {'status': random.choice(statuses)}})
+            elif kind == 3:
+                queries.append({'scenario': 'empty_query', 'params': {}})
+            else:
+                word = random.choice(titles).split()[0]
+                queries.append({'scenario': 'faceted_text', 'params': {'q': word, 'facets': 'true'}})
+        return queries
+
+    def run_query(self, query):
+        """
+        Send one request through the view and collect its timings.
+        """
+        view = ProjectSearchView.as_view()
+        request = APIRequestFactory().get('/api/projects/search/', query.get('params', {}))
+        force_authenticate(request, user=User(email='benchmark@example.com'))
+
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = view(request)
+            response.render()
+            latency = (time.perf_counter() - start) * 1000
+
+        sample = {
+            'scenario': query.get('scenario', 'recorded'),
+            'status': response.status_code,
+            'latency_ms': latency,
+            'queries': len(captured.captured_queries),
+            'db_ms': sum(float(captured_query['time']) for captured_query in captured.captured_queries) * 1000,
+            'es_took_ms': None,
+            'hit': None,
+        }
+
+        paginator = response.renderer_context['view'].paginator
+        es_response = getattr(paginator, 'response', None)
+        if es_response is not None:
+            sample['es_took_ms'] = es_response.took
+
+        if response.status_code == 200 and query.get('expected_title'):
+            sample['hit'] = any(result['title'] == query['expected_title'] for result in response.data['results'])
+        return sample
+
+    def report(self, samples, backend):
+        by_scenario = defaultdict(list)
+        for sample in samples:
+            by_scenario[sample['scenario']].append(sample)
+
+        return {
+            'backend': backend,
+            'projects': Project.objects.count(),
+            'requests': len(samples),
+            'timestamp': timezone.now().isoformat(),
+            'overall': self.summarize_samples(samples),
+            'scenarios': {
+                scenario: self.summarize_samples(scenario_samples)
+                for scenario, scenario_samples in sorted(by_scenario.items())
+            },
+        }
+
+    def summarize_samples(self, samples):
+        ok = [sample for sample in samples if sample['status'] == 200]
+
+        # Time spent waiting on the search engine, the rest is Django.
+        backend_ms = [
+            sample['es_took_ms'] if sample['es_took_ms'] is not None else sample['db_ms']
+            for sample in ok
+        ]
+        django_ms = [sample['latency_ms'] - spent for sample, spent in zip(ok, backend_ms)]
+        hits = [sample['hit'] for sample in ok if sample['hit'] is not None]
+
+        return {
+            'requests': len(samples),
+            'errors': len(samples) - len(ok),
+            'latency_ms': summarize([sample['latency_ms'] for sample in ok]),
+            'backend_ms': summarize(backend_ms),
+            'django_ms': summarize(django_ms),
+            'queries_per_request': summarize([sample['queries'] for sample in ok]),
+            'hit_rate': sum(hits) / len(hits) if hits else None,
+        }
+
+    def print_report(self, results):
+        self.stdout.write(f"Backend {results['backend']}, {results['projects']} projects, "
+                          f"{results['requests']} requests")
+        for name, summary in [('overall', results['overall']), *results['scenarios'].items()]:
+            latency = summary['latency_ms']
+            if latency is None:
+                self.stdout.write(self.style.ERROR(f"{name}: all {summary['requests']} requests failed"))
+                continue
+            line = (
+                f"{name}: p50 {latency['p50']:.1f}ms p95 {latency['p95']:.1f}ms p99 {latency['p99']:.1f}ms, "
+                f"backend p50 {summary['backend_ms']['p50']:.1f}ms, django p50 {summary['django_ms']['p50']:.1f}ms, "
+                f"{summary['queries_per_request']['mean']:.1f} queries/request, {summary['errors']} errors"
+            )
+            if summary['hit_rate'] is not None:
+                line += f", hit rate {summary['hit_rate']:.0%}"
+            self.stdout.write(line)
@@ -1,28 +1,191 @@
-from django.core.management import BaseCommand
-from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from projects.models import Project
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connections as db_connections
+from django.db.models import Max, Min
+from django.utils import timezone
+from elasticsearch.helpers import parallel_bulk
+from elasticsearch_dsl.connections import connections as es_connections
+
+from projects.documents import ProjectDocument
+from projects.indexing import (
+    DELETE,
+    INDEX,
+    PROJECT,
+    REINDEX_STATE_NAME,
+    record,
+    sync_projects,
+)
+from projects.models import Project, ProjectTombstone, SearchSyncState
+
+
+def init_worker():
+    """
+    Give every worker process its own database and Elasticsearch connections
+    instead of the sockets inherited from the parent.
+    """
+    db_connections.close_all()
+    es_connections.remove_connection('default')
+    es_connections.create_connection('default', **settings.ELASTICSEARCH_DSL['default'])
+
+
+def index_slice(index_name, start, end, chunk_size, thread_count):
+    """
+    Index the projects with `start <= id < end` into `index_name`.
+
+    Returns:
+        tuple: The number of documents indexed and the number that failed.
+    """
+    document = ProjectDocument()
+    queryset = document.get_queryset().filter(id__gte=start, id__lt=end).order_by('id')
+    actions = (
+        {'_index': index_name, '_id': project.pk, '_source': document.prepare(project)}
+        for project in queryset.iterator(chunk_size=chunk_size)
+    )
+
+    indexed = failed = 0
+    for ok, _ in parallel_bulk(
+        es_connections.get_connection(),
+        actions,
+        chunk_size=chunk_size,
+        thread_count=thread_count,
+        raise_on_error=False,
+    ):
+        if ok:
+            indexed += 1
+        else:
+            failed += 1
+    return indexed, failed
 
 
 class Command(BaseCommand):
-    help = 'Bulk index all projects in Elasticsearch'
+    help = (
+        'Rebuild the projects search index without downtime: load every project into a new '
+        'versioned index in parallel, then atomically point the `projects` alias at it'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes')
+        parser.add_argument('--slices', type=int, default=None,
+                            help='Number of id ranges to split the table into (default: 4 per worker)')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Documents per bulk request')
+        parser.add_argument('--threads', type=int, default=2,
+                            help='parallel_bulk threads per worker')
+        parser.add_argument('--keep-old', action='store_true',
+                            help='Keep the previous index versions instead of deleting them')
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only queue the projects changed or deleted since the last sync')
 
     def handle(self, *args, **options):
-        es = Elasticsearch(["http://127.0.0.1:9200"])
-
-        actions = ({
-            "_index": "projects",
-            "_id": project.id,
-            "_source": {
-                "title": project.title,
-                "description": project.description,
-                "status": project.status,
-                "funding_goal": project.funding_goal
-            }
-        } for project in Project.objects.all().iterator())
-
-        success, failed = bulk(es, actions, stats_only=True)
+        if options['incremental']:
+            indexed, deleted = sync_projects(chunk_size=options['chunk_size'])
+            self.stdout.write(
+                self.style.SUCCESS(f"Queued {indexed} projects for indexing and {deleted} for deletion")
+            )
+            return
+
+        workers = max(options['workers'], 1)
+        slices = max(options['slices'] or workers * 4, 1)
+
+        client = es_connections.get_connection()
+        alias = ProjectDocument._index._name
+        index_name = f"{alias}-{timezone.now():%Y%m%d%H%M%S}"
+
+        # Load without refreshes or replicas, restore them once the data is in.
+        final_settings = {
+            'refresh_interval': '1s',
+            'number_of_replicas': ProjectDocument._index._settings.get('number_of_replicas', 0),
+        }
+        index = ProjectDocument._index.clone(name=index_name)
+        index.settings(refresh_interval='-1', number_of_replicas=0)
+        index.create()
+        self.stdout.write(f"Created index {index_name}")
+
+        started_at = timezone.now()
+        # Keeps the incremental sync from consuming the tombstones replayed below.
+        SearchSyncState.objects.update_or_create(name=REINDEX_STATE_NAME, defaults={'watermark': started_at})
+        try:
+            start = time.monotonic()
+            indexed, failed = self.load(index_name, workers, slices, options['chunk_size'], options['threads'])
+            elapsed = time.monotonic() - start
+
+            if failed:
+                client.indices.delete(index=index_name)
+                raise CommandError(f"{failed} projects failed to index, kept the current index")
+
+            client.indices.put_settings(index=index_name, settings={'index': final_settings})
+            client.indices.refresh(index=index_name)
+            previous = self.swap_alias(client, alias, index_name)
+            self.stdout.write(f"Alias {alias} now points to {index_name}")
+
+            # Replay the changes made while loading: they were written to the old index.
+            changed_ids = Project.objects.filter(updated_at__gte=started_at).values_list('id', flat=True)
+            record({f'{PROJECT}:{pk}': INDEX for pk in changed_ids})
+            deleted_ids = ProjectTombstone.objects.filter(deleted_at__gte=started_at) \
+                .values_list('project_id', flat=True)
+            record({f'{PROJECT}:{pk}': DELETE for pk in deleted_ids})
+        finally:
+            SearchSyncState.objects.filter(name=REINDEX_STATE_NAME).delete()
+
+        if not options['keep_old']:
+            for old_index in previous:
+                client.indices.delete(index=old_index)
+                self.stdout.write(f"Deleted index {old_index}")
+
+        rate = indexed / elapsed if elapsed else indexed
         self.stdout.write(
-            self.style.SUCCESS(f"Indexed {success} projects. Failures: {failed}")
+            self.style.SUCCESS(f"Indexed {indexed} projects in {elapsed:.1f}s ({rate:.0f} docs/sec)")
         )
+
+    def load(self, index_name, workers, slices, chunk_size, thread_count):
+        """
+        Split the id range into slices and index them across a process pool.
+        """
+        bounds = Project.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            return 0, 0
+
+        low, high = bounds['low'], bounds['high'] + 1
+        step = max((high - low + slices - 1) // slices, 1)
+        ranges = [(begin, min(begin + step, high)) for begin in range(low, high, step)]
+
+        # Forked workers must not share the parent's database connection.
+        db_connections.close_all()
+
+        indexed = failed = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            futures = [
+                executor.submit(index_slice, index_name, begin, end, chunk_size, thread_count)
+                for begin, end in ranges
+            ]
+            for future in as_completed(futures):
+                slice_indexed, slice_failed = future.result()
+                indexed += slice_indexed
+                failed += slice_failed
+                self.stdout.write(f"Indexed {indexed} projects so far")
+        return indexed, failed
+
+    def swap_alias(self, client, alias, index_name):
+        """
+        Point `alias` at `index_name` in a single atomic request.
+
+        Returns:
+            list: The indices the alias pointed to before.
+        """
+        actions = [{'add': {'index': index_name, 'alias': alias}}]
+        previous = []
+
+        if client.indices.exists_alias(name=alias):
+            previous = list(client.indices.get_alias(name=alias).keys())
+            actions = [{'remove': {'index': name, 'alias': alias}} for name in previous] + actions
+        elif client.indices.exists(index=alias):
+            # An index created before aliases were used is dropped in the same request.
+            actions = [{'remove_index': {'index': alias}}] + actions
+
+        client.indices.update_aliases(actions=actions)
+        return previous
@@ -0,0 +1,65 @@
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from elasticsearch.helpers import bulk
+from elasticsearch_dsl.connections import connections as es_connections
+
+from projects.indexing import DELETE, INDEX, STARTUP, record
+from startups.documents import StartupDocument
+from startups.models import StartupProfile
+from .bulk_index_projects import Command as BulkIndexProjectsCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the startups search index without downtime: create a new versioned index with the '
+        'StartupDocument mapping, load every startup, then atomically point the `startups` alias at it'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Documents per bulk request')
+        parser.add_argument('--keep-old', action='store_true',
+                            help='Keep the previous index versions instead of deleting them')
+
+    def handle(self, *args, **options):
+        client = es_connections.get_connection()
+        document = StartupDocument()
+        alias = StartupDocument._index._name
+        index_name = f"{alias}-{timezone.now():%Y%m%d%H%M%S}"
+
+        # The explicit mapping makes `name_suggest` a completion field.
+        index = StartupDocument._index.clone(name=index_name)
+        index.settings(refresh_interval='-1')
+        index.create()
+        self.stdout.write(f"Created index {index_name}")
+
+        # The document is derived from the company name alone: remember the
+        # loaded ones to replay the startups changed while loading.
+        loaded = {}
+
+        def actions():
+            for startup in document.get_queryset().order_by('id').iterator(chunk_size=options['chunk_size']):
+                loaded[startup.pk] = startup.company_name
+                yield {'_index': index_name, '_id': startup.pk, '_source': document.prepare(startup)}
+
+        indexed, errors = bulk(client, actions(), chunk_size=options['chunk_size'], raise_on_error=False)
+        if errors:
+            client.indices.delete(index=index_name)
+            raise CommandError(f"{len(errors)} startups failed to index, kept the current index")
+
+        client.indices.put_settings(index=index_name, settings={'index': {'refresh_interval': '1s'}})
+        client.indices.refresh(index=index_name)
+        previous = BulkIndexProjectsCommand().swap_alias(client, alias, index_name)
+        self.stdout.write(f"Alias {alias} now points to {index_name}")
+
+        # Replay the changes made while loading: they were written to the old index.
+        current = dict(StartupProfile.objects.values_list('id', 'company_name'))
+        record({f'{STARTUP}:{pk}': INDEX for pk, name in current.items() if loaded.get(pk) != name})
+        record({f'{STARTUP}:{pk}': DELETE for pk in loaded.keys() - current.keys()})
+
+        if not options['keep_old']:
+            for old_index in previous:
+                client.indices.delete(index=old_index)
+                self.stdout.write(f"Deleted index {old_index}")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} startups"))
@@ -1,9 +1,9 @@
 import random
+from itertools import islice
 
 from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
 from faker import Faker
 
 from investors.models import (
@@ -17,48 +17,67 @@ from users.models import User
 
 fake = Faker()
 
+# Faker is far too slow to call once per row for millions of projects, so
+# texts are drawn from pools generated once.
+TITLE_POOL_SIZE = 5000
+DESCRIPTION_POOL_SIZE = 1000
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def unique_name(name, taken):
+    """
+    `name`, numbered ("Acme Inc 2") if it is in `taken`, which it is added to.
+    """
+    candidate, number = name, 1
+    while candidate in taken:
+        number += 1
+        candidate = f"{name} {number}"
+    taken.add(candidate)
+    return candidate
+
 
 class Command(BaseCommand):
     help = "Populate database with fake data"
 
-    def bulk_index_projects(self, es):
-        actions = ({
-            "_index": "projects",
-            "_id": project.id,
-            "_source": {
-                "title": project.title,
-                "description": project.description,
-                "status": project.status,
-                "funding_goal": project.funding_goal
-            }
-        } for project in Project.objects.all().iterator())
-
-        success, _ = bulk(es, actions, stats_only=True)
-        self.stdout.write(
-            self.style.SUCCESS(f"Bulk indexed {success} historical projects")
-        )
-
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10,
+                            help='Number of users to create')
+        parser.add_argument('--projects', type=int, default=None,
+                            help='Number of projects to create (default: 1 to 3 per startup)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows per bulk insert')
+        parser.add_argument('--no-index', action='store_true',
+                            help='Do not rebuild the projects search index afterwards')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
         self.stdout.write(self.style.SUCCESS("Starting database population..."))
 
         # Create industries
 
         industry = ["Tech1", "Healthcare", "Finance", "Real Estate", "Energy"]
-        industries = [Industry.objects.create(name=name) for name in industry]
+        industries = [Industry.objects.get_or_create(name=name)[0] for name in industry]
         self.stdout.write(self.style.SUCCESS("Industries created."))
 
         # Create users
+        password = make_password("Password123#")
+        run = random.randint(0, 10 ** 9)
         users = [
             User(
-                email=fake.email(),
-                password=make_password("Password123#"),
+                email=f"user{run}.{index}@{fake.free_email_domain()}",
+                password=password,
                 first_name=fake.first_name(),
                 last_name=fake.last_name(),
                 is_investor=random.choice([True, False]),
                 is_startup=random.choice([True, False]),
                 is_email_confirmed=True
             )
-            for _ in range(10)
+            for index in range(options['users'])
         ]
 
         # Ensure that at least one role is True
@@ -66,35 +85,41 @@ class Command(BaseCommand):
             if not user.is_investor and not user.is_startup:
                 user.is_investor = True  # If both are False, set the user as an investor
 
-
-        User.objects.bulk_create(users)
+        # bulk_create sets the primary keys on Postgres (and SQLite >= 3.35)
+        User.objects.bulk_create(users, batch_size=self.batch_size)
         self.stdout.write(self.style.SUCCESS("Users created."))
 
         # Create startup profiles
-        startups = []
-        for user in [u for u in users if u.is_startup]:
-            startup = StartupProfile.objects.create(
+        company_names = set(StartupProfile.objects.values_list('company_name', flat=True))
+        startups = StartupProfile.objects.bulk_create([
+            StartupProfile(
                 user=user,
-                company_name=fake.company(),
+                company_name=unique_name(fake.company(), company_names),
                 description=fake.text(),
                 website=fake.url(),
-                contact_email=fake.email()
+                contact_email=f"startup{run}.{user.id}@{fake.free_email_domain()}"
             )
-            startup.industries.set(random.sample(industries, k=random.randint(1, 3)))
-            startups.append(startup)
+            for user in users if user.is_startup
+        ], batch_size=self.batch_size)
+
+        StartupProfile.industries.through.objects.bulk_create([
+            StartupProfile.industries.through(startupprofile_id=startup.id, industry_id=industry.id)
+            for startup in startups
+            for industry in random.sample(industries, k=random.randint(1, 3))
+        ], batch_size=self.batch_size)
         self.stdout.write(self.style.SUCCESS("Startup profiles created."))
 
         # Create investor profiles
-        investors = []
-        for user in [u for u in users if u.is_investor]:
-            investor = InvestorProfile.objects.create(
+        investors = InvestorProfile.objects.bulk_create([
+            InvestorProfile(
                 user=user,
                 company_name=fake.company(),
                 investment_focus=fake.word(),
-                contact_email=fake.email(),
+                contact_email=f"investor{run}.{user.id}@{fake.free_email_domain()}",
                 investment_range=f"${random.randint(10000, 500000)}"
             )
-            investors.append(investor)
+            for user in users if user.is_investor
+        ], batch_size=self.batch_size)
         self.stdout.write(self.style.SUCCESS("Investor profiles created."))
 
         # Assign industries to investors
@@ -104,38 +129,58 @@ class Command(BaseCommand):
             for investor in investors
             for industry in random.sample(industries, k=random.randint(1, 3))
         ]
-        InvestorPreferredIndustry.objects.bulk_create(investor_industries)
+        InvestorPreferredIndustry.objects.bulk_create(investor_industries, batch_size=self.batch_size)
 
         # Investors save startups
-        for investor in investors:
-            saved_startups = random.sample(startups, k=random.randint(1, 3))
+        if startups:
             InvestorSavedStartup.objects.bulk_create([
                 InvestorSavedStartup(investor=investor, startup=startup)
-                for startup in saved_startups
-            ])
+                for investor in investors
+                for startup in random.sample(startups, k=min(random.randint(1, 3), len(startups)))
+            ], batch_size=self.batch_size)
         self.stdout.write(self.style.SUCCESS("Investor saved startups created."))
 
         # Create projects
-        projects = [
-            Project(
-                startup=startup,
-                title=fake.sentence(nb_words=4),
-                description=fake.text(),
-                funding_goal=random.uniform(10000, 500000),
-                funding_needed=random.uniform(1000, 100000),
-                status=random.choice(['Seeking Funding', 'In Progress', 'Completed']),
-                duration=random.randint(1, 24)
-            )
-            for startup in startups
-            for _ in range(random.randint(1, 3))
-        ]
-        Project.objects.bulk_create(projects)
-        self.stdout.write(self.style.SUCCESS("Projects created."))
+        created = self.create_projects(startups, options['projects'])
+        self.stdout.write(self.style.SUCCESS(f"{created} projects created."))
 
         self.stdout.write(self.style.SUCCESS("Database population completed."))
 
-        #
-        es = Elasticsearch(["http://127.0.0.1:9200"])
-        self.bulk_index_projects(es)
-
-
+        # Projects were bulk inserted without signals, so rebuild the index from the table.
+        if not options['no_index']:
+            call_command('bulk_index_projects', stdout=self.stdout)
+
+    def create_projects(self, startups, total=None):
+        """
+        Insert `total` projects spread over `startups` (1 to 3 per startup when
+        `total` is not given), in batches so memory stays flat at any size.
+        """
+        if not startups:
+            return 0
+
+        titles = [fake.sentence(nb_words=4) for _ in range(TITLE_POOL_SIZE)]
+        descriptions = [fake.text() for _ in range(DESCRIPTION_POOL_SIZE)]
+
+        if total is None:
+            owners = (startup for startup in startups for _ in range(random.randint(1, 3)))
+        else:
+            owners = (startups[index % len(startups)] for index in range(total))
+
+        created = 0
+        for batch in batched(owners, self.batch_size):
+            Project.objects.bulk_create([
+                Project(
+                    startup=startup,
+                    title=random.choice(titles),
+                    description=random.choice(descriptions),
+                    funding_goal=round(random.uniform(10000, 500000), 2),
+                    funding_needed=round(random.uniform(1000, 100000), 2),
+                    status=random.choice(['Seeking Funding', 'In Progress', 'Completed']),
+                    duration=random.randint(1, 24)
+                )
+                for startup in batch
+            ])
+            created += len(batch)
+            if total is not None:
+                self.stdout.write(f"{created}/{total} projects created")
+        return created
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.19 on 2026-10-17 03:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0003_viewedstartup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='viewedstartup',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
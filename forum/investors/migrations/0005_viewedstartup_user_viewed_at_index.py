@@ -0,0 +1,17 @@
+# Generated by Django 4.2.19 on 2026-10-17 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0004_viewedstartup_viewed_at_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='viewedstartup',
+            index=models.Index(fields=['user', '-viewed_at', '-id'], name='viewed_user_viewed_at_idx'),
+        ),
+    ]
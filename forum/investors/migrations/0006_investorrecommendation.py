@@ -0,0 +1,32 @@
+# Generated by Django 4.2.19 on 2026-10-17 03:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0001_initial'),
+        ('investors', '0005_viewedstartup_user_viewed_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvestorRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('investor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='investors.investorprofile')),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_to', to='startups.startupprofile')),
+            ],
+            options={
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['investor', 'rank'], name='recommendation_rank_idx')],
+                'unique_together': {('investor', 'startup')},
+            },
+        ),
+    ]
@@ -2,8 +2,8 @@ from decimal import Decimal
 
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import Sum
+from django.db import models, transaction
+from django.utils import timezone
 
 from startups.models import Industry, StartupProfile
 from users.models import User
@@ -64,17 +64,21 @@ class InvestorTrackedProject(models.Model):
         ]
 
     def clean(self):
-        total_share = (
-            InvestorTrackedProject.objects.filter(project=self.project)
-            .exclude(pk=self.pk)
-            .aggregate(total=Sum('share'))['total'] or Decimal('0.00')
-        ) + self.share
+        # The funded share of the project already counts this subscription's saved share.
+        previous_share = InvestorTrackedProject.objects.filter(pk=self.pk, project=self.project) \
+            .values_list('share', flat=True).first() if self.pk else None
+        total_share = self.project.funded_share - (previous_share or Decimal('0.00')) + self.share
 
         if total_share > 100:
             raise ValidationError(
                 f"The total share of all investors for this project cannot exceed 100%. Current total: {total_share}%"
             )
 
+    def save(self, *args, **kwargs):
+        # The project's funded share is updated by the save signals, in the same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.investor.company_name} - {self.project.title} - {self.share}%"
 
@@ -82,11 +86,37 @@ class InvestorTrackedProject(models.Model):
 class ViewedStartup(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='viewed_startups')
     startup = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name='viewed_by')
-    viewed_at = models.DateTimeField(auto_now=True)
+    viewed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ('user', 'startup')
         ordering = ['-viewed_at']
+        indexes = [
+            # Serves the recent history of a user, and finds the views to trim.
+            models.Index(fields=['user', '-viewed_at', '-id'], name='viewed_user_viewed_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} viewed {self.startup.company_name}"
+
+
+class InvestorRecommendation(models.Model):
+    """
+    A precomputed startup recommendation, one of the top-K of an investor
+    (see `investors.recommendations`).
+    """
+    investor = models.ForeignKey(InvestorProfile, on_delete=models.CASCADE, related_name='recommendations')
+    startup = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name='recommended_to')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('investor', 'startup')
+        ordering = ['rank']
+        indexes = [
+            models.Index(fields=['investor', 'rank'], name='recommendation_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.investor.company_name} - {self.startup.company_name} (#{self.rank})"
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+from django.db.models import Count, Window
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class ViewedStartupCursorPagination(CursorPagination):
+    """
+    Keyset pagination of an investor's recently viewed startups on
+    `(viewed_at, id)`, read through the `(user, viewed_at)` index.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = ('-viewed_at', '-id')
+
+
+class SavedStartupCursorPagination(CursorPagination):
+    """
+    Keyset pagination of an investor's saved startups on the sort the view
+    picked (see `SavedStartupsApiView.get_ordering`).
+
+    The total is only counted for the first page, by a `COUNT(*) OVER ()`
+    window in the page query itself, so the search is never run twice. Later
+    pages report a null count; clients keep the one of the first page.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = ('id',)
+
+    def get_ordering(self, request, queryset, view):
+        return view.get_ordering()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        first_page = request.query_params.get(self.cursor_query_param) is None
+        if first_page:
+            queryset = queryset.annotate(total_count=Window(Count('pk')))
+
+        page = super().paginate_queryset(queryset, request, view)
+        if first_page:
+            self.count = page[0].total_count if page else 0
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'nullable': True, 'example': 123}
+        return response_schema
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+
+from projects.models import Project
+from .models import InvestorSavedStartup, InvestorTrackedProject
+
+PORTFOLIO_CACHE_KEY = 'investor-portfolio:{}'
+
+CENTS = Decimal('0.01')
+
+# Capital an investor committed to a project: their share of its funding goal.
+COMMITTED_CAPITAL = ExpressionWrapper(
+    F('share') * F('project__funding_goal') / Decimal('100'),
+    output_field=DecimalField(max_digits=15, decimal_places=2),
+)
+
+
+def get_portfolio(investor_id):
+    """
+    Portfolio summary of an investor, served from the cache when possible.
+
+    It is cached for `INVESTOR_PORTFOLIO_CACHE_TIMEOUT` seconds at most and
+    dropped as soon as the investor's subscriptions or saved startups, or
+    one of the projects they track, change (see `investors.signals`).
+    """
+    cache_key = PORTFOLIO_CACHE_KEY.format(investor_id)
+    portfolio = cache.get(cache_key)
+    if portfolio is None:
+        portfolio = compute_portfolio(investor_id)
+        cache.set(cache_key, portfolio, getattr(settings, 'INVESTOR_PORTFOLIO_CACHE_TIMEOUT', 5 * 60))
+    return portfolio
+
+
+def compute_portfolio(investor_id):
+    """
+    Summarize the subscriptions and saved startups of an investor.
+
+    The tracked projects are counted and their committed capital summed per
+    project status in one grouped query; the largest holdings are read with
+    a second one and the saved startups counted with a third.
+
+    Returns:
+        dict: `tracked_projects`, `saved_startups`, `committed_capital`,
+        `by_status` (`projects` and `committed_capital` of every status) and
+        `top_holdings`, the `INVESTOR_PORTFOLIO_TOP_HOLDINGS` projects with
+        the most committed capital.
+    """
+    top_holdings = getattr(settings, 'INVESTOR_PORTFOLIO_TOP_HOLDINGS', 5)
+    subscriptions = InvestorTrackedProject.objects.filter(investor_id=investor_id)
+
+    by_status = {
+        value: {'projects': 0, 'committed_capital': Decimal('0.00')}
+        for value, _ in Project.STATUS_CHOICES
+    }
+    totals = subscriptions.values('project__status').annotate(
+        projects=Count('pk'),
+        committed_capital=Sum(COMMITTED_CAPITAL),
+    ).order_by()
+    for row in totals:
+        by_status[row['project__status']] = {
+            'projects': row['projects'],
+            'committed_capital': (row['committed_capital'] or Decimal('0.00')).quantize(CENTS),
+        }
+
+    holdings = subscriptions.annotate(committed_capital=COMMITTED_CAPITAL) \
+        .filter(share__gt=0) \
+        .order_by('-committed_capital', 'project_id') \
+        .values(
+            'project_id', 'share', 'committed_capital',
+            title=F('project__title'),
+            status=F('project__status'),
+            startup=F('project__startup__company_name'),
+        )[:top_holdings]
+
+    return {
+        'tracked_projects': sum(row['projects'] for row in by_status.values()),
+        'saved_startups': InvestorSavedStartup.objects.filter(investor_id=investor_id).count(),
+        'committed_capital': sum(row['committed_capital'] for row in by_status.values()),
+        'by_status': by_status,
+        'top_holdings': [
+            {
+                'project': holding['project_id'],
+                'title': holding['title'],
+                'startup': holding['startup'],
+                'status': holding['status'],
+                'share': holding['share'],
+                'committed_capital': holding['committed_capital'].quantize(CENTS),
+            }
+            for holding in holdings
+        ],
+    }
+
+
+def invalidate_portfolios(investor_ids):
+    """
+    Drop the cached portfolios of `investor_ids` once the surrounding
+    transaction commits, so they are not recomputed from uncommitted rows.
+    """
+    keys = [PORTFOLIO_CACHE_KEY.format(pk) for pk in set(investor_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
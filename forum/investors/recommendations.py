@@ -0,0 +1,224 @@
+import logging
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from forum.buffers import get_buffer
+from startups.models import StartupProfile
+from .models import (
+    InvestorPreferredIndustry,
+    InvestorProfile,
+    InvestorRecommendation,
+    InvestorSavedStartup,
+    ViewedStartup,
+)
+
+logger = logging.getLogger(__name__)
+
+INVESTOR = 'investor'
+USER = 'user'
+STARTUP = 'startup'
+
+BUFFER_NAME = 'recommendations'
+SCHEDULED_REFRESH_KEY = 'recommendations:refresh-scheduled'
+
+DEFAULT_WEIGHTS = {'preferences': 1.0, 'saved': 0.5, 'viewed': 0.25}
+
+
+def get_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'RECOMMENDATIONS_WEIGHTS', {})}
+
+
+def get_recommendation_buffer():
+    """
+    Buffer of changes waiting to be folded into the recommendations.
+
+    Entries are keyed by `<label>:<id>`: an investor whose preferences or
+    saved startups changed, a user who viewed startups, or a startup whose
+    industries changed. The refresh resolves them to the investors to
+    recompute, so a burst of changes costs one recomputation per investor.
+    """
+    return get_buffer(BUFFER_NAME)
+
+
+def mark_stale(label, ids):
+    """
+    Schedule the recommendations affected by a change of `ids` to be
+    recomputed, once the surrounding transaction commits.
+    """
+    entries = {f'{label}:{pk}': '1' for pk in ids}
+    if entries:
+        transaction.on_commit(lambda: record(entries))
+
+
+def record(entries):
+    from .tasks import refresh_recommendations
+
+    get_recommendation_buffer().add_many(entries)
+
+    interval = getattr(settings, 'RECOMMENDATIONS_REFRESH_INTERVAL', 30)
+    if cache.add(SCHEDULED_REFRESH_KEY, True, timeout=interval):
+        refresh_recommendations.apply_async(countdown=interval)
+
+
+def resolve_investors(entries):
+    """
+    Turn drained buffer entries into the IDs of the investors to recompute.
+
+    A changed startup affects the investors preferring one of its industries,
+    the ones it is recommended to, and the ones who saved or viewed it.
+    """
+    ids = defaultdict(set)
+    for key in entries:
+        label, pk = key.split(':', 1)
+        ids[label].add(int(pk))
+
+    investor_ids = set(ids[INVESTOR])
+    if ids[USER]:
+        investor_ids.update(InvestorProfile.objects.filter(user_id__in=ids[USER]).values_list('pk', flat=True))
+    if ids[STARTUP]:
+        startup_ids = ids[STARTUP]
+        investor_ids.update(
+            InvestorPreferredIndustry.objects.filter(industry__startups__in=startup_ids)
+            .values_list('investor_id', flat=True)
+        )
+        investor_ids.update(
+            InvestorRecommendation.objects.filter(startup_id__in=startup_ids).values_list('investor_id', flat=True)
+        )
+        investor_ids.update(
+            InvestorSavedStartup.objects.filter(startup_id__in=startup_ids).values_list('investor_id', flat=True)
+        )
+        investor_ids.update(
+            InvestorProfile.objects.filter(user__viewed_startups__startup_id__in=startup_ids)
+            .values_list('pk', flat=True)
+        )
+    return investor_ids
+
+
+def build_matrix(pairs, row_ids, column_ids):
+    """
+    Sparse incidence matrix with a row per `row_ids` and a column per
+    `column_ids` (both sorted arrays) holding a 1 for every `(row id, column
+    id)` pair. Pairs outside those IDs are ignored.
+    """
+    pairs = np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+    rows = np.searchsorted(row_ids, pairs[:, 0])
+    columns = np.searchsorted(column_ids, pairs[:, 1])
+
+    found = (rows < len(row_ids)) & (columns < len(column_ids))
+    found[found] &= (row_ids[rows[found]] == pairs[found, 0]) & (column_ids[columns[found]] == pairs[found, 1])
+
+    return sparse.csr_matrix(
+        (np.ones(found.sum()), (rows[found], columns[found])),
+        shape=(len(row_ids), len(column_ids)),
+    )
+
+
+def normalize_rows(matrix):
+    """
+    Scale every row of `matrix` to unit length, so dot products are cosines.
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def compute_recommendations(investor_ids=None):
+    """
+    Recompute and store the top `RECOMMENDATIONS_TOP_K` startups of
+    `investor_ids` (of every investor when not given).
+
+    Investors and startups are compared in industry space. The startup ×
+    industry incidence matrix is loaded once; investors are processed in
+    batches of `RECOMMENDATIONS_BATCH_SIZE`, for which three investor
+    profiles are built: the preferred industries, and the industries of the
+    saved and of the viewed startups. The score of a startup is the sum of
+    the cosine similarities of its industries with each profile, weighted by
+    `RECOMMENDATIONS_WEIGHTS`, computed for the whole batch with one sparse
+    matrix product. Startups an investor already saved are left out.
+
+    Returns:
+        int: The number of recommendations stored.
+    """
+    startup_pairs = np.array(
+        list(StartupProfile.industries.through.objects.values_list('startupprofile_id', 'industry_id')),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    startup_ids = np.unique(startup_pairs[:, 0])
+    industry_ids = np.unique(startup_pairs[:, 1])
+    startups = normalize_rows(build_matrix(startup_pairs, startup_ids, industry_ids))
+
+    investors = InvestorProfile.objects.order_by('pk')
+    if investor_ids is not None:
+        investors = investors.filter(pk__in=investor_ids)
+    all_ids = np.fromiter(investors.values_list('pk', flat=True), dtype=np.int64)
+
+    batch_size = getattr(settings, 'RECOMMENDATIONS_BATCH_SIZE', 500)
+    stored = 0
+    for start in range(0, len(all_ids), batch_size):
+        stored += _compute_batch(all_ids[start:start + batch_size], startups, startup_ids, industry_ids)
+
+    logger.info(f"Computed {stored} recommendations for {len(all_ids)} investors")
+    return stored
+
+
+def _compute_batch(ids, startups, startup_ids, industry_ids):
+    weights = get_weights()
+    top_k = getattr(settings, 'RECOMMENDATIONS_TOP_K', 20)
+    investor_ids = ids.tolist()
+
+    preferences = build_matrix(
+        InvestorPreferredIndustry.objects.filter(investor_id__in=investor_ids)
+        .values_list('investor_id', 'industry_id'),
+        ids, industry_ids,
+    )
+    saved = build_matrix(
+        InvestorSavedStartup.objects.filter(investor_id__in=investor_ids).values_list('investor_id', 'startup_id'),
+        ids, startup_ids,
+    )
+    viewed = build_matrix(
+        ViewedStartup.objects.filter(user__investor_profile__in=investor_ids)
+        .values_list('user__investor_profile', 'startup_id'),
+        ids, startup_ids,
+    )
+
+    profiles = (
+        weights['preferences'] * normalize_rows(preferences)
+        + weights['saved'] * normalize_rows(saved @ startups)
+        + weights['viewed'] * normalize_rows(viewed @ startups)
+    )
+    scores = (profiles @ startups.T).tocsr()
+    scores = (scores - scores.multiply(saved)).tocsr()
+    scores.eliminate_zeros()
+
+    now = timezone.now()
+    recommendations = []
+    for row, investor_id in enumerate(investor_ids):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        values, columns = scores.data[start:end], scores.indices[start:end]
+        if len(values) > top_k:
+            keep = np.argpartition(-values, top_k - 1)[:top_k]
+            values, columns = values[keep], columns[keep]
+
+        # Highest score first, ties broken by startup ID.
+        order = np.lexsort((startup_ids[columns], -values))
+        recommendations += [
+            InvestorRecommendation(
+                investor_id=investor_id,
+                startup_id=int(startup_ids[columns[i]]),
+                score=float(values[i]),
+                rank=rank,
+                computed_at=now,
+            )
+            for rank, i in enumerate(order, start=1)
+        ]
+
+    with transaction.atomic():
+        InvestorRecommendation.objects.filter(investor_id__in=investor_ids).delete()
+        InvestorRecommendation.objects.bulk_create(recommendations)
+    return len(recommendations)
@@ -1,20 +1,28 @@
-from django.db.models import Sum
+from decimal import Decimal
+
+from django.conf import settings
 from rest_framework import serializers
 
+from forum.serializers import DynamicFieldsMixin
 from projects.models import Project
 from projects.serializers import ProjectSerializer
-from startups.serializers import IndustrySerializer, StartupProfileSerializer
+from startups.serializers import (
+    IndustrySerializer,
+    StartupProfileSerializer,
+    StartupSummarySerializer,
+)
 from users.serializers import UserSerializer
 from .models import (
     InvestorPreferredIndustry,
     InvestorProfile,
+    InvestorRecommendation,
     InvestorSavedStartup,
     InvestorTrackedProject,
     ViewedStartup,
 )
 
 
-class InvestorProfileSerializer(serializers.ModelSerializer):
+class InvestorProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -51,7 +59,7 @@ class CreateInvestorProfileSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class InvestorPreferredIndustrySerializer(serializers.ModelSerializer):
+class InvestorPreferredIndustrySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     investor = InvestorProfileSerializer(read_only=True)
     industry = IndustrySerializer(read_only=True)
 
@@ -75,7 +83,7 @@ class CreateInvestorPreferredIndustrySerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class InvestorSavedStartupSerializer(serializers.ModelSerializer):
+class InvestorSavedStartupSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     investor = InvestorProfileSerializer(read_only=True)
     startup = StartupProfileSerializer(read_only=True)
 
@@ -101,7 +109,7 @@ class CreateInvestorSavedStartupSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class InvestorTrackedProjectSerializer(serializers.ModelSerializer):
+class InvestorTrackedProjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     investor = InvestorProfileSerializer(read_only=True)
     project = ProjectSerializer(read_only=True)
 
@@ -134,8 +142,8 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     share = serializers.DecimalField(
         max_digits=5,
         decimal_places=2,
-        min_value=0,
-        max_value=100,
+        min_value=Decimal('0'),
+        max_value=Decimal('100'),
         help_text="Investment share in percentage (0 - 100%)"
     )
 
@@ -148,13 +156,8 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         project = data['project']
         new_share = data['share']
 
-        # Get the total current investment for the project
-        total_current_share = InvestorTrackedProject.objects.filter(project=project).aggregate(
-            total_investment=Sum('share')
-        )['total_investment'] or 0
-
         # Ensure new subscription does not exceed 100% funding
-        if total_current_share + new_share > 100:
+        if project.funded_share + new_share > 100:
             raise serializers.ValidationError(
                 {"share": "Project is fully funded. No further subscriptions allowed."}
             )
@@ -165,8 +168,43 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         return InvestorTrackedProject.objects.create(**validated_data)
 
 
-class ViewedStartupSerializer(serializers.ModelSerializer):
-    startup = StartupProfileSerializer(read_only=True)
+class BulkSubscriptionItemSerializer(serializers.Serializer):
+    project = serializers.IntegerField(min_value=1)
+    share = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        min_value=Decimal('0'),
+        max_value=Decimal('100'),
+        default=Decimal('0.00'),
+        help_text="Investment share in percentage (0 - 100%), 0 to only track the project"
+    )
+
+
+class BulkSubscriptionSerializer(serializers.Serializer):
+    items = BulkSubscriptionItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        max_items = getattr(settings, 'SUBSCRIPTION_BULK_MAX_ITEMS', 100)
+        if len(items) > max_items:
+            raise serializers.ValidationError(f"At most {max_items} items can be sent at once.")
+
+        project_ids = [item['project'] for item in items]
+        if len(set(project_ids)) != len(project_ids):
+            raise serializers.ValidationError("Each project can appear only once.")
+        return items
+
+
+class InvestorRecommendationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    startup = StartupSummarySerializer(read_only=True)
+
+    class Meta:
+        model = InvestorRecommendation
+        fields = ['startup', 'score', 'rank', 'computed_at']
+        read_only_fields = fields
+
+
+class ViewedStartupSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    startup = StartupSummarySerializer(read_only=True)
 
     class Meta:
         model = ViewedStartup
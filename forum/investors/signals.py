@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from projects.models import Project
+from startups.models import StartupProfile
+from .models import (
+    InvestorPreferredIndustry,
+    InvestorSavedStartup,
+    InvestorTrackedProject,
+)
+from .portfolio import invalidate_portfolios
+from .recommendations import INVESTOR, STARTUP, mark_stale
+
+
+def add_funded_share(project_id, delta):
+    """
+    Move the funded share of a project by `delta` percent, in place so
+    concurrent subscriptions never overwrite each other.
+    """
+    if delta:
+        Project.objects.filter(pk=project_id).update(funded_share=F('funded_share') + delta)
+
+
+def get_share(instance):
+    # The share may have been assigned as a float or a string.
+    return InvestorTrackedProject._meta.get_field('share').to_python(instance.share)
+
+
+@receiver(pre_save, sender=InvestorTrackedProject)
+def remember_previous_share(sender, instance, **kwargs):
+    """
+    Read the share and project an existing subscription had before this save,
+    so only the difference is applied to the funded share.
+    """
+    previous = None
+    if not instance._state.adding:
+        previous = sender.objects.filter(pk=instance.pk).values_list('project_id', 'share').first()
+    instance._previous_share = previous
+
+
+@receiver(post_save, sender=InvestorTrackedProject)
+def update_funded_share_on_save(sender, instance, **kwargs):
+    previous_project_id, previous_share = instance._previous_share or (instance.project_id, Decimal('0.00'))
+    if previous_project_id != instance.project_id:
+        add_funded_share(previous_project_id, -previous_share)
+        previous_share = Decimal('0.00')
+    add_funded_share(instance.project_id, get_share(instance) - previous_share)
+
+
+@receiver(post_delete, sender=InvestorTrackedProject)
+def update_funded_share_on_delete(sender, instance, **kwargs):
+    add_funded_share(instance.project_id, -get_share(instance))
+
+
+@receiver([post_save, post_delete], sender=InvestorPreferredIndustry)
+@receiver([post_save, post_delete], sender=InvestorSavedStartup)
+def refresh_investor_recommendations(sender, instance, **kwargs):
+    mark_stale(INVESTOR, [instance.investor_id])
+
+
+@receiver([post_save, post_delete], sender=InvestorTrackedProject)
+@receiver([post_save, post_delete], sender=InvestorSavedStartup)
+def invalidate_investor_portfolio(sender, instance, **kwargs):
+    invalidate_portfolios([instance.investor_id])
+
+
+@receiver(post_save, sender=Project)
+def invalidate_tracking_portfolios(sender, instance, created, **kwargs):
+    """
+    Drop the portfolios of the investors tracking a project whose title,
+    status or funding goal may have changed.
+    """
+    if not created:
+        invalidate_portfolios(instance.investor_tracks.values_list('investor_id', flat=True))
+
+
+@receiver(m2m_changed, sender=StartupProfile.industries.through)
+def refresh_recommendations_on_industries_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Schedule the recommendations involving the startups whose industries
+    changed to be recomputed.
+    """
+    # Clears are handled before they happen, while the links can still be read.
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        startup_ids = [instance.pk]
+    elif pk_set is None:
+        startup_ids = instance.startups.values_list('pk', flat=True)
+    else:
+        startup_ids = pk_set
+    mark_stale(STARTUP, startup_ids)
@@ -0,0 +1,259 @@
+import logging
+import random
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Case, DecimalField, F, Value, When
+
+from projects.indexing import enqueue_projects
+from projects.models import Project
+from .models import InvestorTrackedProject
+from .portfolio import invalidate_portfolios
+
+logger = logging.getLogger(__name__)
+
+FULL_SHARE = Decimal('100.00')
+
+# SQLSTATEs of transactions Postgres aborted to keep concurrent ones consistent:
+# serialization_failure and deadlock_detected. Running them again succeeds.
+RETRYABLE_SQLSTATES = ('40001', '40P01')
+
+CREATED = 'created'
+REJECTED = 'rejected'
+
+METRICS_KEY = 'subscriptions:metrics:{bucket}:{name}'
+METRICS_BUCKET_SECONDS = 10
+METRIC_NAMES = ('committed', 'rejected', 'retries', 'conflicts', 'latency_ms')
+
+
+class SubscriptionError(Exception):
+    """
+    Raised when a subscription cannot be made.
+    """
+
+
+class FundingExceeded(SubscriptionError):
+    def __init__(self, funded_share):
+        super().__init__(f"Project is already {funded_share}% funded")
+        self.funded_share = funded_share
+
+
+class AlreadySubscribed(SubscriptionError):
+    pass
+
+
+def subscribe(investor, project_id, share):
+    """
+    Subscribe `investor` to a project for `share` percent of its funding.
+
+    The project row is locked (`SELECT ... FOR UPDATE`) for the check and the
+    insert, so concurrent subscriptions to one project queue on that row and
+    can never push its funded share past 100%, while subscriptions to other
+    projects go through in parallel. Transactions aborted by a serialization
+    failure or a deadlock are run again, up to `SUBSCRIPTION_MAX_RETRIES`
+    times with jittered exponential backoff. Called inside an outer
+    transaction, nothing is retried: the outer transaction is aborted as well.
+
+    Returns:
+        tuple: The new `InvestorTrackedProject` and the remaining share of the project.
+
+    Raises:
+        FundingExceeded: If the share does not fit in the project's remaining funding.
+        AlreadySubscribed: If the investor already tracks the project.
+    """
+    start = time.perf_counter()
+    try:
+        result = run_with_retries(_subscribe, investor, project_id, share)
+    except SubscriptionError:
+        record_metric('rejected')
+        raise
+
+    record_metric('committed')
+    record_metric('latency_ms', round((time.perf_counter() - start) * 1000))
+    return result
+
+
+def bulk_subscribe(investor, items):
+    """
+    Subscribe `investor` to many projects at once. Each item is a dict with
+    a `project` ID and a `share`; a share of 0 only tracks the project.
+
+    The projects are locked and their funded shares read in one query, every
+    item is checked against them in one pass, and the accepted ones are
+    inserted with one `bulk_create` and one update of the funded shares, all
+    in one transaction. The rejected items do not stop the others.
+
+    Returns:
+        list: One result per item, in order: `project`, `status` (`created` or
+        `rejected`), and `remaining_funding` or `error`.
+    """
+    start = time.perf_counter()
+    results = run_with_retries(_bulk_subscribe, investor, items)
+
+    created = sum(result['status'] == CREATED for result in results)
+    if created:
+        record_metric('committed', created)
+        record_metric('latency_ms', round((time.perf_counter() - start) * 1000) * created)
+    if created < len(results):
+        record_metric('rejected', len(results) - created)
+    return results
+
+
+def run_with_retries(func, *args):
+    """
+    Run `func(*args)` in a transaction, running it again when the database
+    aborts it with a serialization failure or a deadlock.
+    """
+    max_retries = getattr(settings, 'SUBSCRIPTION_MAX_RETRIES', 5)
+    can_retry = not transaction.get_connection().in_atomic_block
+
+    attempt = 0
+    while True:
+        try:
+            with transaction.atomic():
+                return func(*args)
+        except DatabaseError as e:
+            if not (can_retry and is_retryable(e)) or attempt >= max_retries:
+                if is_retryable(e):
+                    record_metric('conflicts')
+                raise
+            attempt += 1
+            record_metric('retries')
+            logger.warning(f"Subscription aborted ({e}), retry {attempt}/{max_retries}")
+            time.sleep(retry_delay(attempt))
+
+
+def retry_delay(attempt):
+    """
+    Seconds to wait before retry `attempt`: exponential backoff with full
+    jitter, so the transactions that collided do not collide again.
+    """
+    backoff = getattr(settings, 'SUBSCRIPTION_RETRY_BACKOFF', 0.02)
+    return random.uniform(0, backoff * 2 ** attempt)
+
+
+def _subscribe(investor, project_id, share):
+    funded_share = Project.objects.select_for_update() \
+        .values_list('funded_share', flat=True) \
+        .get(pk=project_id)
+
+    if funded_share + share > FULL_SHARE:
+        raise FundingExceeded(funded_share)
+
+    # The project row lock serializes this check with concurrent subscriptions.
+    if InvestorTrackedProject.objects.filter(investor=investor, project_id=project_id).exists():
+        raise AlreadySubscribed("This investor is already tracking this project.")
+
+    subscription = InvestorTrackedProject.objects.create(investor=investor, project_id=project_id, share=share)
+    return subscription, FULL_SHARE - (funded_share + share)
+
+
+def _bulk_subscribe(investor, items):
+    project_ids = sorted({item['project'] for item in items})
+    # Locking in primary key order keeps concurrent bulk subscriptions from deadlocking.
+    funded_shares = dict(
+        Project.objects.select_for_update()
+        .filter(pk__in=project_ids)
+        .order_by('pk')
+        .values_list('pk', 'funded_share')
+    )
+    tracked = set(
+        InvestorTrackedProject.objects.filter(investor=investor, project_id__in=project_ids)
+        .values_list('project_id', flat=True)
+    )
+
+    results = []
+    subscriptions = []
+    deltas = {}
+    for item in items:
+        project_id, share = item['project'], item['share']
+        error = None
+        if project_id not in funded_shares:
+            error = "Project not found."
+        elif project_id in tracked:
+            error = "This investor is already tracking this project."
+        elif funded_shares[project_id] + share > FULL_SHARE:
+            error = "Project is fully funded or the investment exceeds the allowed share."
+
+        if error:
+            results.append({'project': project_id, 'status': REJECTED, 'error': error})
+            continue
+
+        tracked.add(project_id)
+        funded_shares[project_id] += share
+        deltas[project_id] = deltas.get(project_id, Decimal('0.00')) + share
+        subscriptions.append(InvestorTrackedProject(investor=investor, project_id=project_id, share=share))
+        results.append({
+            'project': project_id,
+            'status': CREATED,
+            'remaining_funding': FULL_SHARE - funded_shares[project_id],
+        })
+
+    if subscriptions:
+        # bulk_create() sends no signals: keep the funded shares, the search index and the portfolio in step here.
+        InvestorTrackedProject.objects.bulk_create(subscriptions)
+        deltas = {project_id: delta for project_id, delta in deltas.items() if delta}
+        if deltas:
+            Project.objects.filter(pk__in=deltas).update(funded_share=F('funded_share') + Case(
+                *(When(pk=project_id, then=Value(delta)) for project_id, delta in deltas.items()),
+                output_field=DecimalField(max_digits=5, decimal_places=2),
+            ))
+        enqueue_projects([subscription.project_id for subscription in subscriptions])
+        invalidate_portfolios([investor.pk])
+    return results
+
+
+def is_retryable(error):
+    cause = error.__cause__
+    # psycopg2 exposes `pgcode`, psycopg 3 `sqlstate`.
+    sqlstate = getattr(cause, 'pgcode', None) or getattr(cause, 'sqlstate', None)
+    return sqlstate in RETRYABLE_SQLSTATES
+
+
+def record_metric(name, value=1):
+    """
+    Add `value` to a subscription counter of the current time bucket. The
+    counters live in the shared cache so every process reports to them.
+    """
+    bucket = int(time.time()) // METRICS_BUCKET_SECONDS
+    key = METRICS_KEY.format(bucket=bucket, name=name)
+    timeout = getattr(settings, 'SUBSCRIPTION_METRICS_WINDOW', 300) + METRICS_BUCKET_SECONDS
+    if not cache.add(key, value, timeout=timeout):
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            # The counter expired between add() and incr().
+            cache.set(key, value, timeout=timeout)
+
+
+def get_metrics():
+    """
+    Subscription throughput over the last `SUBSCRIPTION_METRICS_WINDOW`
+    seconds: counters, commits per second and mean commit latency.
+    """
+    window = getattr(settings, 'SUBSCRIPTION_METRICS_WINDOW', 300)
+    current = int(time.time()) // METRICS_BUCKET_SECONDS
+    buckets = range(current - window // METRICS_BUCKET_SECONDS + 1, current + 1)
+
+    keys = {
+        METRICS_KEY.format(bucket=bucket, name=name): name
+        for bucket in buckets
+        for name in METRIC_NAMES
+    }
+    totals = dict.fromkeys(METRIC_NAMES, 0)
+    for key, value in cache.get_many(list(keys)).items():
+        totals[keys[key]] += value
+
+    committed = totals['committed']
+    return {
+        'window_seconds': window,
+        'committed': committed,
+        'rejected': totals['rejected'],
+        'retries': totals['retries'],
+        'conflicts': totals['conflicts'],
+        'commits_per_second': committed / window,
+        'mean_latency_ms': totals['latency_ms'] / committed if committed else None,
+    }
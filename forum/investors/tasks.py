@@ -0,0 +1,100 @@
+import logging
+
+from celery import shared_task
+from celery.exceptions import MaxRetriesExceededError
+from django.db import DatabaseError
+
+from startups.models import StartupProfile
+from users.models import User
+from .models import ViewedStartup
+from .recommendations import (
+    USER,
+    compute_recommendations,
+    get_recommendation_buffer,
+    mark_stale,
+    resolve_investors,
+)
+from .viewing import drop_cleared, get_view_buffer, parse_views, trim_history
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def flush_viewed_startups(self):
+    """
+    Writes every buffered startup view to the database with one upsert.
+
+    The buffer is drained in one go and the views are written with a single
+    `INSERT ... ON CONFLICT (user_id, startup_id) DO UPDATE SET viewed_at`.
+    Views of users or startups deleted in the meantime, and views older than
+    a clear of their user's history, are dropped, and the history of every
+    user written to is trimmed to its most recent views
+    (`VIEWED_STARTUPS_HISTORY_SIZE`). If the write fails the batch is put
+    back into the buffer (unless a newer view was recorded for it meanwhile)
+    and the task is retried.
+
+    Returns:
+        int: The number of views written.
+    """
+    buffer = get_view_buffer()
+    pending = buffer.drain()
+    if not pending:
+        return 0
+
+    views = drop_cleared(list(parse_views(pending)))
+    user_ids = set(User.objects.filter(pk__in={view[0] for view in views}).values_list('pk', flat=True))
+    startup_ids = set(
+        StartupProfile.objects.filter(pk__in={view[1] for view in views}).values_list('pk', flat=True)
+    )
+    rows = [
+        ViewedStartup(user_id=user_id, startup_id=startup_id, viewed_at=viewed_at)
+        for user_id, startup_id, viewed_at in views
+        if user_id in user_ids and startup_id in startup_ids
+    ]
+
+    try:
+        ViewedStartup.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'startup'],
+            update_fields=['viewed_at'],
+        )
+    except DatabaseError as e:
+        logger.error(f"Failed to flush {len(pending)} startup views: {e}")
+        buffer.add_many(pending, overwrite=False)
+        try:
+            raise self.retry(exc=e)
+        except MaxRetriesExceededError:
+            logger.error("Max retries exceeded while flushing startup views")
+            return 0
+
+    user_ids = {row.user_id for row in rows}
+    trimmed = trim_history(user_ids)
+    mark_stale(USER, user_ids)
+
+    logger.info(f"Flushed {len(rows)} startup views, trimmed {trimmed} old ones")
+    return len(rows)
+
+
+@shared_task
+def refresh_recommendations():
+    """
+    Recomputes the recommendations of the investors affected by the changes
+    buffered since the last run (see `investors.recommendations`).
+
+    Returns:
+        int: The number of recommendations stored.
+    """
+    pending = get_recommendation_buffer().drain()
+    if not pending:
+        return 0
+    return compute_recommendations(resolve_investors(pending))
+
+
+@shared_task
+def rebuild_recommendations():
+    """
+    Recomputes the recommendations of every investor, catching up with the
+    changes that are not tracked incrementally (e.g. deleted industries).
+    """
+    return compute_recommendations()
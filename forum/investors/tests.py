@@ -1,24 +1,55 @@
-from unittest.mock import patch
-
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
 
+from investors import subscriptions
+from investors.management.commands.benchmark_search import (
+    BACKENDS as BENCHMARK_BACKENDS,
+)
+from investors.management.commands.benchmark_search import (
+    Command as BenchmarkSearchCommand,
+)
+from investors.management.commands.bulk_index_projects import (
+    Command as BulkIndexProjectsCommand,
+)
 from investors.models import (
     InvestorPreferredIndustry,
     InvestorProfile,
+    InvestorRecommendation,
     InvestorSavedStartup,
     InvestorTrackedProject,
 )
+from investors.recommendations import compute_recommendations, get_recommendation_buffer
+from investors.tasks import refresh_recommendations
 from investors.views import (
     InvestorPreferredIndustryApiView,
     InvestorPreferredIndustryDetailApiView,
     InvestorProfileApiView,
     InvestorProfileDetailApiView,
+    InvestorRecommendationsView,
     InvestorTrackedProjectApiView,
     InvestorTrackedProjectDetailApiView,
+    SubscriptionMetricsView,
 )
-from projects.models import Project
+from projects.documents import ProjectDocument
+from projects.indexing import DELETE, INDEX, get_index_buffer, sync_projects
+from projects.models import Project, ProjectTombstone
+from projects.serializers import UpdateProjectSerializer
+from startups.documents import StartupDocument
 from startups.models import Industry, StartupProfile
 from users.models import User
 
@@ -401,6 +432,287 @@ class InvestorTrackedProjectApiTests(APITestCase):
         self.assertEqual(response.data[0]['investor']['id'], self.investor_profile.id)
         self.assertEqual(response.data[0]['project']['id'], self.project.id)
 
+    def test_get_investor_tracked_projects_with_sparse_fields(self):
+        """
+        Test: `fields` and `expand` shape the response and the query loads only that shape.
+        """
+        view = InvestorTrackedProjectApiView.as_view()
+
+        request = self.factory.get('/api/investors/investor-tracked-projects/', {
+            'fields': 'id,investor,project.title,project.startup.company_name',
+            'expand': 'project,project.startup',
+        })
+        force_authenticate(request, user=self.user)
+
+        with self.assertNumQueries(1):
+            response = view(request)
+            response.render()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{
+            'id': self.tracked_project.id,
+            'investor': self.investor_profile.id,
+            'project': {'startup': {'company_name': self.startup.company_name}, 'title': self.project.title},
+        }])
+
+    def test_funded_share_follows_subscription_changes(self):
+        """
+        Test: the project's funded share is updated on subscription create, update and delete.
+        """
+        self.tracked_project.share = 20
+        self.tracked_project.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.funded_share, Decimal('20.00'))
+
+        other_user = User.objects.create_user(
+            first_name="other",
+            last_name="investor",
+            password="testpassword",
+            email="other@example.com",
+            is_investor="True"
+        )
+        other_investor = InvestorProfile.objects.create(
+            user=other_user,
+            company_name="Other Company",
+            investment_focus="Technology",
+            contact_email="other@example.com",
+            investment_range="100000-500000"
+        )
+        InvestorTrackedProject.objects.create(investor=other_investor, project=self.project, share=Decimal('35.50'))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.funded_share, Decimal('55.50'))
+        self.assertEqual(self.project.total_funding_received(), Decimal('55500.00'))
+
+        self.tracked_project.delete()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.funded_share, Decimal('35.50'))
+
+    def test_project_update_keeps_funded_share_of_concurrent_subscription(self):
+        """
+        Test: saving a project loaded before a subscription does not overwrite the funded share it added.
+        """
+        stale_project = Project.objects.get(pk=self.project.pk)
+        self.tracked_project.share = 40
+        self.tracked_project.save()
+
+        serializer = UpdateProjectSerializer(stale_project, data={'title': "Renamed Project"}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        stale_project.save()
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.title, "Renamed Project")
+        self.assertEqual(self.project.funded_share, Decimal('40.00'))
+
+    def test_subscribe_checks_funded_share_without_aggregating(self):
+        """
+        Test: subscribing reads the funded share of the project and rejects oversubscription.
+        """
+        self.tracked_project.share = 60
+        self.tracked_project.save()
+
+        investor_user = User.objects.create_user(
+            first_name="other",
+            last_name="investor",
+            password="testpassword",
+            email="other@example.com",
+            is_investor=True
+        )
+        other_investor = InvestorProfile.objects.create(
+            user=investor_user,
+            company_name="Other Company",
+            investment_focus="Technology",
+            contact_email="other@example.com",
+            investment_range="100000-500000"
+        )
+
+        self.client.force_authenticate(user=investor_user)
+        response = self.client.post(reverse('subscribe'), {
+            'investor': other_investor.id, 'project': self.project.id, 'share': 50
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('subscribe'), {
+            'investor': other_investor.id, 'project': self.project.id, 'share': 30
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['remaining_funding'], Decimal('10.00'))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.funded_share, Decimal('90.00'))
+
+    def test_subscribe_retries_serialization_failures(self):
+        """
+        Test: a subscription aborted by a serialization failure is run again and counted in the metrics.
+        """
+        failure = OperationalError("could not serialize access due to concurrent update")
+        failure.__cause__ = Exception("serialization failure")
+        failure.__cause__.pgcode = '40001'
+        real_subscribe = subscriptions._subscribe
+        calls = []
+
+        def flaky_subscribe(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise failure
+            return real_subscribe(*args)
+
+        cache.clear()
+        self.tracked_project.delete()
+        with patch('investors.subscriptions._subscribe', side_effect=flaky_subscribe), \
+                patch('investors.subscriptions.transaction.get_connection') as get_connection, \
+                patch('investors.subscriptions.retry_delay', return_value=0) as retry_delay:
+            get_connection.return_value.in_atomic_block = False
+            subscription, remaining = subscriptions.subscribe(self.investor_profile, self.project.id, Decimal('40'))
+
+        self.assertEqual(len(calls), 2)
+        retry_delay.assert_called_once_with(1)
+        self.assertEqual(subscription.share, Decimal('40'))
+        self.assertEqual(remaining, Decimal('60.00'))
+
+        metrics = subscriptions.get_metrics()
+        self.assertEqual(metrics['committed'], 1)
+        self.assertEqual(metrics['retries'], 1)
+        self.assertEqual(metrics['conflicts'], 0)
+
+    def test_bulk_subscribe_returns_per_item_results(self):
+        """
+        Test: a bulk subscription saves the accepted items together and reports the rejected ones.
+        """
+        projects = [
+            Project.objects.create(
+                startup=self.startup,
+                title=f"Bulk Project {i}",
+                description="A bulk subscribed project.",
+                funding_goal=100000.00,
+                funding_needed=100000.00,
+                status="Seeking Funding",
+                duration=12
+            )
+            for i in range(3)
+        ]
+        Project.objects.filter(pk=projects[2].pk).update(funded_share=Decimal('90.00'))
+
+        self.client.force_authenticate(user=self.user)
+        with patch('investors.subscriptions.enqueue_projects') as enqueue_projects:
+            response = self.client.post(reverse('subscribe-bulk'), {'items': [
+                {'project': projects[0].id, 'share': '30.00'},
+                {'project': projects[1].id},
+                {'project': self.project.id, 'share': '5.00'},
+                {'project': projects[2].id, 'share': '20.00'},
+                {'project': 999999, 'share': '5.00'},
+            ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['created', 'created', 'rejected', 'rejected', 'rejected']
+        )
+        self.assertEqual(response.data['results'][0]['remaining_funding'], Decimal('70.00'))
+        self.assertEqual(response.data['results'][4]['error'], "Project not found.")
+        enqueue_projects.assert_called_once_with([projects[0].id, projects[1].id])
+
+        for project, funded_share in zip(projects, ['30.00', '0.00', '90.00']):
+            project.refresh_from_db()
+            self.assertEqual(project.funded_share, Decimal(funded_share))
+        self.assertEqual(
+            InvestorTrackedProject.objects.filter(investor=self.investor_profile).count(), 3
+        )
+
+    def test_bulk_subscribe_query_count_does_not_grow_with_items(self):
+        """
+        Test: the funding state is read in one query and the subscriptions are inserted in one.
+        """
+        projects = [
+            Project.objects.create(
+                startup=self.startup,
+                title=f"Bulk Project {i}",
+                description="A bulk subscribed project.",
+                funding_goal=100000.00,
+                funding_needed=100000.00,
+                status="Seeking Funding",
+                duration=12
+            )
+            for i in range(20)
+        ]
+        items = [{'project': project.id, 'share': Decimal('1.00')} for project in projects]
+
+        # Savepoint, lock + read, tracked projects, insert, funded shares update, release.
+        with patch('investors.subscriptions.enqueue_projects'), self.assertNumQueries(6):
+            results = subscriptions.bulk_subscribe(self.investor_profile, items)
+
+        self.assertTrue(all(result['status'] == subscriptions.CREATED for result in results))
+
+    def test_subscription_metrics_are_admin_only(self):
+        """
+        Test: the subscription metrics endpoint reports the throughput to admins only.
+        """
+        view = SubscriptionMetricsView.as_view()
+        cache.clear()
+        with self.assertRaises(subscriptions.FundingExceeded):
+            subscriptions.subscribe(self.investor_profile, self.project.id, Decimal('101'))
+
+        request = self.factory.get('/api/investors/subscribe/metrics/')
+        force_authenticate(request, user=self.user)
+        self.assertEqual(view(request).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_superuser(email="admin@example.com", password="testpassword")
+        request = self.factory.get('/api/investors/subscribe/metrics/')
+        force_authenticate(request, user=admin)
+        response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rejected'], 1)
+        self.assertEqual(response.data['committed'], 0)
+
+    def test_portfolio_summary_is_cached_until_it_changes(self):
+        """
+        Test: the portfolio is computed in three queries, then served from the cache until a subscription changes.
+        """
+        cache.clear()
+        project = Project.objects.create(
+            startup=self.startup,
+            title="Project Two",
+            description="Another test project.",
+            funding_goal=200000.00,
+            funding_needed=150000.00,
+            status="In Progress",
+            duration=18
+        )
+        InvestorSavedStartup.objects.create(investor=self.investor_profile, startup=self.startup)
+        with self.captureOnCommitCallbacks(execute=True):
+            subscriptions.subscribe(self.investor_profile, project.id, Decimal('12.50'))
+
+        def get_portfolio():
+            return self.client.get(reverse('investor-portfolio'))
+
+        self.client.force_authenticate(user=self.user)
+        # Status totals, top holdings, saved startups.
+        with self.assertNumQueries(3):
+            response = get_portfolio()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['tracked_projects'], 2)
+        self.assertEqual(response.data['saved_startups'], 1)
+        self.assertEqual(response.data['committed_capital'], Decimal('25000.00'))
+        self.assertEqual(response.data['by_status']['Seeking Funding']['projects'], 1)
+        self.assertEqual(response.data['by_status']['In Progress']['committed_capital'], Decimal('25000.00'))
+        self.assertEqual(response.data['by_status']['Completed']['projects'], 0)
+        self.assertEqual(
+            [(holding['project'], holding['committed_capital']) for holding in response.data['top_holdings']],
+            [(project.id, Decimal('25000.00'))]
+        )
+
+        with self.assertNumQueries(0):
+            get_portfolio()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tracked_project.share = Decimal('50.00')
+            self.tracked_project.save()
+        response = get_portfolio()
+        self.assertEqual(response.data['committed_capital'], Decimal('75000.00'))
+        self.assertEqual(response.data['top_holdings'][0]['project'], self.project.id)
+
     def test_create_investor_tracked_project(self):
         """
         Test: Create a new tracked project.
@@ -471,7 +783,8 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["count"], 0)
 
     def test_get_saved_startups_with_no_investor_profile_returns_404(self):
         self.client.force_authenticate(user=self.user3)
@@ -483,7 +796,7 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
     def test_get_saved_startups_unexpected_exception_returns_500(self):
         self.client.force_authenticate(user=self.user1)
         with patch(
-            "investors.models.InvestorProfile.objects.get",
+            "investors.views.optimize_queryset",
             side_effect=Exception("Unexpected error"),
         ):
             response = self.client.get(self.url)
@@ -498,8 +811,8 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
             {"search": "HealthTech", "search_field": "company_name"},
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["company_name"], "HealthTech Startup")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["company_name"], "HealthTech Startup")
 
     def test_get_saved_startups_sorted_descending_returns_200(self):
         self.client.force_authenticate(user=self.user1)
@@ -509,9 +822,9 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
             {"sort": "-company_name"},
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        self.assertEqual(response.data[0]["company_name"], "HealthTech Startup")
-        self.assertEqual(response.data[1]["company_name"], "EduTech Startup")
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["company_name"], "HealthTech Startup")
+        self.assertEqual(response.data["results"][1]["company_name"], "EduTech Startup")
 
     def test_get_saved_startups_with_default_search_field_returns_200(self):
         self.client.force_authenticate(user=self.user1)
@@ -521,8 +834,8 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
             {"search": "HealthTech"},
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["company_name"], "HealthTech Startup")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["company_name"], "HealthTech Startup")
 
     def test_get_saved_startups_filtered_by_description_returns_200(self):
         self.client.force_authenticate(user=self.user1)
@@ -532,17 +845,17 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
             {"search": "healthcare technology", "search_field": "description"},
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["description"], "A healthcare technology startup.")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["description"], "A healthcare technology startup.")
 
     def test_get_saved_startups_without_search_or_sort_returns_200(self):
         self.client.force_authenticate(user=self.user1)
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        self.assertEqual(response.data[0]["company_name"], "HealthTech Startup")
-        self.assertEqual(response.data[1]["company_name"], "EduTech Startup")
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["company_name"], "HealthTech Startup")
+        self.assertEqual(response.data["results"][1]["company_name"], "EduTech Startup")
 
     def test_get_saved_startups_with_invalid_search_field_returns_200(self):
         self.client.force_authenticate(user=self.user1)
@@ -552,9 +865,9 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
             {"search": "HealthTech", "search_field": "invalid_field"},
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # Should return all startups since the search field is invalid
-        self.assertEqual(response.data[0]["company_name"], "HealthTech Startup")
-        self.assertEqual(response.data[1]["company_name"], "EduTech Startup")
+        self.assertEqual(len(response.data["results"]), 2)  # Should return all startups since the search field is invalid
+        self.assertEqual(response.data["results"][0]["company_name"], "HealthTech Startup")
+        self.assertEqual(response.data["results"][1]["company_name"], "EduTech Startup")
 
     def test_get_saved_startups_with_invalid_sort_field_returns_200(self):
         self.client.force_authenticate(user=self.user1)
@@ -564,9 +877,32 @@ class SavedStartupsApiViewTests(BaseSavedStartupsAPITestCase):
             {"sort": "invalid_field"},
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        self.assertEqual(response.data[0]["company_name"], "HealthTech Startup")
-        self.assertEqual(response.data[1]["company_name"], "EduTech Startup")
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["company_name"], "HealthTech Startup")
+        self.assertEqual(response.data["results"][1]["company_name"], "EduTech Startup")
+
+    def test_get_saved_startups_pages_with_cursor_and_counts_once(self):
+        self.client.force_authenticate(user=self.user1)
+
+        # Page with its total count, prefetched industries.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"sort": "company_name", "page_size": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([item["company_name"] for item in response.data["results"]], ["EduTech Startup"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["count"])
+        self.assertEqual([item["company_name"] for item in response.data["results"]], ["HealthTech Startup"])
+        self.assertIsNone(response.data["next"])
+
+    def test_get_saved_startups_ignores_fields_outside_the_whitelist(self):
+        self.client.force_authenticate(user=self.user1)
+
+        response = self.client.get(self.url, {"search": "healthtech", "search_field": "contact_email"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
 
 
 class CreateDeleteSavedStartupApiViewTests(BaseSavedStartupsAPITestCase):
@@ -584,8 +920,8 @@ class CreateDeleteSavedStartupApiViewTests(BaseSavedStartupsAPITestCase):
 
         response = self.client.get(self.get_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["company_name"], "HealthTech Startup")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["company_name"], "HealthTech Startup")
 
         url = reverse('save-delete-startup', kwargs={'startup_id': self.startup1.id})
         response = self.client.post(url)
@@ -595,7 +931,7 @@ class CreateDeleteSavedStartupApiViewTests(BaseSavedStartupsAPITestCase):
         saved_startup.delete()
         response = self.client.get(self.get_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data["results"], [])
 
     def test_save_non_existent_startup_profile_returns_404(self):
         self.client.force_authenticate(user=self.user1)
@@ -628,7 +964,7 @@ class CreateDeleteSavedStartupApiViewTests(BaseSavedStartupsAPITestCase):
         self.client.force_authenticate(user=self.user1)
 
         with patch(
-                "investors.models.InvestorProfile.objects.get",
+                "startups.models.StartupProfile.objects.get",
                 side_effect=Exception("Unexpected error")
         ):
             url = reverse('save-delete-startup', kwargs={'startup_id': self.startup1.id})
@@ -640,7 +976,7 @@ class CreateDeleteSavedStartupApiViewTests(BaseSavedStartupsAPITestCase):
         self.client.force_authenticate(user=self.user1)
 
         with patch(
-                "investors.models.InvestorProfile.objects.get",
+                "startups.models.StartupProfile.objects.get",
                 side_effect=Exception("Unexpected error")
         ):
             url = reverse('save-delete-startup', kwargs={'startup_id': self.startup1.id})
@@ -703,3 +1039,340 @@ class CreateDeleteSavedStartupApiViewTests(BaseSavedStartupsAPITestCase):
                 startup=self.startup3
             ).exists()
         )
+
+
+class InvestorRecommendationTests(BaseSavedStartupsAPITestCase):
+
+    def setUp(self):
+        self.health = Industry.objects.create(name="Health")
+        self.education = Industry.objects.create(name="Education")
+        self.startup1.industries.add(self.health)
+        self.startup2.industries.add(self.education)
+        self.startup3.industries.add(self.health, self.education)
+        self.startup4 = StartupProfile.objects.create(
+            user=User.objects.create_user(email='startup3@example.com', password='SecurePassword123'),
+            company_name="Clinic Startup",
+            contact_email="clinic@example.com"
+        )
+        self.startup4.industries.add(self.health)
+        InvestorPreferredIndustry.objects.create(investor=self.investor_profile2, industry=self.health)
+        get_recommendation_buffer().drain()
+        self.factory = APIRequestFactory()
+
+    def recommended(self, investor):
+        return list(InvestorRecommendation.objects.filter(investor=investor).values_list('startup', flat=True))
+
+    def test_recommendations_blend_preferences_and_saved_startups(self):
+        """
+        Test: investors get the startups closest to their preferred and saved industries, saved ones excluded.
+        """
+        compute_recommendations()
+
+        # Preferences only: exact industry matches first, ties broken by ID.
+        self.assertEqual(self.recommended(self.investor_profile2), [
+            self.startup1.pk, self.startup4.pk, self.startup3.pk
+        ])
+        # No preferences: the saved Health and Education startups point to the one having both.
+        self.assertEqual(self.recommended(self.investor_profile1), [self.startup3.pk, self.startup4.pk])
+
+        view = InvestorRecommendationsView.as_view()
+        request = self.factory.get('/api/investors/recommendations/')
+        force_authenticate(request, user=self.user1)
+        with self.assertNumQueries(1):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['rank'] for item in response.data], [1, 2])
+        self.assertEqual(response.data[0]['startup']['company_name'], "Untracked Startup")
+
+    def test_preference_change_refreshes_only_that_investor(self):
+        """
+        Test: a preference change is buffered and only the affected investor is recomputed.
+        """
+        compute_recommendations()
+        computed_at = InvestorRecommendation.objects.filter(investor=self.investor_profile2).first().computed_at
+
+        with patch('investors.tasks.refresh_recommendations.apply_async') as apply_async, \
+                self.captureOnCommitCallbacks(execute=True):
+            InvestorPreferredIndustry.objects.create(investor=self.investor_profile1, industry=self.education)
+        apply_async.assert_called_once()
+
+        with patch('investors.tasks.compute_recommendations', wraps=compute_recommendations) as compute:
+            refresh_recommendations()
+        compute.assert_called_once_with({self.investor_profile1.pk})
+
+        self.assertEqual(self.recommended(self.investor_profile1), [self.startup3.pk, self.startup4.pk])
+        self.assertEqual(
+            InvestorRecommendation.objects.filter(investor=self.investor_profile2).first().computed_at, computed_at
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', "Row locks need a database with concurrent writers")
+class SubscriptionConcurrencyTests(TransactionTestCase):
+    INVESTORS = 300
+    WORKERS = 32
+
+    def setUp(self):
+        owner = User.objects.create_user(email="owner@example.com", password="testpassword", is_startup=True)
+        startup = StartupProfile.objects.create(
+            user=owner, company_name="Contended Startup", contact_email="contended@example.com"
+        )
+        self.project = Project.objects.create(
+            startup=startup,
+            title="Contended Project",
+            description="Everyone wants a share.",
+            funding_goal=100000.00,
+            funding_needed=100000.00,
+            status="Seeking Funding",
+            duration=12
+        )
+
+        password = make_password("testpassword")
+        users = User.objects.bulk_create(
+            User(email=f"investor{i}@example.com", password=password, is_investor=True)
+            for i in range(self.INVESTORS)
+        )
+        self.investors = InvestorProfile.objects.bulk_create(
+            InvestorProfile(
+                user=user,
+                company_name=f"Investor {i}",
+                investment_focus="Technology",
+                contact_email=f"investor{i}@example.com",
+                investment_range="100000-500000"
+            )
+            for i, user in enumerate(users)
+        )
+
+    def test_parallel_subscriptions_never_oversubscribe(self):
+        """
+        Test: hundreds of parallel subscriptions to one project never fund it past 100% and are counted in the metrics.
+        """
+        def subscribe(investor):
+            try:
+                subscriptions.subscribe(investor, self.project.id, Decimal('0.75'))
+                return True
+            except subscriptions.FundingExceeded:
+                return False
+            finally:
+                connections.close_all()
+
+        cache.clear()
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(subscribe, self.investors))
+
+        committed = sum(results)
+        self.project.refresh_from_db()
+        total = InvestorTrackedProject.objects.filter(project=self.project).aggregate(total=Sum('share'))['total']
+
+        # 133 shares of 0.75% fit in 100%.
+        self.assertEqual(committed, 133)
+        self.assertEqual(total, Decimal('99.75'))
+        self.assertEqual(self.project.funded_share, total)
+        metrics = subscriptions.get_metrics()
+        self.assertEqual(metrics['committed'], committed)
+        self.assertEqual(metrics['rejected'], self.INVESTORS - committed)
+        self.assertIsNotNone(metrics['mean_latency_ms'])
+
+
+class BulkIndexProjectsAliasTests(SimpleTestCase):
+
+    def test_swap_moves_alias_in_one_request(self):
+        """
+        Test: the alias is removed from the old index and added to the new one atomically.
+        """
+        client = MagicMock()
+        client.indices.exists_alias.return_value = True
+        client.indices.get_alias.return_value = {'projects-20250101000000': {}}
+
+        previous = BulkIndexProjectsCommand().swap_alias(client, 'projects', 'projects-20250201000000')
+
+        self.assertEqual(previous, ['projects-20250101000000'])
+        client.indices.update_aliases.assert_called_once_with(actions=[
+            {'remove': {'index': 'projects-20250101000000', 'alias': 'projects'}},
+            {'add': {'index': 'projects-20250201000000', 'alias': 'projects'}},
+        ])
+
+    def test_swap_replaces_legacy_concrete_index(self):
+        """
+        Test: a concrete `projects` index from before aliases is dropped in the same request.
+        """
+        client = MagicMock()
+        client.indices.exists_alias.return_value = False
+        client.indices.exists.return_value = True
+
+        previous = BulkIndexProjectsCommand().swap_alias(client, 'projects', 'projects-20250201000000')
+
+        self.assertEqual(previous, [])
+        client.indices.update_aliases.assert_called_once_with(actions=[
+            {'remove_index': {'index': 'projects'}},
+            {'add': {'index': 'projects-20250201000000', 'alias': 'projects'}},
+        ])
+
+
+@patch('projects.tasks.flush_search_index')
+class BulkIndexProjectsCatchUpTests(TestCase):
+
+    def test_projects_deleted_mid_reindex_are_deleted_from_the_new_index(self, flush_task):
+        """
+        Test: a project deleted while the new index loads is deleted from it after the swap,
+        even once the incremental sync has queued its tombstone.
+        """
+        user = User.objects.create_user(email="reindex@example.com", password="testpassword")
+        startup = StartupProfile.objects.create(
+            user=user,
+            company_name="Reindex Startup",
+            description="A startup.",
+            contact_email="reindex@example.com"
+        )
+        _, deleted = [
+            Project.objects.create(
+                startup=startup,
+                title=f"Project {i}",
+                description="A project.",
+                funding_goal=100000.00,
+                funding_needed=100000.00,
+                status="Seeking Funding",
+                duration=12
+            )
+            for i in range(2)
+        ]
+        deleted_id = deleted.id
+        buffer = get_index_buffer()
+        buffer.drain()
+
+        def load(*args):
+            deleted.delete()
+            # The minutely incremental sync runs and flushes the delete to the old index.
+            sync_projects()
+            buffer.drain()
+            return 2, 0
+
+        command = BulkIndexProjectsCommand(stdout=StringIO())
+        with patch('investors.management.commands.bulk_index_projects.es_connections'), \
+                patch.object(ProjectDocument._index, 'clone'), \
+                patch.object(command, 'swap_alias', return_value=[]), \
+                patch.object(command, 'load', side_effect=load):
+            command.handle(workers=1, slices=None, chunk_size=500, threads=1, keep_old=False, incremental=False)
+
+        self.assertEqual(buffer.drain(), {f'project:{deleted_id}': DELETE})
+        self.assertTrue(ProjectTombstone.objects.filter(project_id=deleted_id).exists())
+
+        # Once the reindex is over the next sync consumes the tombstone.
+        sync_projects()
+        self.assertFalse(ProjectTombstone.objects.exists())
+
+
+@patch('projects.tasks.flush_search_index')
+class BulkIndexStartupsCommandTests(TestCase):
+
+    def test_startups_are_loaded_into_a_mapped_index_and_changes_replayed(self, flush_task):
+        """
+        Test: every startup is loaded into a new index created with the document mapping, and the startups
+        renamed, created or deleted while loading are queued once the alias points to it.
+        """
+        startups = [
+            StartupProfile.objects.create(
+                user=User.objects.create_user(email=f"startup{i}@example.com", password="testpassword"),
+                company_name=f"Startup {i}",
+                description="A startup.",
+                contact_email=f"startup{i}@example.com"
+            )
+            for i in range(3)
+        ]
+        renamed, deleted, _ = startups
+        deleted_id = deleted.id
+        buffer = get_index_buffer()
+        buffer.drain()
+
+        def load(client, actions, **kwargs):
+            documents = list(actions)
+            renamed.company_name = "Renamed Startup"
+            renamed.save()
+            deleted.delete()
+            created = StartupProfile.objects.create(
+                user=User.objects.create_user(email="created@example.com", password="testpassword"),
+                company_name="Created Startup",
+                description="A startup.",
+                contact_email="created@example.com"
+            )
+            load.created_id = created.id
+            buffer.drain()
+            return len(documents), []
+
+        command = 'investors.management.commands.bulk_index_startups'
+        with patch(f'{command}.es_connections'), \
+                patch(f'{command}.bulk', side_effect=load) as bulk, \
+                patch(f'{command}.BulkIndexProjectsCommand.swap_alias', return_value=['startups']), \
+                patch.object(StartupDocument._index, 'clone') as clone:
+            call_command('bulk_index_startups', stdout=StringIO())
+
+        clone.return_value.create.assert_called_once()
+        self.assertEqual(bulk.call_count, 1)
+        self.assertEqual(buffer.drain(), {
+            f'startup:{renamed.id}': INDEX,
+            f'startup:{load.created_id}': INDEX,
+            f'startup:{deleted_id}': DELETE,
+        })
+
+
+class BenchmarkSearchCommandTests(APITestCase):
+
+    def test_benchmark_reports_percentiles_per_scenario(self):
+        """
+        Test: the benchmark replays the generated query mix on the database backend and writes JSON results.
+        """
+        user = User.objects.create_user(email="bench@example.com", password="password123", is_startup=True)
+        startup = StartupProfile.objects.create(
+            user=user, company_name="Bench Startup", contact_email="bench@startup.com"
+        )
+        for title in ("Solar Power Grid", "Water Filter Network", "Payment Gateway"):
+            Project.objects.create(
+                startup=startup,
+                title=title,
+                description="Benchmark project.",
+                funding_goal=100000.00,
+                funding_needed=50000.00,
+                status="Seeking Funding",
+                duration=12
+            )
+
+        with tempfile.NamedTemporaryFile(mode='r', suffix='.json') as output:
+            call_command('benchmark_search', backend='database', requests=10, warmup=0,
+                         output=output.name, stdout=StringIO())
+            results = json.load(output)
+
+        self.assertEqual(results['requests'], 10)
+        self.assertEqual(results['overall']['errors'], 0)
+        self.assertEqual(
+            set(results['scenarios']), {'fuzzy_text', 'status_filter', 'empty_query', 'faceted_text'}
+        )
+        self.assertIsNotNone(results['overall']['latency_ms']['p99'])
+
+    def test_fuzzy_queries_expect_distinct_titles(self):
+        """
+        Test: fuzzy queries are built once per distinct title and hit any project with that title.
+        """
+        user = User.objects.create_user(email="bench@example.com", password="password123", is_startup=True)
+        startup = StartupProfile.objects.create(
+            user=user, company_name="Bench Startup", contact_email="bench@startup.com"
+        )
+        for title in ("Solar Power Grid", "Solar Power Grid", "Payment Gateway"):
+            Project.objects.create(
+                startup=startup,
+                title=title,
+                description="Benchmark project.",
+                funding_goal=100000.00,
+                funding_needed=50000.00,
+                status="Seeking Funding",
+                duration=12
+            )
+
+        command = BenchmarkSearchCommand()
+        queries = [query for query in command.generate_queries(10) if query['scenario'] == 'fuzzy_text']
+
+        self.assertEqual(
+            {query['expected_title'] for query in queries[:2]}, {"Solar Power Grid", "Payment Gateway"}
+        )
+        with override_settings(SEARCH_BACKEND=BENCHMARK_BACKENDS['database']):
+            sample = command.run_query({'params': {'q': "Solar Power Grid"}, 'expected_title': "Solar Power Grid"})
+        self.assertTrue(sample['hit'])
@@ -1,18 +1,22 @@
 from django.urls import path
 
 from .views import (
+    BulkSubscriptionCreateView,
     ClearViewedStartups,
     CreateDeleteSavedStartupApiView,
+    InvestorPortfolioView,
     InvestorPreferredIndustryApiView,
     InvestorPreferredIndustryDetailApiView,
     InvestorProfileApiView,
     InvestorProfileDetailApiView,
+    InvestorRecommendationsView,
     InvestorTrackedProjectApiView,
     InvestorTrackedProjectDetailApiView,
     LogStartupView,
     RecentlyViewedStartupsView,
     SavedStartupsApiView,
     SubscriptionCreateView,
+    SubscriptionMetricsView,
 )
 
 urlpatterns = [
@@ -37,6 +41,14 @@ urlpatterns = [
 
     # Investor Subscription
     path('subscribe/', SubscriptionCreateView.as_view(), name='subscribe'),
+    path('subscribe/bulk/', BulkSubscriptionCreateView.as_view(), name='subscribe-bulk'),
+    path('subscribe/metrics/', SubscriptionMetricsView.as_view(), name='subscribe-metrics'),
+
+    # Investor Portfolio
+    path('me/portfolio/', InvestorPortfolioView.as_view(), name='investor-portfolio'),
+
+    # Investor Recommendations
+    path('recommendations/', InvestorRecommendationsView.as_view(), name='investor-recommendations'),
 
     # Investor Viewed Startups
     path('viewed-startups/', RecentlyViewedStartupsView.as_view(), name='viewed-startups'),
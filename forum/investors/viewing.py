@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from forum.buffers import get_buffer
+from .models import ViewedStartup
+
+BUFFER_NAME = 'viewed-startups'
+SCHEDULED_FLUSH_KEY = 'viewed-startups:flush-scheduled'
+CLEARED_KEY = 'viewed-startups:cleared:{}'
+# Outlives any buffered view, flush retries included.
+CLEARED_TIMEOUT = 60 * 60
+
+
+def get_view_buffer():
+    """
+    Buffer of startup views waiting to be written to the database.
+
+    Entries are keyed by `<user id>:<startup id>` and hold the time of the
+    latest view, so an investor opening the same startup many times between
+    two flushes costs a single row write.
+    """
+    return get_buffer(BUFFER_NAME)
+
+
+def record_view(user_id, startup_id, viewed_at=None):
+    """
+    Record that a user viewed a startup, without touching the database.
+
+    A full batch is flushed right away; otherwise a single delayed flush is
+    scheduled per window, picking up every view recorded in the meantime.
+    """
+    from .tasks import flush_viewed_startups
+
+    viewed_at = viewed_at or timezone.now()
+    buffer = get_view_buffer()
+    buffer.add_many({f'{user_id}:{startup_id}': viewed_at.isoformat()})
+
+    batch_size = getattr(settings, 'VIEWED_STARTUPS_BATCH_SIZE', 1000)
+    interval = getattr(settings, 'VIEWED_STARTUPS_FLUSH_INTERVAL', 5)
+
+    if len(buffer) >= batch_size:
+        flush_viewed_startups.delay()
+    elif cache.add(SCHEDULED_FLUSH_KEY, True, timeout=interval):
+        flush_viewed_startups.apply_async(countdown=interval)
+
+
+def parse_views(entries):
+    """
+    Turn drained buffer entries into `(user id, startup id, viewed at)` tuples.
+    """
+    for key, value in entries.items():
+        user_id, startup_id = key.split(':', 1)
+        yield int(user_id), int(startup_id), datetime.fromisoformat(value)
+
+
+def clear_history(user_id):
+    """
+    Delete the viewing history of a user, including the views still waiting
+    in the buffer: those are dropped by the next flush, which skips views not
+    newer than the time of the clear. The buffer itself is left to the worker.
+
+    Returns:
+        int: The number of views deleted from the database.
+    """
+    cache.set(CLEARED_KEY.format(user_id), timezone.now().isoformat(), timeout=CLEARED_TIMEOUT)
+    deleted, _ = ViewedStartup.objects.filter(user_id=user_id).delete()
+    return deleted
+
+
+def drop_cleared(views):
+    """
+    Filter out the `(user id, startup id, viewed at)` views recorded before
+    their user cleared the history.
+    """
+    user_ids = {user_id for user_id, _, _ in views}
+    cleared = cache.get_many([CLEARED_KEY.format(user_id) for user_id in user_ids])
+    cleared_at = {
+        user_id: datetime.fromisoformat(cleared[CLEARED_KEY.format(user_id)])
+        for user_id in user_ids if CLEARED_KEY.format(user_id) in cleared
+    }
+    return [
+        view for view in views
+        if view[0] not in cleared_at or view[2] > cleared_at[view[0]]
+    ]
+
+
+def trim_history(user_ids):
+    """
+    Delete the views of `user_ids` beyond their `VIEWED_STARTUPS_HISTORY_SIZE`
+    most recent ones.
+
+    Returns:
+        int: The number of views deleted.
+    """
+    size = getattr(settings, 'VIEWED_STARTUPS_HISTORY_SIZE', 50)
+    stale = list(
+        ViewedStartup.objects.filter(user_id__in=user_ids)
+        .annotate(position=Window(
+            RowNumber(),
+            partition_by=F('user_id'),
+            order_by=[F('viewed_at').desc(), F('id').desc()],
+        ))
+        .filter(position__gt=size)
+        .values_list('pk', flat=True)
+    )
+    if not stale:
+        return 0
+
+    deleted, _ = ViewedStartup.objects.filter(pk__in=stale).delete()
+    return deleted
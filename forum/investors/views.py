@@ -1,39 +1,51 @@
 import logging
-from decimal import Decimal
 
-from django.db import IntegrityError, transaction
-from django.db.models import Sum
-from django.utils import timezone
+from django.db import IntegrityError
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import generics, permissions, status
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from forum.serializers import EXPAND_PARAMETER, FIELDS_PARAMETER, optimize_queryset
 from startups.models import StartupProfile
 from startups.serializers import StartupProfileSerializer
 from users.permissions import IsInvestor
 from .models import (
     InvestorPreferredIndustry,
     InvestorProfile,
+    InvestorRecommendation,
     InvestorSavedStartup,
     InvestorTrackedProject,
     ViewedStartup,
 )
+from .pagination import SavedStartupCursorPagination, ViewedStartupCursorPagination
+from .portfolio import get_portfolio
 from .serializers import (
+    BulkSubscriptionSerializer,
     CreateInvestorPreferredIndustrySerializer,
     CreateInvestorProfileSerializer,
     CreateInvestorSavedStartupSerializer,
     CreateInvestorTrackedProjectSerializer,
     InvestorPreferredIndustrySerializer,
     InvestorProfileSerializer,
+    InvestorRecommendationSerializer,
     InvestorTrackedProjectSerializer,
     SubscriptionSerializer,
     ViewedStartupSerializer,
 )
+from .subscriptions import (
+    CREATED,
+    AlreadySubscribed,
+    FundingExceeded,
+    bulk_subscribe,
+    get_metrics,
+    subscribe,
+)
+from .viewing import clear_history, record_view
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +64,7 @@ class InvestorProfileApiView(APIView):
         operation_summary="Retrieve all investor profiles",
         operation_description="Get a list of all investor profiles in the system.",
         tags=["Investors"],
+        manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
         responses={200: InvestorProfileSerializer(many=True)}
     )
     def get(self, request):
@@ -61,8 +74,11 @@ class InvestorProfileApiView(APIView):
         Responses:
             - 200 OK: Successfully returns a list of investor profiles.
         """
-        profiles = InvestorProfile.objects.all()
-        serializer = InvestorProfileSerializer(profiles, many=True)
+        context = {'request': request}
+        profiles = optimize_queryset(
+            InvestorProfile.objects.all(), InvestorProfileSerializer(many=True, context=context)
+        )
+        serializer = InvestorProfileSerializer(profiles, many=True, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -108,18 +124,19 @@ class InvestorProfileDetailApiView(APIView):
     - DELETE: Delete an investor profile.
     """
 
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         """
         Retrieve an investor profile by its ID.
 
         Args:
             - pk (int): The primary key of the investor profile.
+            - queryset (QuerySet): The queryset to look it up in, all investor profiles by default.
 
         Returns:
             - InvestorProfile: The investor profile instance if found.
             - Response: A 404 error response if the profile does not exist.
         """
-        return get_object_or_404(InvestorProfile, pk=pk)
+        return get_object_or_404(InvestorProfile if queryset is None else queryset, pk=pk)
 
     @swagger_auto_schema(
         operation_summary="Retrieve an investor profile",
@@ -127,7 +144,9 @@ class InvestorProfileDetailApiView(APIView):
         tags=["Investors"],
         manual_parameters=[
             openapi.Parameter('pk', openapi.IN_PATH, description="ID of the investor profile",
-                              type=openapi.TYPE_INTEGER)
+                              type=openapi.TYPE_INTEGER),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
         responses={
             200: InvestorProfileSerializer,
@@ -145,10 +164,12 @@ class InvestorProfileDetailApiView(APIView):
             - 200 OK: Successfully retrieves the investor profile details.
             - 404 Not Found: If the investor profile does not exist.
         """
-        profile = self.get_object(pk)
+        context = {'request': request}
+        queryset = optimize_queryset(InvestorProfile.objects.all(), InvestorProfileSerializer(context=context))
+        profile = self.get_object(pk, queryset)
         if isinstance(profile, Response):  # Handle case where `get_object` returned a 404 response
             return profile
-        serializer = InvestorProfileSerializer(profile)
+        serializer = InvestorProfileSerializer(profile, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -235,6 +256,7 @@ class InvestorPreferredIndustryApiView(APIView):
         operation_summary="Retrieve all preferred industries",
         operation_description="Get a list of all investor preferred industries.",
         tags=["Investors"],
+        manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
         responses={200: InvestorPreferredIndustrySerializer(many=True)}
     )
     def get(self, request):
@@ -244,8 +266,11 @@ class InvestorPreferredIndustryApiView(APIView):
         Responses:
             - 200 OK: Successfully returns a list of preferred industries.
         """
-        industries = InvestorPreferredIndustry.objects.all()
-        serializer = InvestorPreferredIndustrySerializer(industries, many=True)
+        context = {'request': request}
+        industries = optimize_queryset(
+            InvestorPreferredIndustry.objects.all(), InvestorPreferredIndustrySerializer(many=True, context=context)
+        )
+        serializer = InvestorPreferredIndustrySerializer(industries, many=True, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -287,18 +312,19 @@ class InvestorPreferredIndustryDetailApiView(APIView):
     - DELETE: Delete a preferred industry.
     """
 
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         """
         Retrieve a preferred industry by its ID.
 
         Args:
             - pk (int): The primary key of the preferred industry.
+            - queryset (QuerySet): The queryset to look it up in, all preferred industries by default.
 
         Returns:
             - InvestorPreferredIndustry: The preferred industry instance if found.
             - Response: A 404 error response if the industry does not exist.
         """
-        return get_object_or_404(InvestorPreferredIndustry, pk=pk)
+        return get_object_or_404(InvestorPreferredIndustry if queryset is None else queryset, pk=pk)
 
     @swagger_auto_schema(
         operation_summary="Retrieve a preferred industry",
@@ -311,7 +337,9 @@ class InvestorPreferredIndustryDetailApiView(APIView):
                 description="ID of the preferred industry",
                 type=openapi.TYPE_INTEGER,
                 required=True,
-            )
+            ),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
         responses={
             200: InvestorPreferredIndustrySerializer,
@@ -329,10 +357,14 @@ class InvestorPreferredIndustryDetailApiView(APIView):
             - 200 OK: Successfully retrieves the preferred industry details.
             - 404 Not Found: If the preferred industry does not exist.
         """
-        industry = self.get_object(pk)
+        context = {'request': request}
+        queryset = optimize_queryset(
+            InvestorPreferredIndustry.objects.all(), InvestorPreferredIndustrySerializer(context=context)
+        )
+        industry = self.get_object(pk, queryset)
         if isinstance(industry, Response):  # Handle case where `get_object` returned a 404 response
             return industry
-        serializer = InvestorPreferredIndustrySerializer(industry)
+        serializer = InvestorPreferredIndustrySerializer(industry, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -385,6 +417,7 @@ class InvestorTrackedProjectApiView(APIView):
         operation_summary="Retrieve all tracked projects",
         operation_description="Get a list of all projects tracked by investors.",
         tags=["Investors"],
+        manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
         responses={200: InvestorTrackedProjectSerializer(many=True)}
     )
     def get(self, request):
@@ -394,8 +427,11 @@ class InvestorTrackedProjectApiView(APIView):
         Responses:
             - 200 OK: Successfully returns a list of tracked projects.
         """
-        tracked_projects = InvestorTrackedProject.objects.all()
-        serializer = InvestorTrackedProjectSerializer(tracked_projects, many=True)
+        context = {'request': request}
+        tracked_projects = optimize_queryset(
+            InvestorTrackedProject.objects.all(), InvestorTrackedProjectSerializer(many=True, context=context)
+        )
+        serializer = InvestorTrackedProjectSerializer(tracked_projects, many=True, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -437,18 +473,19 @@ class InvestorTrackedProjectDetailApiView(APIView):
     - DELETE: Remove a tracked project.
     """
 
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         """
         Retrieve a tracked project by its ID.
 
         Args:
             - pk (int): The primary key of the tracked project.
+            - queryset (QuerySet): The queryset to look it up in, all tracked projects by default.
 
         Returns:
             - InvestorTrackedProject: The tracked project instance if found.
             - None: If the tracked project does not exist.
         """
-        return get_object_or_404(InvestorTrackedProject, pk=pk)
+        return get_object_or_404(InvestorTrackedProject if queryset is None else queryset, pk=pk)
 
     @swagger_auto_schema(
         operation_summary="Retrieve a tracked project",
@@ -461,7 +498,9 @@ class InvestorTrackedProjectDetailApiView(APIView):
                 description="ID of the tracked project",
                 type=openapi.TYPE_INTEGER,
                 required=True,
-            )
+            ),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
         responses={
             200: InvestorTrackedProjectSerializer,
@@ -479,10 +518,14 @@ class InvestorTrackedProjectDetailApiView(APIView):
             - 200 OK: Successfully retrieves the tracked project details.
             - 404 Not Found: If the tracked project does not exist.
         """
-        tracked_project = self.get_object(pk)
+        context = {'request': request}
+        queryset = optimize_queryset(
+            InvestorTrackedProject.objects.all(), InvestorTrackedProjectSerializer(context=context)
+        )
+        tracked_project = self.get_object(pk, queryset)
         if isinstance(tracked_project, Response):  # Handle case where tracked_project is a 404 Response
             return tracked_project
-        serializer = InvestorTrackedProjectSerializer(tracked_project)
+        serializer = InvestorTrackedProjectSerializer(tracked_project, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -523,11 +566,18 @@ class InvestorTrackedProjectDetailApiView(APIView):
 
 class SavedStartupsApiView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = SavedStartupCursorPagination
+
+    # Searches run `__icontains`, served on Postgres by the trigram indexes of
+    # startups/migrations/0003_startup_search_trigram_indexes.py.
+    search_fields = ('company_name', 'description')
+    sort_fields = ('company_name', 'created_at', 'id')
 
     @swagger_auto_schema(
         tags=["Investors"],
         operation_summary="Retrieve all investor profiles",
-        operation_description="Retrieve a list of startups saved by the authenticated investor with optional filtering.",
+        operation_description="Retrieve a cursor-paginated list of startups saved by the authenticated investor "
+                              "with optional filtering.",
         manual_parameters=[
             openapi.Parameter(
                 'search',
@@ -538,15 +588,20 @@ class SavedStartupsApiView(APIView):
             openapi.Parameter(
                 'search_field',
                 openapi.IN_QUERY,
-                description="Field to search by (e.g., 'company_name', 'description')",
+                description="Field to search by: 'company_name' (default) or 'description'",
                 type=openapi.TYPE_STRING
             ),
             openapi.Parameter(
                 'sort',
                 openapi.IN_QUERY,
-                description="Sort startups by a specific field (e.g., 'name', '-name' for descending)",
+                description="Sort startups by 'company_name', 'created_at' or 'id' (default), "
+                            "prefixed with '-' for descending",
                 type=openapi.TYPE_STRING
             ),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Page cursor", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Page size", type=openapi.TYPE_INTEGER),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
         responses={
             200: StartupProfileSerializer(many=True),
@@ -556,37 +611,42 @@ class SavedStartupsApiView(APIView):
     )
     def get(self, request):
         """
-        Retrieve a list of startups saved by the authenticated investor with optional filtering.
+        Retrieve a page of the startups saved by the authenticated investor with optional filtering.
 
         Parameters:
         request (Request): The HTTP request object containing user authentication details.
 
         Returns:
-        Response: A Response object containing serialized data of saved startups with a status code of 200 if successful.
+        Response: A Response object containing a page of serialized saved startups with a status code of 200 if
+                  successful. Unknown search or sort fields are ignored.
                   If the investor profile is not found, returns a 404 status with an error message.
                   If any other exception occurs, returns a 500 status with the error message.
         """
+        self.request = request
         try:
             logger.info(f"Retrieving saved startups for user: {request.user}")
-            investor_profile = InvestorProfile.objects.get(user=request.user)
-            saved_startups = StartupProfile.objects.filter(investor_saves__investor=investor_profile)
+            investor_profile = request.investor
+            if not investor_profile:
+                raise InvestorProfile.DoesNotExist
+
+            context = {'request': request}
+            ordering = [field.lstrip('-') for field in self.get_ordering()]
+            saved_startups = optimize_queryset(
+                StartupProfile.objects.filter(investor_saves__investor=investor_profile),
+                StartupProfileSerializer(many=True, context=context),
+                include=ordering,
+            )
 
-            search_field = request.query_params.get('search_field', 'company_name')  # Default to 'name'
+            search_field = request.query_params.get('search_field', 'company_name')
             search_term = request.query_params.get('search', None)
-            if not hasattr(StartupProfile, search_field):
-                search_term = None
+            if search_term and search_field in self.search_fields:
+                saved_startups = saved_startups.filter(**{f"{search_field}__icontains": search_term})
 
-            if search_term:
-                filter_kwargs = {f"{search_field}__icontains": search_term}
-                saved_startups = saved_startups.filter(**filter_kwargs)
-
-            sort_field = request.query_params.get('sort', None)
-            if sort_field and hasattr(StartupProfile, sort_field):
-                saved_startups = saved_startups.order_by(sort_field)
-
-            serializer = StartupProfileSerializer(saved_startups, many=True)
-            logger.info(f"Successfully retrieved {len(saved_startups)} saved startups for user: {request.user}")
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(saved_startups, request, view=self)
+            serializer = StartupProfileSerializer(page, many=True, context=context)
+            logger.info(f"Successfully retrieved {len(page)} saved startups for user: {request.user}")
+            return paginator.get_paginated_response(serializer.data)
 
         except InvestorProfile.DoesNotExist:
             logger.warning(f"Investor profile not found for user: {request.user}")
@@ -594,6 +654,9 @@ class SavedStartupsApiView(APIView):
                 {"error": "Investor profile not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
+        except NotFound:
+            # Invalid cursor
+            raise
         except Exception as e:
             logger.error(f"Error retrieving saved startups for user {request.user}: {str(e)}")
             return Response(
@@ -601,6 +664,18 @@ class SavedStartupsApiView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def get_ordering(self):
+        """
+        The requested sort if it is a whitelisted field, then the ID so the
+        order is total.
+        """
+        sort_field = self.request.query_params.get('sort', 'id')
+        if sort_field.lstrip('-') not in self.sort_fields:
+            sort_field = 'id'
+        if sort_field.lstrip('-') == 'id':
+            return (sort_field,)
+        return sort_field, '-id' if sort_field.startswith('-') else 'id'
+
 
 class CreateDeleteSavedStartupApiView(APIView):
     permission_classes = [IsAuthenticated]
@@ -641,7 +716,9 @@ class CreateDeleteSavedStartupApiView(APIView):
         """
         try:
             logger.info(f"Attempting to save startup {startup_id} for user {request.user}")
-            investor_profile = InvestorProfile.objects.get(user=request.user)
+            investor_profile = request.investor
+            if not investor_profile:
+                raise InvestorProfile.DoesNotExist
             startup_profile = StartupProfile.objects.get(id=startup_id)
 
             saved_startup, created = InvestorSavedStartup.objects.get_or_create(
@@ -713,7 +790,9 @@ class CreateDeleteSavedStartupApiView(APIView):
         """
         try:
             logger.info(f"Attempting to delete startup {startup_id} from saved list for user {request.user}")
-            investor_profile = InvestorProfile.objects.get(user=request.user)
+            investor_profile = request.investor
+            if not investor_profile:
+                raise InvestorProfile.DoesNotExist
             startup_profile = StartupProfile.objects.get(id=startup_id)
 
             saved_startup = InvestorSavedStartup.objects.get(
@@ -797,66 +876,230 @@ class SubscriptionCreateView(APIView):
         }
     )
     def post(self, request):
-        user = request.user
         serializer = SubscriptionSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            investor = InvestorProfile.objects.get(user=user)
-        except InvestorProfile.DoesNotExist:
+        investor = request.investor
+        if not investor:
             raise PermissionDenied("You must be an investor to subscribe to a project.")
 
         project = serializer.validated_data['project']
         new_share = serializer.validated_data['share']
 
         try:
-            with transaction.atomic():
-                # Calculate current share BEFORE creating subscription
-                total_current_share = Decimal(
-                    InvestorTrackedProject.objects.filter(project=project).aggregate(
-                        total_investment=Sum('share')
-                    )['total_investment'] or 0
-                ).quantize(Decimal('0.00'))
-
-                if total_current_share + new_share > 100:
-                    raise ValidationError({
-                        "investment_share": "Project is fully funded or the investment exceeds the allowed share."
-                    })
-
-                # Create subscription atomically with funding check
-                subscription, created = InvestorTrackedProject.objects.get_or_create(
-                    investor=investor,
-                    project=project,
-                    defaults={'share': new_share}
-                )
+            subscription, remaining_funding = subscribe(investor, project.pk, new_share)
+        except FundingExceeded:
+            raise ValidationError({
+                "investment_share": "Project is fully funded or the investment exceeds the allowed share."
+            })
+        except AlreadySubscribed:
+            return Response({"error": "This investor is already tracking this project."}, status=400)
+        except IntegrityError as e:
+            logger.error(f"Subscription integrity error: {str(e)}")
+            return Response({"error": "Subscription conflict occurred."}, status=400)
 
-                if not created:
-                    return Response(
-                        {"error": "This investor is already tracking this project."},
-                        status=400
-                    )
+        return Response({
+            "message": "Subscription successful.",
+            "remaining_funding": remaining_funding
+        }, status=201)
 
-                remaining_funding = 100 - (total_current_share + new_share)
 
-            return Response({
-                "message": "Subscription successful.",
-                "remaining_funding": remaining_funding
-            }, status=201)
+class BulkSubscriptionCreateView(APIView):
+    """
+    API endpoint to subscribe an investor to, or track, many projects at once.
+
+    - Items with a share subscribe to the project, items without one only track it.
+    - All items are checked in one pass against the projects' funded shares and
+      the accepted ones are saved together; rejected items do not stop the others.
+    - Returns one result per item, in the order they were sent.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsInvestor]
 
+    @swagger_auto_schema(
+        request_body=BulkSubscriptionSerializer,
+        responses={
+            201: openapi.Response(description="Every item was saved"),
+            207: openapi.Response(
+                description="Some items were rejected",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "created": openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                        "rejected": openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                        "results": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    "project": openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                                    "status": openapi.Schema(type=openapi.TYPE_STRING, example="created"),
+                                    "remaining_funding": openapi.Schema(type=openapi.TYPE_NUMBER,
+                                                                        format=openapi.FORMAT_DECIMAL, example=50),
+                                    "error": openapi.Schema(type=openapi.TYPE_STRING),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            400: openapi.Response(description="Invalid input, or every item was rejected"),
+            403: openapi.Response(description="User is not an investor"),
+        }
+    )
+    def post(self, request):
+        serializer = BulkSubscriptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        investor = request.investor
+        if not investor:
+            raise PermissionDenied("You must be an investor to subscribe to a project.")
+
+        try:
+            results = bulk_subscribe(investor, serializer.validated_data['items'])
         except IntegrityError as e:
-            logger.error(f"Subscription integrity error: {str(e)}")
+            logger.error(f"Bulk subscription integrity error: {str(e)}")
             return Response({"error": "Subscription conflict occurred."}, status=400)
 
+        created = sum(result['status'] == CREATED for result in results)
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response({
+            "created": created,
+            "rejected": len(results) - created,
+            "results": results,
+        }, status=response_status)
+
+
+class SubscriptionMetricsView(APIView):
+    """
+    API endpoint reporting the throughput of the subscription engine over the
+    last `SUBSCRIPTION_METRICS_WINDOW` seconds. Admins only.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response(
+                description="Subscription throughput",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "window_seconds": openapi.Schema(type=openapi.TYPE_INTEGER, example=300),
+                        "committed": openapi.Schema(type=openapi.TYPE_INTEGER, example=1200),
+                        "rejected": openapi.Schema(type=openapi.TYPE_INTEGER, example=35),
+                        "retries": openapi.Schema(type=openapi.TYPE_INTEGER, example=4),
+                        "conflicts": openapi.Schema(type=openapi.TYPE_INTEGER, example=0),
+                        "commits_per_second": openapi.Schema(type=openapi.TYPE_NUMBER, example=4.0),
+                        "mean_latency_ms": openapi.Schema(type=openapi.TYPE_NUMBER, example=6.5),
+                    }
+                )
+            )
+        }
+    )
+    def get(self, request):
+        return Response(get_metrics())
+
+
+class InvestorPortfolioView(APIView):
+    """
+    API endpoint summarizing the portfolio of the current investor.
+
+    - Counts the tracked projects per status and the saved startups.
+    - Sums the committed capital (share × funding goal) in total and per status.
+    - Lists the holdings with the most committed capital.
+    - Computed with a few grouped queries and cached until the portfolio changes.
+    """
+    permission_classes = [IsAuthenticated, IsInvestor]
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response(
+                description="Portfolio summary",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "tracked_projects": openapi.Schema(type=openapi.TYPE_INTEGER, example=3),
+                        "saved_startups": openapi.Schema(type=openapi.TYPE_INTEGER, example=5),
+                        "committed_capital": openapi.Schema(type=openapi.TYPE_NUMBER, format=openapi.FORMAT_DECIMAL,
+                                                            example=45000),
+                        "by_status": openapi.Schema(type=openapi.TYPE_OBJECT),
+                        "top_holdings": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    "project": openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                                    "title": openapi.Schema(type=openapi.TYPE_STRING),
+                                    "startup": openapi.Schema(type=openapi.TYPE_STRING),
+                                    "status": openapi.Schema(type=openapi.TYPE_STRING, example="In Progress"),
+                                    "share": openapi.Schema(type=openapi.TYPE_NUMBER, format=openapi.FORMAT_DECIMAL,
+                                                            example=30),
+                                    "committed_capital": openapi.Schema(type=openapi.TYPE_NUMBER,
+                                                                        format=openapi.FORMAT_DECIMAL, example=30000),
+                                }
+                            )
+                        ),
+                    }
+                )
+            ),
+            403: openapi.Response(description="User is not an investor"),
+        }
+    )
+    def get(self, request):
+        if not request.investor:
+            raise PermissionDenied("You must have an investor profile to view a portfolio.")
+
+        return Response(get_portfolio(request.investor.pk))
+
+
+class InvestorRecommendationsView(generics.ListAPIView):
+    """
+    API endpoint to retrieve the startups recommended to an investor, best first.
+
+    Recommendations are precomputed from the investor's preferred industries,
+    saved and viewed startups (see `investors.recommendations`); nothing is
+    scored per request.
+    """
+    serializer_class = InvestorRecommendationSerializer
+    permission_classes = [IsAuthenticated, IsInvestor]
+
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return optimize_queryset(
+            InvestorRecommendation.objects.filter(investor__user=self.request.user).order_by('rank'),
+            self.get_serializer(many=True),
+        )
+
 
 class RecentlyViewedStartupsView(generics.ListAPIView):
     """
     API endpoint to retrieve recently viewed startups by an investor.
+
+    - Newest first, cursor-paginated on `(viewed_at, id)`.
+    - Each startup is a compact summary.
+    - Only the last `VIEWED_STARTUPS_HISTORY_SIZE` views of an investor are kept.
     """
     serializer_class = ViewedStartupSerializer
     permission_classes = [IsAuthenticated, IsInvestor]
+    pagination_class = ViewedStartupCursorPagination
+
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
-        return ViewedStartup.objects.filter(user=self.request.user).order_by('-viewed_at')
+        ordering = [field.lstrip('-') for field in self.pagination_class.ordering]
+        return optimize_queryset(
+            ViewedStartup.objects.filter(user=self.request.user), self.get_serializer(many=True), include=ordering
+        )
 
 
 class LogStartupView(APIView):
@@ -880,18 +1123,14 @@ class LogStartupView(APIView):
         :param startup_id:
         :return:
         """
-        startup = StartupProfile.objects.filter(id=startup_id).first()
-        if not startup:
+        if not StartupProfile.objects.filter(id=startup_id).exists():
             return Response(
                 {"error": "Startup not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        ViewedStartup.objects.update_or_create(
-            user=request.user,
-            startup=startup,
-            defaults={"viewed_at": timezone.now()}
-        )
+        # Buffered and written in bulk by the flush_viewed_startups task.
+        record_view(request.user.pk, startup_id)
         return Response(
             {"message": "Startup view saved successfully."},
             status=status.HTTP_200_OK
@@ -910,7 +1149,7 @@ class ClearViewedStartups(APIView):
         }
     )
     def delete(self, request):
-        deleted_count, _ = ViewedStartup.objects.filter(user=request.user).delete()
+        deleted_count = clear_history(request.user.pk)
 
         if deleted_count == 0:
             return Response(
@@ -0,0 +1,407 @@
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Case, Count, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Floor
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+from elasticsearch import ApiError, ConnectionError, ConnectionTimeout
+from elasticsearch_dsl.connections import connections
+from elasticsearch_dsl.query import MatchAll, MultiMatch
+from rest_framework.exceptions import NotFound
+
+from startups.models import StartupProfile
+from .documents import ProjectDocument
+from .models import Project
+from .ranking import rank
+from .serializers import ProjectSearchHitSerializer, ProjectSearchSerializer
+
+SearchPage = namedtuple('SearchPage', ['results', 'facets'])
+
+# Duration buckets (in months) offered by the filter sidebar.
+DURATION_RANGES = [
+    {'key': '0-6', 'to': 6},
+    {'key': '6-12', 'from': 6, 'to': 12},
+    {'key': '12-24', 'from': 12, 'to': 24},
+    {'key': '24+', 'from': 24},
+]
+
+
+class SearchBackendUnavailable(Exception):
+    """
+    Raised when a backend cannot answer in time, so the next one is tried.
+    """
+
+
+class BaseSearchBackend:
+    """
+    A way of answering project searches.
+
+    `search()` receives the validated query parameters of the search endpoint
+    and a `SearchAfterPagination`, and returns a `SearchPage` with the
+    serialized hits of the requested page and, when asked for, the facet
+    counts. Every backend returns hits and facets of the same shape.
+    """
+    name = None
+
+    def search(self, params, paginator, request):
+        raise NotImplementedError
+
+    @property
+    def funding_goal_interval(self):
+        return getattr(settings, 'PROJECT_SEARCH_FUNDING_GOAL_INTERVAL', 50000)
+
+
+class ElasticsearchSearchBackend(BaseSearchBackend):
+    """
+    Searches the `projects` index: fuzzy `multi_match` relevance adjusted by
+    a ranking profile (see `projects.ranking`), facets as aggregations of the
+    same request.
+    """
+    name = 'elasticsearch'
+    document = ProjectDocument
+
+    @property
+    def source_only(self):
+        """
+        Whether results are served straight from the Elasticsearch `_source`.
+
+        When disabled, hits are re-hydrated through the ORM as before.
+        """
+        return getattr(settings, 'PROJECT_SEARCH_SOURCE_ONLY', True)
+
+    def get_search(self):
+        timeout = getattr(settings, 'SEARCH_BACKEND_TIMEOUT', 2)
+        client = connections.get_connection().options(request_timeout=timeout)
+        return self.document.search(using=client)
+
+    def apply_filters(self, search, params):
+        """
+        Narrow the search down with the filters selected by the client.
+        """
+        if params.get('status'):
+            search = search.filter(
+                'term', **{'status.raw': {'value': params['status'], 'case_insensitive': True}}
+            )
+        if params.get('industry'):
+            search = search.filter('terms', industries=params['industry'].split(','))
+        if params.get('startup'):
+            search = search.filter('term', startup_id=params['startup'])
+        if params.get('industry_ids'):
+            search = search.filter('terms', industry_ids=params['industry_ids'])
+
+        funded_percent_range = {}
+        if params.get('funded_percent_min') is not None:
+            funded_percent_range['gte'] = float(params['funded_percent_min'])
+        if params.get('funded_percent_max') is not None:
+            funded_percent_range['lte'] = float(params['funded_percent_max'])
+        if funded_percent_range:
+            search = search.filter('range', funded_percent=funded_percent_range)
+
+        funding_goal_range = {}
+        if params.get('funding_goal_min') is not None:
+            funding_goal_range['gte'] = float(params['funding_goal_min'])
+        if params.get('funding_goal_max') is not None:
+            funding_goal_range['lte'] = float(params['funding_goal_max'])
+        if funding_goal_range:
+            search = search.filter('range', funding_goal=funding_goal_range)
+        return search
+
+    def apply_facets(self, search):
+        """
+        Attach the aggregations that power the filter sidebar, so facet counts
+        come back in the same round trip as the hits.
+        """
+        search.aggs.bucket('status', 'terms', field='status.raw', size=10)
+        search.aggs.bucket('industries', 'terms', field='industries', size=50)
+        search.aggs.bucket('funding_goal', 'histogram', field='funding_goal',
+                           interval=self.funding_goal_interval, min_doc_count=1)
+        search.aggs.bucket('duration', 'range', field='duration', ranges=DURATION_RANGES)
+        return search
+
+    def get_facets(self, response):
+        """
+        Flatten the aggregations of a search response into facet counts.
+        """
+        aggregations = response.aggregations
+
+        return {
+            'status': [
+                {'value': bucket.key, 'count': bucket.doc_count}
+                for bucket in aggregations.status.buckets
+            ],
+            'industries': [
+                {'value': bucket.key, 'count': bucket.doc_count}
+                for bucket in aggregations.industries.buckets
+            ],
+            'funding_goal': [
+                {'from': bucket.key, 'to': bucket.key + self.funding_goal_interval, 'count': bucket.doc_count}
+                for bucket in aggregations.funding_goal.buckets
+            ],
+            'duration': [
+                {'value': bucket.key, 'count': bucket.doc_count}
+                for bucket in aggregations.duration.buckets
+            ],
+        }
+
+    def search(self, params, paginator, request):
+        search = self.get_search()
+        search_after = paginator.start(request)
+
+        # Multi-match with fuzziness for search, scored by the ranking profile
+        # at the time pinned by the cursor
+        if params['q']:
+            query = MultiMatch(query=params['q'], fields=['title^3', 'description'], fuzziness='AUTO')
+        else:
+            query = MatchAll()
+        search = search.query(rank(query, params.get('ranking'), origin=paginator.origin))
+
+        search = self.apply_filters(search, params)
+
+        if params['facets']:
+            search = self.apply_facets(search)
+
+        if self.source_only:
+            search = search.source(self.document.SOURCE_FIELDS)
+
+        # Fetch a single page after the cursor
+        try:
+            page = paginator.paginate_search(search, search_after)
+        except (ConnectionError, ConnectionTimeout) as e:
+            raise SearchBackendUnavailable(str(e)) from e
+        except ApiError as e:
+            if e.meta.status >= 500:
+                raise SearchBackendUnavailable(str(e)) from e
+            raise
+
+        facets = self.get_facets(paginator.response) if params['facets'] else None
+
+        if self.source_only:
+            hits = [{'id': int(hit.meta.id), **hit.to_dict(skip_empty=False)} for hit in page]
+            return SearchPage(ProjectSearchHitSerializer(hits, many=True).data, facets)
+
+        project_ids = [hit.meta.id for hit in page]
+
+        # Preserve Elasticsearch ordering using Case/When
+        preserved_order = Case(
+            *[When(id=id, then=pos) for pos, id in enumerate(project_ids)]
+        )
+
+        # Get actual Django objects with proper ordering
+        queryset = Project.objects.filter(id__in=project_ids) \
+            .order_by(preserved_order) \
+            .select_related('startup')
+
+        return SearchPage(ProjectSearchSerializer(queryset, many=True).data, facets)
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Searches the projects table directly, so search keeps working without
+    an Elasticsearch cluster.
+
+    Text matching uses the `search_vector` tsvector column (GIN indexed) on
+    Postgres and the `projects_project_fts` FTS5 table on SQLite, both created
+    by migration 0003. Relevance is coarser than Elasticsearch (no fuzziness),
+    but filters, facets and cursor pagination behave the same. Cursors are
+    backend specific: one issued by another backend is rejected.
+    """
+    name = 'database'
+
+    # Relative weight of title and description matches, as in `title^3`.
+    TITLE_WEIGHT = 3.0
+    DESCRIPTION_WEIGHT = 1.0
+
+    def match(self, queryset, text):
+        """
+        Keep the projects matching `text` and annotate them with a `rank`.
+        """
+        if not text:
+            return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+        if connection.vendor == 'postgresql':
+            return self.match_postgresql(queryset, text)
+        if connection.vendor == 'sqlite':
+            return self.match_sqlite(queryset, text)
+        raise ImproperlyConfigured(f"DatabaseSearchBackend does not support {connection.vendor}")
+
+    def match_postgresql(self, queryset, text):
+        table = connection.ops.quote_name(Project._meta.db_table)
+        vector = RawSQL(f'{table}."search_vector"', [], output_field=SearchVectorField())
+        query = SearchQuery(text, config='english', search_type='websearch')
+        weights = [0.1, 0.2, self.DESCRIPTION_WEIGHT / self.TITLE_WEIGHT, 1.0]
+
+        # `ts_rank` is a real: cast it so the cursor round-trips exactly.
+        return queryset.annotate(search_vector=vector) \
+            .filter(search_vector=query) \
+            .annotate(rank=Cast(SearchRank(vector, query, weights=weights), FloatField()))
+
+    def match_sqlite(self, queryset, text):
+        # Every word must match, as a prefix; quoting keeps FTS5 syntax out.
+        terms = re.findall(r'\w+', text)
+        if not terms:
+            return queryset.none()
+        fts_query = ' '.join(f'"{term}"*' for term in terms)
+
+        table = Project._meta.db_table
+        fts = f'{table}_fts'
+        matches = RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [fts_query])
+        rank = RawSQL(
+            f'SELECT -bm25({fts}, {self.TITLE_WEIGHT}, {self.DESCRIPTION_WEIGHT}) FROM {fts} '
+            f'WHERE {fts} MATCH %s AND rowid = "{table}"."id"',
+            [fts_query],
+            output_field=FloatField(),
+        )
+        return queryset.filter(id__in=matches).annotate(rank=rank)
+
+    def apply_filters(self, queryset, params):
+        """
+        Narrow the queryset down with the filters selected by the client.
+        """
+        if params.get('status'):
+            queryset = queryset.filter(status__iexact=params['status'])
+        if params.get('industry'):
+            queryset = queryset.filter(
+                startup__in=StartupProfile.objects.filter(
+                    industries__name__in=params['industry'].split(',')
+                )
+            )
+        if params.get('startup'):
+            queryset = queryset.filter(startup_id=params['startup'])
+        if params.get('industry_ids'):
+            queryset = queryset.filter(
+                startup__in=StartupProfile.objects.filter(industries__id__in=params['industry_ids'])
+            )
+        if params.get('funded_percent_min') is not None:
+            queryset = queryset.filter(funded_share__gte=params['funded_percent_min'])
+        if params.get('funded_percent_max') is not None:
+            queryset = queryset.filter(funded_share__lte=params['funded_percent_max'])
+        if params.get('funding_goal_min') is not None:
+            queryset = queryset.filter(funding_goal__gte=params['funding_goal_min'])
+        if params.get('funding_goal_max') is not None:
+            queryset = queryset.filter(funding_goal__lte=params['funding_goal_max'])
+        return queryset
+
+    def apply_cursor(self, queryset, search_after, paginator):
+        """
+        Keep the rows after the `(rank, created_at, id)` key of the cursor.
+        """
+        rank, created_at, pk = search_after
+        created_at = parse_datetime(created_at) if isinstance(created_at, str) else None
+        if created_at is None or not isinstance(rank, (int, float)) or not isinstance(pk, int):
+            raise NotFound(paginator.invalid_cursor_message)
+
+        return queryset.filter(
+            Q(rank__lt=rank)
+            | Q(rank=rank, created_at__lt=created_at)
+            | Q(rank=rank, created_at=created_at, id__lt=pk)
+        )
+
+    def get_facets(self, queryset):
+        """
+        Count the matching projects per status, industry, funding goal bucket
+        and duration range.
+        """
+        interval = self.funding_goal_interval
+        projects = Project.objects.filter(id__in=queryset.values('id'))
+
+        status_counts = projects.values('status').annotate(count=Count('id')).order_by('-count', 'status')
+        industry_counts = projects.exclude(startup__industries=None) \
+            .values(name=F('startup__industries__name')) \
+            .annotate(count=Count('id')) \
+            .order_by('-count', 'name')
+        funding_goal_counts = projects.annotate(bucket=Floor(F('funding_goal') / interval) * interval) \
+            .values('bucket') \
+            .annotate(count=Count('id')) \
+            .order_by('bucket')
+
+        duration_filters = {}
+        for duration_range in DURATION_RANGES:
+            condition = Q()
+            if 'from' in duration_range:
+                condition &= Q(duration__gte=duration_range['from'])
+            if 'to' in duration_range:
+                condition &= Q(duration__lt=duration_range['to'])
+            duration_filters[duration_range['key']] = Count('id', filter=condition)
+        duration_counts = projects.aggregate(**duration_filters)
+
+        return {
+            'status': [
+                {'value': row['status'], 'count': row['count']}
+                for row in status_counts[:10]
+            ],
+            'industries': [
+                {'value': row['name'], 'count': row['count']}
+                for row in industry_counts[:50]
+            ],
+            'funding_goal': [
+                {'from': float(row['bucket']), 'to': float(row['bucket']) + interval, 'count': row['count']}
+                for row in funding_goal_counts
+            ],
+            'duration': [
+                {'value': duration_range['key'], 'count': duration_counts[duration_range['key']]}
+                for duration_range in DURATION_RANGES
+            ],
+        }
+
+    def search(self, params, paginator, request):
+        search_after = paginator.start(request)
+
+        queryset = self.apply_filters(self.match(Project.objects.all(), params['q']), params)
+        facets = self.get_facets(queryset) if params['facets'] else None
+        paginator.count = queryset.count()
+
+        if search_after is not None:
+            queryset = self.apply_cursor(queryset, search_after, paginator)
+
+        rows = list(
+            queryset.order_by('-rank', '-created_at', '-id').values(
+                'id', 'title', 'description', 'status', 'funding_goal', 'created_at', 'rank',
+                startup_name=F('startup__company_name'),
+            )[:paginator.page_size + 1]
+        )
+        page = paginator.paginate_hits(
+            rows, lambda row: [row['rank'], row['created_at'].isoformat(), row['id']]
+        )
+        return SearchPage(ProjectSearchHitSerializer(page, many=True).data, facets)
+
+
+def get_search_backend(path):
+    return import_string(path)()
+
+
+def mark_unavailable(backend):
+    """
+    Skip `backend` for `SEARCH_BACKEND_COOLDOWN` seconds, so requests do not
+    keep waiting on a backend that just timed out.
+    """
+    cooldown = getattr(settings, 'SEARCH_BACKEND_COOLDOWN', 30)
+    cache.set(f'search-backend-unavailable:{backend.name}', True, timeout=cooldown)
+
+
+def is_unavailable(backend):
+    return cache.get(f'search-backend-unavailable:{backend.name}', False)
+
+
+def get_search_backends():
+    """
+    The backends to try for a search, in order: `SEARCH_BACKEND`, then
+    `SEARCH_FALLBACK_BACKEND` if one is configured. The primary backend is
+    skipped while it is marked unavailable.
+    """
+    primary_path = getattr(settings, 'SEARCH_BACKEND', 'projects.backends.ElasticsearchSearchBackend')
+    fallback_path = getattr(settings, 'SEARCH_FALLBACK_BACKEND', None)
+
+    primary = get_search_backend(primary_path)
+    if not fallback_path or fallback_path == primary_path:
+        return [primary]
+
+    fallback = get_search_backend(fallback_path)
+    if is_unavailable(primary):
+        return [fallback]
+    return [primary, fallback]
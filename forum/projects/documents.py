@@ -1,14 +1,32 @@
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
 
-from startups.models import StartupProfile
+from startups.documents import completion_inputs
 from .models import Project
 
 
 @registry.register_document
 class ProjectDocument(Document):
+    """
+    Elasticsearch document for projects.
+
+    The document stores every field needed to render a search result, so the
+    search view can build its response from the hit `_source` alone without
+    re-reading the rows from Postgres.
+
+    Documents are not synced by the django_elasticsearch_dsl signal processor:
+    changes are buffered and written in bulk by `projects.tasks.flush_search_index`
+    (see `projects.indexing`).
+    """
+    id = fields.IntegerField(attr='id')
+    status = fields.TextField(attr='status', fields={'raw': fields.KeywordField()})
+    startup_id = fields.IntegerField(attr='startup_id')
     startup_name = fields.TextField(attr='startup.company_name')
+    industries = fields.KeywordField(multi=True)
+    industry_ids = fields.IntegerField(multi=True)
+    funded_percent = fields.FloatField()
     created_at = fields.DateField()
+    title_suggest = fields.CompletionField()
 
     class Index:
         name = 'projects'
@@ -16,12 +34,27 @@ class ProjectDocument(Document):
 
     class Django:
         model = Project
-        fields = ['title', 'description', 'status', 'funding_goal', 'duration']
-        related_models = [StartupProfile]
+        fields = ['title', 'description', 'funding_goal', 'duration']
+        ignore_signals = True
+
+    # Fields returned in `_source` when serving search results from the index.
+    SOURCE_FIELDS = ['title', 'description', 'status', 'funding_goal', 'startup_name', 'created_at']
+
+    # Fields returned in `_source` with every suggestion.
+    SUGGEST_SOURCE_FIELDS = ['title', 'startup_name']
 
     def get_queryset(self):
-        return super().get_queryset().select_related('startup')
+        return super().get_queryset().select_related('startup').prefetch_related('startup__industries')
+
+    def prepare_industries(self, instance):
+        return [industry.name for industry in instance.startup.industries.all()]
+
+    def prepare_industry_ids(self, instance):
+        return [industry.id for industry in instance.startup.industries.all()]
+
+    def prepare_funded_percent(self, instance):
+        return float(instance.funded_share)
 
-    def get_instances_from_related(self, related):
-        return related.projects.all()
+    def prepare_title_suggest(self, instance):
+        return completion_inputs(instance.title, instance.startup.company_name)
 
@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from forum.buffers import get_buffer
+from .models import Project, ProjectTombstone, SearchSyncState
+
+INDEX = 'index'
+DELETE = 'delete'
+
+PROJECT = 'project'
+STARTUP = 'startup'
+
+BUFFER_NAME = 'search-index'
+SCHEDULED_FLUSH_KEY = 'search-index:flush-scheduled'
+SYNC_STATE_NAME = 'projects'
+# Start of the running full reindex (see bulk_index_projects), if any.
+REINDEX_STATE_NAME = 'projects-reindex'
+RELATED_CACHE_KEY = 'related-projects:{}'
+
+
+def get_documents():
+    """
+    Documents kept in sync through the index buffer, by buffer label.
+    """
+    from startups.documents import StartupDocument
+    from .documents import ProjectDocument
+
+    return {PROJECT: ProjectDocument, STARTUP: StartupDocument}
+
+
+def get_index_buffer():
+    """
+    Buffer of documents waiting to be written to Elasticsearch.
+
+    Entries are keyed by `<label>:<id>` and hold the pending action, so a row
+    saved several times before a flush is indexed once, and a delete
+    supersedes earlier updates.
+    """
+    return get_buffer(BUFFER_NAME)
+
+
+def enqueue(label, ids, action=INDEX):
+    """
+    Schedule the search documents of `ids` to be indexed or deleted.
+
+    Nothing is recorded until the surrounding transaction commits, so a rolled
+    back write never reaches the index and the worker always reads committed
+    rows.
+    """
+    entries = {f'{label}:{pk}': action for pk in ids}
+    if entries:
+        transaction.on_commit(lambda: record(entries))
+
+
+def enqueue_projects(project_ids, action=INDEX):
+    enqueue(PROJECT, project_ids, action)
+
+
+def enqueue_startups(startup_ids, action=INDEX):
+    enqueue(STARTUP, startup_ids, action)
+
+
+def record(entries):
+    """
+    Add entries to the index buffer and make sure a flush is on its way.
+
+    A full batch is flushed right away; otherwise a single delayed flush is
+    scheduled per window, picking up every change recorded in the meantime.
+    """
+    from .tasks import flush_search_index
+
+    buffer = get_index_buffer()
+    buffer.add_many(entries)
+
+    batch_size = getattr(settings, 'SEARCH_INDEX_BATCH_SIZE', 500)
+    interval = getattr(settings, 'SEARCH_INDEX_FLUSH_INTERVAL', 2)
+
+    if len(buffer) >= batch_size:
+        flush_search_index.delay()
+    elif cache.add(SCHEDULED_FLUSH_KEY, True, timeout=interval):
+        flush_search_index.apply_async(countdown=interval)
+
+
+def invalidate_related(project_ids):
+    """
+    Drop the cached related projects of `project_ids`, whose documents changed.
+    """
+    cache.delete_many([RELATED_CACHE_KEY.format(pk) for pk in project_ids])
+
+
+def sync_projects(chunk_size=1000):
+    """
+    Queue every project changed since the last run, and every deleted one.
+
+    Projects are read in keyset-paginated `(updated_at, id)` chunks starting
+    from the persisted watermark. Each run goes back `SEARCH_SYNC_OVERLAP`
+    seconds before the watermark, because `updated_at` is set before commit:
+    a transaction that committed after the previous run may carry an older
+    timestamp. Deleted projects are picked up from their tombstones, which
+    are removed once queued, except those a running full reindex still has
+    to replay.
+
+    Returns:
+        tuple: The number of projects queued for indexing and for deletion.
+    """
+    overlap = timedelta(seconds=getattr(settings, 'SEARCH_SYNC_OVERLAP', 300))
+    state, _ = SearchSyncState.objects.get_or_create(name=SYNC_STATE_NAME)
+
+    queryset = Project.objects.order_by('updated_at', 'id').values_list('updated_at', 'id')
+    if state.watermark is not None:
+        queryset = queryset.filter(updated_at__gte=state.watermark - overlap)
+
+    indexed = 0
+    cursor = None
+    while True:
+        chunk = queryset
+        if cursor is not None:
+            chunk = chunk.filter(Q(updated_at__gt=cursor[0]) | Q(updated_at=cursor[0], id__gt=cursor[1]))
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            break
+
+        record({f'{PROJECT}:{pk}': INDEX for _, pk in rows})
+        indexed += len(rows)
+        cursor = rows[-1]
+
+    if cursor is not None and (state.watermark is None or cursor[0] > state.watermark):
+        state.watermark = cursor[0]
+    state.save()
+
+    tombstones = list(ProjectTombstone.objects.values_list('id', 'project_id'))
+    if tombstones:
+        record({f'{PROJECT}:{project_id}': DELETE for _, project_id in tombstones})
+        consumed = ProjectTombstone.objects.filter(id__in=[pk for pk, _ in tombstones])
+        # A running full reindex replays the deletes made since it started once it swaps indices.
+        reindex_started_at = SearchSyncState.objects.filter(name=REINDEX_STATE_NAME) \
+            .values_list('watermark', flat=True).first()
+        if reindex_started_at is not None:
+            consumed = consumed.filter(deleted_at__lt=reindex_started_at)
+        consumed.delete()
+
+    return indexed, len(tombstones)
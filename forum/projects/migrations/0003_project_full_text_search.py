@@ -0,0 +1,89 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE projects_project ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX projects_project_search_vector_idx ON projects_project USING gin (search_vector)",
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS projects_project_search_vector_idx",
+    "ALTER TABLE projects_project DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER projects_project_fts_insert AFTER INSERT ON projects_project BEGIN
+        INSERT INTO projects_project_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_project_fts_delete AFTER DELETE ON projects_project BEGIN
+        INSERT INTO projects_project_fts(projects_project_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_project_fts_update AFTER UPDATE OF title, description ON projects_project BEGIN
+        INSERT INTO projects_project_fts(projects_project_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO projects_project_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+SQLITE_REBUILD = "INSERT INTO projects_project_fts(projects_project_fts) VALUES ('rebuild')"
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE projects_project_fts USING fts5(
+        title, description, content='projects_project', content_rowid='id'
+    )
+    """,
+    *SQLITE_TRIGGERS,
+    SQLITE_REBUILD,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS projects_project_fts_insert",
+    "DROP TRIGGER IF EXISTS projects_project_fts_delete",
+    "DROP TRIGGER IF EXISTS projects_project_fts_update",
+    "DROP TABLE IF EXISTS projects_project_fts",
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search structures used by projects.backends.DatabaseSearchBackend:
+    a generated, GIN indexed tsvector column on Postgres and an FTS5 table kept
+    in sync by triggers on SQLite. Other databases are left untouched.
+
+    Neither is known to the ORM. Note that SQLite drops triggers when Django
+    rebuilds a table, so a later migration that remakes projects_project on
+    SQLite must create the triggers again.
+    """
+
+    dependencies = [
+        ('projects', '0002_search_sync_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run({'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.19 on 2026-10-17 02:53
+
+from decimal import Decimal
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+full_text_search = import_module('projects.migrations.0003_project_full_text_search')
+
+SQLITE_DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS projects_project_fts_insert",
+    "DROP TRIGGER IF EXISTS projects_project_fts_delete",
+    "DROP TRIGGER IF EXISTS projects_project_fts_update",
+]
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    """
+    Adding (or removing) a NOT NULL column rebuilds the table on SQLite,
+    which drops the full-text search triggers of 0003: create them again.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in [
+        *SQLITE_DROP_TRIGGERS,
+        *full_text_search.SQLITE_TRIGGERS,
+        full_text_search.SQLITE_REBUILD,
+    ]:
+        schema_editor.execute(statement)
+
+
+def backfill_funded_share(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    InvestorTrackedProject = apps.get_model('investors', 'InvestorTrackedProject')
+
+    totals = InvestorTrackedProject.objects.values('project').annotate(total=Sum('share')).order_by()
+    for row in totals.iterator():
+        Project.objects.filter(pk=row['project']).update(funded_share=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0003_viewedstartup'),
+        ('projects', '0004_project_created_at_id_idx'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after the column is removed.
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_triggers),
+        migrations.AddField(
+            model_name='project',
+            name='funded_share',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=5),
+        ),
+        migrations.RunPython(restore_sqlite_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_funded_share, migrations.RunPython.noop),
+    ]
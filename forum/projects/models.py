@@ -2,7 +2,7 @@ from decimal import Decimal
 
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Sum
+from django.utils import timezone
 
 from startups.models import StartupProfile
 
@@ -29,25 +29,67 @@ class Project(models.Model):
         upload_to='project_business_plans/', blank=True, null=True)
     media_files = models.FileField(
         upload_to='project_media/', blank=True, null=True)
+    # Sum of the investor shares (in percent), kept up to date by investors.signals
+    # so funding checks read one row instead of aggregating every subscription.
+    funded_share = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'), editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the incremental search index sync.
+            models.Index(fields=['updated_at', 'id'], name='project_updated_at_id_idx'),
+            # Keyset pagination of the project list.
+            models.Index(fields=['created_at', 'id'], name='project_created_at_id_idx'),
+        ]
 
     def clean(self):
         """Ensure funding_needed is not greater than funding_goal"""
         if self.funding_needed > self.funding_goal:
             raise ValidationError("Funding needed cannot exceed funding goal.")
 
+    def save(self, *args, **kwargs):
+        # funded_share is only moved in place (see investors.signals): updates must not write back
+        # the value loaded with the instance, which a concurrent subscription may have changed since.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'funded_share'
+            ]
+        super().save(*args, **kwargs)
+
     def total_funding_received(self):
         """
         Calculates the total funding received for this project.
         The total funding is determined based on the sum of all investor shares.
         """
-        total_share_percentage = (
-                self.investor_tracks.aggregate(total=Sum('share'))['total'] or Decimal('0.00')
-        )
-
         # Convert percentage share to monetary value
-        total_funding = (total_share_percentage / Decimal('100.00')) * self.funding_goal
+        total_funding = (self.funded_share / Decimal('100.00')) * self.funding_goal
 
         return total_funding
 
     def __str__(self):
         return f"{self.title} | {self.startup.company_name} | {self.get_status_display()}"
+
+
+class ProjectTombstone(models.Model):
+    """
+    Records a deleted project until the incremental search index sync has
+    removed its document.
+    """
+    project_id = models.IntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Project {self.project_id} deleted at {self.deleted_at}"
+
+
+class SearchSyncState(models.Model):
+    """
+    High-watermark of an incremental search index sync: rows updated after
+    `watermark` have not been synced yet.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} synced up to {self.watermark}"
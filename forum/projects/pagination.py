@@ -0,0 +1,177 @@
+import contextlib
+import json
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class SearchAfterPagination(BasePagination):
+    """
+    Cursor pagination for Elasticsearch searches built on `search_after`.
+
+    Results are sorted by a stable key (score, created_at, id) and the sort
+    values of the last hit on a page are handed to the client as an opaque
+    cursor. Fetching the next page only asks Elasticsearch for the hits after
+    that key, so every page costs the same regardless of how deep it is and
+    `max_result_window` is never reached.
+
+    Scores decaying with time (see `projects.ranking`) are computed from the
+    `origin` pinned when the first page is served and carried in the cursor,
+    so the score values of a cursor still match the hits of the next page.
+    """
+    page_size = 10
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # The trailing `id` keeps the ordering total, so cursors never skip or repeat hits.
+    sort = (
+        {'_score': {'order': 'desc'}},
+        {'created_at': {'order': 'desc'}},
+        {'id': {'order': 'desc'}},
+    )
+
+    def paginate_search(self, search, search_after):
+        """
+        Apply the sort, the cursor values read by `start()` and the page size
+        to `search`, execute it and return the hits of the requested page.
+        """
+        search = search.sort(*self.sort)
+        if search_after is not None:
+            search = search.extra(search_after=search_after)
+
+        # Ask for one extra hit to find out whether there is a next page.
+        search = search.extra(size=self.page_size + 1)
+        self.response = search.execute()
+        self.count = self.response.hits.total.value
+
+        return self.paginate_hits(list(self.response), lambda hit: list(hit.meta.sort))
+
+    def start(self, request):
+        """
+        Read the page size and the cursor of `request`, and set `origin` to
+        the time (epoch milliseconds) scores are computed at: the one of the
+        cursor, or now on a first page.
+
+        Returns:
+            list: The sort values of the last hit of the previous page, or None.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.origin = int(time.time() * 1000)
+        return self.decode_cursor(request)
+
+    def paginate_hits(self, hits, get_sort_values):
+        """
+        Cut `hits` (up to one more than the page size) down to the page and
+        build the cursor of the next one from the sort values of its last hit.
+        """
+        self.has_next = len(hits) > self.page_size
+        self.hits = hits[:self.page_size]
+        self.next_cursor = (
+            self.encode_cursor(get_sort_values(self.hits[-1])) if self.has_next else None
+        )
+        return self.hits
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            with contextlib.suppress(KeyError, ValueError):
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+        return self.page_size
+
+    def decode_cursor(self, request):
+        """
+        Return the `search_after` values carried by the request cursor, if
+        any, and restore the `origin` it was issued with.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            values = json.loads(urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, dict) or not isinstance(values.get('origin'), int) \
+                or not isinstance(values.get('after'), list) or len(values['after']) != len(self.sort):
+            raise NotFound(self.invalid_cursor_message)
+        self.origin = values['origin']
+        return values['after']
+
+    def encode_cursor(self, values):
+        """
+        Turn the sort values of the last hit and the origin into an opaque,
+        URL-safe token.
+        """
+        cursor = {'after': values, 'origin': self.origin}
+        payload = json.dumps(cursor, separators=(',', ':')).encode('utf-8')
+        return urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_count(self):
+        return self.count
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.get_count()),
+            ('next', self.get_next_link()),
+            ('next_cursor', self.next_cursor),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['count', 'results'],
+            'properties': {
+                'count': {
+                    'type': 'integer',
+                    'example': 123,
+                },
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'next_cursor': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
+
+
+class ProjectCursorPagination(CursorPagination):
+    """
+    Cursor pagination of the project list, ordered by `(created_at, id)`.
+
+    REST framework's cursor only filters on the first ordering field: each
+    page is read with a `WHERE created_at < cursor` range over the
+    `(created_at, id)` index, and the rows sharing the cursor's `created_at`
+    are skipped with a small OFFSET. Timestamps are to the microsecond, so
+    that offset stays near zero: deep pages cost about the same as the first
+    one and rows inserted meanwhile never shift the pages. `id` only breaks
+    ties in the sort.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
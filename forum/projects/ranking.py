@@ -0,0 +1,104 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from elasticsearch_dsl.query import FunctionScore
+
+SEEKING_FUNDING = 'Seeking Funding'
+
+
+def get_profiles():
+    return getattr(settings, 'PROJECT_SEARCH_RANKING_PROFILES', {'relevance': {}})
+
+
+def get_default_profile():
+    return getattr(settings, 'PROJECT_SEARCH_DEFAULT_RANKING', 'relevance')
+
+
+@lru_cache(maxsize=None)
+def compile_profile(name):
+    """
+    Translate a ranking profile of `PROJECT_SEARCH_RANKING_PROFILES` into the
+    body of a `function_score` query, without the wrapped query.
+
+    A profile may combine:
+    - `recency`: gauss decay on `created_at` (`scale`, `offset`, `decay`).
+    - `seeking_funding`: constant boost of the projects still seeking funding.
+    - `remaining_funding`: linear decay on `funded_percent`, favouring the
+      projects with most of their goal still open (`scale`, `decay`).
+    each with a `weight`. The function scores are summed and multiply the
+    text relevance (`score_mode` and `boost_mode` override this).
+
+    Profiles are compiled once per process; per request only the text query
+    and the recency origin (see `rank`) change.
+
+    Returns:
+        dict: The `function_score` parameters, or None for plain relevance.
+    """
+    profile = get_profiles()[name]
+    functions = []
+
+    if 'recency' in profile:
+        recency = profile['recency']
+        functions.append({
+            'gauss': {'created_at': {
+                'origin': 'now',
+                'scale': recency.get('scale', '30d'),
+                'offset': recency.get('offset', '0d'),
+                'decay': recency.get('decay', 0.5),
+            }},
+            'weight': recency.get('weight', 1),
+        })
+
+    if 'seeking_funding' in profile:
+        functions.append({
+            'filter': {'term': {'status.raw': SEEKING_FUNDING}},
+            'weight': profile['seeking_funding'].get('weight', 1),
+        })
+
+    if 'remaining_funding' in profile:
+        remaining = profile['remaining_funding']
+        functions.append({
+            'linear': {'funded_percent': {
+                'origin': 0,
+                'scale': remaining.get('scale', 50),
+                'decay': remaining.get('decay', 0.5),
+            }},
+            'weight': remaining.get('weight', 1),
+        })
+
+    if not functions:
+        return None
+
+    return {
+        'functions': functions,
+        'score_mode': profile.get('score_mode', 'sum'),
+        'boost_mode': profile.get('boost_mode', 'multiply'),
+    }
+
+
+def rank(query, name=None, origin='now'):
+    """
+    Wrap `query` in the `function_score` of the ranking profile `name`
+    (`PROJECT_SEARCH_DEFAULT_RANKING` when not given).
+
+    `origin` is the time the recency decay is computed at: pin it (epoch
+    milliseconds) to keep scores comparable across requests, e.g. the pages
+    of a `search_after` cursor.
+    """
+    template = compile_profile(name or get_default_profile())
+    if template is None:
+        return query
+    functions = [
+        {**function, 'gauss': {'created_at': {**function['gauss']['created_at'], 'origin': origin}}}
+        if 'gauss' in function else function
+        for function in template['functions']
+    ]
+    return FunctionScore(query=query, **{**template, 'functions': functions})
+
+
+@receiver(setting_changed)
+def clear_compiled_profiles(*, setting, **kwargs):
+    if setting in ('PROJECT_SEARCH_RANKING_PROFILES', 'PROJECT_SEARCH_DEFAULT_RANKING'):
+        compile_profile.cache_clear()
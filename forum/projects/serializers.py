@@ -1,10 +1,14 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 
+from forum.serializers import DynamicFieldsMixin
 from startups.serializers import StartupProfileSerializer
 from .models import Project
+from .ranking import get_profiles
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     startup = StartupProfileSerializer(read_only=True)
     status_display = serializers.SerializerMethodField()
 
@@ -78,6 +82,24 @@ class UpdateProjectSerializer(serializers.ModelSerializer):
         return data
 
 
+class ProjectListFilterSerializer(serializers.Serializer):
+    """
+    Validates the query parameters accepted by the project list endpoint.
+    """
+    status = serializers.ChoiceField(choices=Project.STATUS_CHOICES, required=False)
+    startup = serializers.IntegerField(required=False, min_value=1)
+    funding_goal_min = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, min_value=Decimal('0'))
+    funding_goal_max = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, min_value=Decimal('0'))
+
+    def validate(self, data):
+        funding_goal_min = data.get('funding_goal_min')
+        funding_goal_max = data.get('funding_goal_max')
+
+        if funding_goal_min is not None and funding_goal_max is not None and funding_goal_min > funding_goal_max:
+            raise serializers.ValidationError("funding_goal_min cannot exceed funding_goal_max.")
+        return data
+
+
 class ProjectSearchSerializer(serializers.ModelSerializer):
     startup_name = serializers.CharField(source='startup.company_name')
 
@@ -92,3 +114,70 @@ class ProjectSearchSerializer(serializers.ModelSerializer):
             'startup_name',
             'created_at'
         ]
+
+
+class ProjectSearchHitSerializer(serializers.Serializer):
+    """
+    Serializes Elasticsearch hits for the search endpoint.
+
+    Produces the same representation as `ProjectSearchSerializer`, but reads
+    from the document `_source` instead of a `Project` instance.
+    """
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    description = serializers.CharField()
+    status = serializers.CharField()
+    funding_goal = serializers.DecimalField(max_digits=10, decimal_places=2)
+    startup_name = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+
+class ProjectSearchFilterSerializer(serializers.Serializer):
+    """
+    Validates the query parameters accepted by the project search endpoint.
+    """
+    q = serializers.CharField(required=False, allow_blank=True, default='')
+    status = serializers.CharField(required=False)
+    industry = serializers.CharField(required=False)
+    startup = serializers.IntegerField(required=False, min_value=1)
+    funding_goal_min = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, min_value=Decimal('0'))
+    funding_goal_max = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, min_value=Decimal('0'))
+    industry_ids = serializers.CharField(required=False)
+    preferred_industries = serializers.BooleanField(required=False, default=False)
+    funded_percent_min = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False, min_value=Decimal('0'), max_value=Decimal('100')
+    )
+    funded_percent_max = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False, min_value=Decimal('0'), max_value=Decimal('100')
+    )
+    facets = serializers.BooleanField(required=False, default=False)
+    ranking = serializers.CharField(required=False)
+
+    def validate_ranking(self, value):
+        profiles = get_profiles()
+        if value not in profiles:
+            raise serializers.ValidationError(f"Expected one of: {', '.join(profiles)}.")
+        return value
+
+    def validate_industry_ids(self, value):
+        try:
+            return [int(industry_id) for industry_id in value.split(',') if industry_id.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Expected a comma separated list of industry IDs.")
+
+    def validate(self, data):
+        for name in ('funding_goal', 'funded_percent'):
+            low = data.get(f'{name}_min')
+            high = data.get(f'{name}_max')
+
+            if low is not None and high is not None and low > high:
+                raise serializers.ValidationError(f"{name}_min cannot exceed {name}_max.")
+        return data
+
+
+class ProjectSuggestQuerySerializer(serializers.Serializer):
+    """
+    Validates the query parameters accepted by the suggest endpoint.
+    """
+    q = serializers.CharField(max_length=100, trim_whitespace=True)
+    size = serializers.IntegerField(required=False, min_value=1, max_value=10, default=5)
@@ -1,10 +1,12 @@
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from .documents import ProjectDocument
-from .models import Project
+from investors.models import InvestorTrackedProject
+from startups.models import Industry, StartupProfile
+from .indexing import DELETE, enqueue_projects, enqueue_startups
+from .models import Project, ProjectTombstone
 from .tasks import send_project_update
 
 
@@ -16,7 +18,7 @@ def combined_project_update(sender, instance, created, **kwargs):
     This function is triggered after a Project instance is saved. It performs the following actions:
     - Sends an asynchronous update notification using Celery.
     - Sends an update message to the corresponding WebSocket group.
-    - Updates the Elasticsearch document for the Project model.
+    - Queues the Elasticsearch document of the project for (re)indexing.
 
     Args:
         sender (Model): The model class that sent the signal.
@@ -45,18 +47,80 @@ def combined_project_update(sender, instance, created, **kwargs):
         }
     )
 
-    # Elasticsearch document update
-    ProjectDocument().save(instance)
+    # Elasticsearch document update, flushed in bulk after commit
+    enqueue_projects([instance.pk])
 
 
 @receiver(post_delete, sender=Project)
 def delete_project_document(sender, instance, **kwargs):
     """
-    Signal to delete the Elasticsearch document for the Project model when an instance is deleted.
+    Signal to queue the deletion of the Elasticsearch document for the Project model when an instance is deleted.
+    A tombstone is left for the incremental sync in case the queued deletion is lost.
 
     Args:
         sender: The model class.
         instance: The instance being deleted.
         kwargs: Additional keyword arguments.
     """
-    ProjectDocument().delete(instance, ignore=404)
\ No newline at end of file
+    ProjectTombstone.objects.create(project_id=instance.pk)
+    enqueue_projects([instance.pk], action=DELETE)
+
+
+@receiver(post_save, sender=StartupProfile)
+def reindex_startup(sender, instance, created, **kwargs):
+    """
+    Queue the startup document for reindexing, along with the documents of its
+    projects, which embed the startup name.
+    """
+    enqueue_startups([instance.pk])
+    if not created:
+        enqueue_projects(instance.projects.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=StartupProfile)
+def delete_startup_document(sender, instance, **kwargs):
+    """
+    Queue the deletion of the startup document. Its projects are removed by the
+    cascade, which fires their own delete signals.
+    """
+    enqueue_startups([instance.pk], action=DELETE)
+
+
+@receiver(m2m_changed, sender=StartupProfile.industries.through)
+def reindex_projects_on_industries_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Queue the affected projects for reindexing when startup industries change,
+    since their documents embed the industry names.
+    """
+    # Clears are handled before they happen, while the links can still be read.
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        # `instance` is an industry and `pk_set` holds the startups (None on clear).
+        if pk_set is None:
+            projects = Project.objects.filter(startup__industries=instance)
+        else:
+            projects = Project.objects.filter(startup_id__in=pk_set)
+    else:
+        projects = instance.projects.all()
+    enqueue_projects(projects.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Industry)
+def reindex_projects_on_industry_rename(sender, instance, created, **kwargs):
+    """
+    Queue the projects of the industry's startups for reindexing, since their
+    documents embed the industry names.
+    """
+    if not created:
+        enqueue_projects(Project.objects.filter(startup__industries=instance).values_list('id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=InvestorTrackedProject)
+def reindex_project_on_investment_change(sender, instance, **kwargs):
+    """
+    Queue the tracked project for reindexing, since its document holds the
+    funded percent.
+    """
+    enqueue_projects([instance.project_id])
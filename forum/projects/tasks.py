@@ -1,8 +1,24 @@
 import logging
+from collections import defaultdict
 
 from asgiref.sync import async_to_sync
 from celery import shared_task
+from celery.exceptions import MaxRetriesExceededError
 from channels.layers import get_channel_layer
+from elasticsearch.helpers import bulk
+from elasticsearch_dsl.connections import connections
+
+from .indexing import (
+    DELETE,
+    INDEX,
+    PROJECT,
+    get_documents,
+    get_index_buffer,
+    invalidate_related,
+    sync_projects,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
@@ -37,4 +53,111 @@ def send_project_update(id, title, description):
         }
     )
 
-    logging.info(f"Update sent for project: {id}")
\ No newline at end of file
+    logging.info(f"Update sent for project: {id}")
+
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def flush_search_index(self):
+    """
+    Writes every buffered search document change to Elasticsearch in bulk.
+
+    The buffer is drained in one go and, for each document type, the rows
+    still present in the database are re-read with a single query and
+    indexed while the rest are deleted from the index, all in one bulk
+    request. Documents rejected by Elasticsearch are put back into the buffer
+    (unless a newer change was recorded for them meanwhile) so the next flush
+    retries them; if Elasticsearch is unreachable the whole batch is put back
+    and the task is retried. The cached related projects of the written
+    projects are dropped.
+
+    Returns:
+        int: The number of documents written successfully.
+    """
+    buffer = get_index_buffer()
+    pending = buffer.drain()
+    if not pending:
+        return 0
+
+    requested = defaultdict(dict)
+    for key, action in pending.items():
+        label, pk = key.split(':', 1)
+        requested[label][int(pk)] = action
+
+    actions = []
+    keys = {}
+    labels = {}
+    for label, document_class in get_documents().items():
+        if label not in requested:
+            continue
+
+        document = document_class()
+        index_name = document._index._name
+        index_ids = [pk for pk, action in requested[label].items() if action == INDEX]
+        instances = list(document.get_queryset().filter(pk__in=index_ids))
+        found_ids = {instance.pk for instance in instances}
+
+        actions += [document._prepare_action(instance, INDEX) for instance in instances]
+        actions += [
+            {'_op_type': DELETE, '_index': index_name, '_id': pk}
+            for pk in requested[label] if pk not in found_ids
+        ]
+        labels[index_name] = label
+        keys.update({(label, str(pk)): f'{label}:{pk}' for pk in requested[label]})
+
+    try:
+        success, errors = bulk(connections.get_connection(), actions, raise_on_error=False, refresh=False)
+    except Exception as e:
+        logger.error(f"Failed to flush {len(pending)} documents to Elasticsearch: {e}")
+        buffer.add_many(pending, overwrite=False)
+        try:
+            raise self.retry(exc=e)
+        except MaxRetriesExceededError:
+            logger.error("Max retries exceeded while flushing documents to Elasticsearch")
+            return 0
+
+    invalidate_related(requested.get(PROJECT, {}))
+
+    failed = {}
+    for error in errors:
+        action, result = next(iter(error.items()))
+        # Deleting a document that was never indexed is not an error.
+        if action == DELETE and result.get('status') == 404:
+            continue
+        label = get_label(result['_index'], labels)
+        if label is None:
+            logger.warning(f"Elasticsearch rejected document {result['_id']} of unknown index {result['_index']}")
+            failed.update({key: pending[key] for (_, pk), key in keys.items() if pk == str(result['_id'])})
+            continue
+        key = keys[(label, str(result['_id']))]
+        failed[key] = pending[key]
+
+    if failed:
+        logger.warning(f"Elasticsearch rejected {len(failed)} documents, requeued them")
+        buffer.add_many(failed, overwrite=False)
+
+    logger.info(f"Flushed {success} documents to Elasticsearch")
+    return success
+
+
+def get_label(index_name, labels):
+    """
+    Buffer label of the documents stored in `index_name`, given the labels of
+    the index aliases. Bulk errors name the concrete index behind an alias,
+    which `bulk_index_projects` names `<alias>-<timestamp>`.
+    """
+    if index_name in labels:
+        return labels[index_name]
+    return labels.get(index_name.rsplit('-', 1)[0])
+
+
+@shared_task
+def sync_project_index():
+    """
+    Safety net behind the signal-driven indexer: queues the projects changed
+    or deleted since the last run (see `projects.indexing.sync_projects`).
+    Scheduled every minute through Celery beat.
+    """
+    indexed, deleted = sync_projects()
+    logger.info(f"Incremental sync queued {indexed} projects for indexing and {deleted} for deletion")
+    return indexed, deleted
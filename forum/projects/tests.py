@@ -1,9 +1,30 @@
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from elasticsearch import ConnectionTimeout
+from elasticsearch_dsl.utils import AttrDict
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
 
-from projects.models import Project
+from investors.models import (
+    InvestorPreferredIndustry,
+    InvestorProfile,
+    InvestorTrackedProject,
+)
+from projects.documents import ProjectDocument
+from projects.indexing import (
+    DELETE,
+    INDEX,
+    get_index_buffer,
+    invalidate_related,
+    sync_projects,
+)
+from projects.models import Project, ProjectTombstone, SearchSyncState
+from projects.tasks import flush_search_index
 from projects.views import ProjectDetailAPIView, ProjectListCreateAPIView
-from startups.models import StartupProfile
+from projects.viewsets import ProjectRelatedView, ProjectSearchView, ProjectSuggestView
+from startups.models import Industry, StartupProfile
 from users.models import User
 
 
@@ -52,8 +73,50 @@ class ProjectApiTests(APITestCase):
         response = view(request)
         # print(response.data)  # For debugging
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], self.project.title)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], self.project.title)
+        self.assertIsNone(response.data['next'])
+
+    def test_get_project_list_pages_with_cursor_in_fixed_queries(self):
+        """
+        Test: the project list is filtered, cursor-paginated newest first, and a page costs the same queries.
+        """
+        view = ProjectListCreateAPIView.as_view()
+        projects = [
+            Project.objects.create(
+                startup=self.startup,
+                title=f"Project {index}",
+                description="A test project description.",
+                funding_goal=200000.00,
+                funding_needed=50000.00,
+                status="In Progress",
+                duration=12
+            )
+            for index in range(5)
+        ]
+
+        request = self.factory.get('/api/projects/', {'status': 'In Progress', 'page_size': 3})
+        force_authenticate(request, user=self.user)
+        # Projects with startups and users, then startup industries.
+        with self.assertNumQueries(2):
+            response = view(request)
+            response.render()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['id'] for project in response.data['results']],
+                         [project.id for project in projects[:1:-1]])
+
+        request = self.factory.get(response.data['next'])
+        force_authenticate(request, user=self.user)
+        second_page = view(request)
+
+        self.assertEqual([project['id'] for project in second_page.data['results']],
+                         [projects[1].id, projects[0].id])
+        self.assertIsNone(second_page.data['next'])
+
+        request = self.factory.get('/api/projects/', {'funding_goal_min': 500, 'funding_goal_max': 100})
+        force_authenticate(request, user=self.user)
+        self.assertEqual(view(request).status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_create_project(self):
         """
@@ -113,3 +176,592 @@ class ProjectApiTests(APITestCase):
         # print(response.data)  # For debugging
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['title'], payload['title'])
+
+    def _mock_hit(self, project):
+        hit = MagicMock()
+        hit.meta.id = str(project.id)
+        hit.meta.sort = [1.0, 1700000000000, project.id]
+        hit.to_dict.return_value = {
+            "title": project.title,
+            "description": project.description,
+            "status": project.status,
+            "funding_goal": 100000.0,
+            "startup_name": project.startup.company_name,
+            "created_at": project.created_at,
+        }
+        return hit
+
+    def _mock_search(self, hits):
+        response = MagicMock()
+        response.__iter__.return_value = iter(hits)
+        response.hits.total.value = len(hits)
+
+        search = MagicMock()
+        for method in ('query', 'filter', 'source', 'sort', 'extra'):
+            getattr(search, method).return_value = search
+        search.execute.return_value = response
+        return search
+
+    def test_search_serves_results_from_source(self):
+        """
+        Test: search results are built from the Elasticsearch hits without touching the database.
+        """
+        view = ProjectSearchView.as_view()
+
+        search = self._mock_search([self._mock_hit(self.project)])
+
+        request = self.factory.get('/api/projects/search/', {'q': 'test'})
+        force_authenticate(request, user=self.user)
+
+        with patch('projects.backends.ProjectDocument.search', return_value=search), \
+                self.assertNumQueries(0):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['id'], self.project.id)
+        self.assertEqual(response.data['results'][0]['startup_name'], self.startup.company_name)
+        self.assertEqual(response.data['results'][0]['funding_goal'], '100000.00')
+
+    def test_search_paginates_with_search_after_cursor(self):
+        """
+        Test: search returns an opaque cursor that is passed back to Elasticsearch as `search_after`.
+        """
+        view = ProjectSearchView.as_view()
+        other_project = Project.objects.create(
+            startup=self.startup,
+            title="Other Project",
+            description="Another test project description.",
+            funding_goal=100000.00,
+            funding_needed=50000.00,
+            status="Seeking Funding",
+            duration=6
+        )
+        search = self._mock_search([self._mock_hit(self.project), self._mock_hit(other_project)])
+
+        request = self.factory.get('/api/projects/search/', {'page_size': 1})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNotNone(response.data['next_cursor'])
+        search.extra.assert_called_with(size=2)
+
+        search = self._mock_search([self._mock_hit(other_project)])
+        request = self.factory.get('/api/projects/search/', {'page_size': 1, 'cursor': response.data['next_cursor']})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['id'], other_project.id)
+        self.assertIsNone(response.data['next_cursor'])
+        search.extra.assert_any_call(search_after=[1.0, 1700000000000, self.project.id])
+
+    def test_search_with_invalid_cursor_returns_404(self):
+        """
+        Test: a malformed cursor is rejected instead of failing the search.
+        """
+        view = ProjectSearchView.as_view()
+
+        request = self.factory.get('/api/projects/search/', {'cursor': 'not-a-cursor'})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=self._mock_search([])):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_returns_facets_with_hits(self):
+        """
+        Test: `facets=true` requests the aggregations in the same search and returns their buckets.
+        """
+        view = ProjectSearchView.as_view()
+
+        search = self._mock_search([self._mock_hit(self.project)])
+        search.execute.return_value.aggregations = AttrDict({
+            'status': {'buckets': [{'key': 'Seeking Funding', 'doc_count': 1}]},
+            'industries': {'buckets': [{'key': 'Fintech', 'doc_count': 1}]},
+            'funding_goal': {'buckets': [{'key': 100000.0, 'doc_count': 1}]},
+            'duration': {'buckets': [{'key': '0-6', 'doc_count': 0}, {'key': '6-12', 'doc_count': 1}]},
+        })
+
+        request = self.factory.get('/api/projects/search/', {'facets': 'true', 'status': 'seeking funding'})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['facets']['status'], [{'value': 'Seeking Funding', 'count': 1}])
+        self.assertEqual(response.data['facets']['industries'], [{'value': 'Fintech', 'count': 1}])
+        self.assertEqual(response.data['facets']['funding_goal'][0]['to'], 150000.0)
+        self.assertEqual(response.data['facets']['duration'][1], {'value': '6-12', 'count': 1})
+        search.aggs.bucket.assert_any_call('status', 'terms', field='status.raw', size=10)
+        search.filter.assert_any_call(
+            'term', **{'status.raw': {'value': 'seeking funding', 'case_insensitive': True}}
+        )
+
+    def test_search_filters_on_preferred_industries_and_funded_percent(self):
+        """
+        Test: industry and funding progress filters run against the denormalized document fields.
+        """
+        view = ProjectSearchView.as_view()
+        fintech = Industry.objects.create(name="Fintech")
+        investor = InvestorProfile.objects.create(
+            user=self.user,
+            company_name="Test Investor",
+            investment_focus="Fintech",
+            contact_email="investor@example.com",
+            investment_range="$10000"
+        )
+        InvestorPreferredIndustry.objects.create(investor=investor, industry=fintech)
+
+        search = self._mock_search([self._mock_hit(self.project)])
+        request = self.factory.get('/api/projects/search/', {
+            'preferred_industries': 'true', 'funded_percent_min': 25, 'funded_percent_max': 75
+        })
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        search.filter.assert_any_call('terms', industry_ids=[fintech.id])
+        search.filter.assert_any_call('range', funded_percent={'gte': 25.0, 'lte': 75.0})
+
+    @override_settings(SEARCH_BACKEND='projects.backends.DatabaseSearchBackend')
+    def test_database_backend_filters_on_industry_ids_and_funded_percent(self):
+        """
+        Test: the database backend applies the industry and funding progress filters too.
+        """
+        view = ProjectSearchView.as_view()
+        fintech = Industry.objects.create(name="Fintech")
+        self.startup.industries.add(fintech)
+        investor = InvestorProfile.objects.create(
+            user=self.user,
+            company_name="Test Investor",
+            investment_focus="Fintech",
+            contact_email="investor@example.com",
+            investment_range="$10000"
+        )
+        InvestorTrackedProject.objects.create(investor=investor, project=self.project, share=40)
+        Project.objects.create(
+            startup=self.startup,
+            title="Unfunded Project",
+            description="No investors yet.",
+            funding_goal=1000.00,
+            funding_needed=1000.00,
+            status="Seeking Funding",
+            duration=3
+        )
+
+        request = self.factory.get('/api/projects/search/', {
+            'industry_ids': str(fintech.id), 'funded_percent_min': 30
+        })
+        force_authenticate(request, user=self.user)
+        response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['id'] for result in response.data['results']], [self.project.id])
+
+    @override_settings(PROJECT_SEARCH_RANKING_PROFILES={
+        'relevance': {},
+        'fresh': {'recency': {'scale': '10d'}, 'seeking_funding': {'weight': 2}},
+    })
+    def test_search_wraps_query_in_selected_ranking_profile(self):
+        """
+        Test: `ranking` selects the function_score profile wrapped around the text query.
+        """
+        view = ProjectSearchView.as_view()
+
+        search = self._mock_search([self._mock_hit(self.project)])
+        request = self.factory.get('/api/projects/search/', {'q': 'test', 'ranking': 'fresh'})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search), \
+                patch('projects.pagination.time.time', return_value=1700000000.0):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        query = search.query.call_args.args[0].to_dict()['function_score']
+        self.assertEqual(query['query']['multi_match']['query'], 'test')
+        self.assertEqual(query['functions'], [
+            {'gauss': {'created_at': {
+                'origin': 1700000000000, 'scale': '10d', 'offset': '0d', 'decay': 0.5
+            }}, 'weight': 1},
+            {'filter': {'term': {'status.raw': 'Seeking Funding'}}, 'weight': 2},
+        ])
+
+        request = self.factory.get('/api/projects/search/', {'q': 'test', 'ranking': 'unknown'})
+        force_authenticate(request, user=self.user)
+        self.assertEqual(view(request).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PROJECT_SEARCH_RANKING_PROFILES={'relevance': {}, 'fresh': {'recency': {'scale': '10d'}}})
+    def test_search_cursor_pins_recency_origin(self):
+        """
+        Test: the next page is scored at the time the first page was served, so its cursor scores stay valid.
+        """
+        view = ProjectSearchView.as_view()
+        other_project = Project.objects.create(
+            startup=self.startup,
+            title="Other Project",
+            description="Another test project description.",
+            funding_goal=100000.00,
+            funding_needed=50000.00,
+            status="Seeking Funding",
+            duration=6
+        )
+
+        def origin(search):
+            functions = search.query.call_args.args[0].to_dict()['function_score']['functions']
+            return functions[0]['gauss']['created_at']['origin']
+
+        search = self._mock_search([self._mock_hit(self.project), self._mock_hit(other_project)])
+        request = self.factory.get('/api/projects/search/', {'q': 'test', 'ranking': 'fresh', 'page_size': 1})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search), \
+                patch('projects.pagination.time.time', return_value=1700000000.0):
+            response = view(request)
+        self.assertEqual(origin(search), 1700000000000)
+
+        # A day later
+        search = self._mock_search([self._mock_hit(other_project)])
+        request = self.factory.get('/api/projects/search/', {
+            'q': 'test', 'ranking': 'fresh', 'page_size': 1, 'cursor': response.data['next_cursor']
+        })
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search), \
+                patch('projects.pagination.time.time', return_value=1700086400.0):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(origin(search), 1700000000000)
+        search.extra.assert_any_call(search_after=[1.0, 1700000000000, self.project.id])
+
+    def test_search_with_invalid_funding_range_returns_400(self):
+        """
+        Test: an inverted funding goal range is rejected before querying Elasticsearch.
+        """
+        view = ProjectSearchView.as_view()
+
+        request = self.factory.get('/api/projects/search/', {'funding_goal_min': 500, 'funding_goal_max': 100})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search') as search:
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        search.assert_not_called()
+
+    @override_settings(SEARCH_BACKEND='projects.backends.DatabaseSearchBackend')
+    def test_database_backend_searches_without_elasticsearch(self):
+        """
+        Test: the database backend matches, facets and paginates projects with the same response shape.
+        """
+        view = ProjectSearchView.as_view()
+        Project.objects.create(
+            startup=self.startup,
+            title="Solar Test Farm",
+            description="Renewable energy.",
+            funding_goal=250000.00,
+            funding_needed=50000.00,
+            status="In Progress",
+            duration=30
+        )
+        Project.objects.create(
+            startup=self.startup,
+            title="Unrelated",
+            description="Nothing to see.",
+            funding_goal=1000.00,
+            funding_needed=500.00,
+            status="Completed",
+            duration=3
+        )
+
+        request = self.factory.get('/api/projects/search/', {'q': 'test', 'facets': 'true', 'page_size': 1})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search') as search:
+            response = view(request)
+
+        search.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['startup_name'], self.startup.company_name)
+        self.assertEqual(
+            sorted(facet['value'] for facet in response.data['facets']['status']),
+            ['In Progress', 'Seeking Funding']
+        )
+        self.assertEqual(response.data['facets']['duration'][3], {'value': '24+', 'count': 1})
+
+        request = self.factory.get(
+            '/api/projects/search/', {'q': 'test', 'page_size': 1, 'cursor': response.data['next_cursor']}
+        )
+        force_authenticate(request, user=self.user)
+        second_page = view(request)
+
+        self.assertEqual(second_page.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second_page.data['results'][0]['id'], response.data['results'][0]['id'])
+        self.assertIsNone(second_page.data['next_cursor'])
+
+    def test_search_fails_over_to_database_when_elasticsearch_times_out(self):
+        """
+        Test: a timed out Elasticsearch search is answered by the fallback backend, which is then used directly.
+        """
+        view = ProjectSearchView.as_view()
+        cache.clear()
+
+        search = self._mock_search([])
+        search.execute.side_effect = ConnectionTimeout("timed out")
+
+        request = self.factory.get('/api/projects/search/', {'q': 'test'})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search):
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['id'], self.project.id)
+
+        request = self.factory.get('/api/projects/search/', {'q': 'test'})
+        force_authenticate(request, user=self.user)
+        with patch('projects.backends.ProjectDocument.search', return_value=search) as document_search:
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        document_search.assert_not_called()
+        cache.clear()
+
+    def test_suggest_returns_projects_and_startups(self):
+        """
+        Test: suggestions for both indices are fetched with a single multi-search request.
+        """
+        view = ProjectSuggestView.as_view()
+
+        project_response = AttrDict({'suggest': {'suggestions': [{'options': [
+            {'_id': str(self.project.id), '_source': {'title': self.project.title, 'startup_name': 'Test Startup'}},
+        ]}]}})
+        startup_response = AttrDict({'suggest': {'suggestions': [{'options': [
+            {'_id': str(self.startup.id), '_source': {'company_name': self.startup.company_name}},
+        ]}]}})
+
+        request = self.factory.get('/api/projects/suggest/', {'q': 'tes'})
+        force_authenticate(request, user=self.user)
+        with patch('projects.viewsets.MultiSearch') as multi_search:
+            multi_search.return_value.add.return_value = multi_search.return_value
+            multi_search.return_value.execute.return_value = [project_response, startup_response]
+            response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['projects'][0]['id'], self.project.id)
+        self.assertEqual(response.data['startups'][0]['company_name'], self.startup.company_name)
+        multi_search.return_value.execute.assert_called_once()
+
+    def test_related_projects_are_cached_until_reindexed(self):
+        """
+        Test: related projects come from a more_like_this query on the project's document and are cached.
+        """
+        view = ProjectRelatedView.as_view()
+        other = Project.objects.create(
+            startup=self.startup,
+            title="Another Test Project",
+            description="A similar test project.",
+            funding_goal=100000.00,
+            funding_needed=50000.00,
+            status="Seeking Funding",
+            duration=12
+        )
+        cache.delete(f'related-projects:{self.project.id}')
+        search = self._mock_search([self._mock_hit(other)])
+
+        with patch('projects.viewsets.ProjectDocument.search', return_value=search):
+            for _ in range(2):
+                request = self.factory.get(f'/api/projects/{self.project.id}/related/')
+                force_authenticate(request, user=self.user)
+                response = view(request, pk=self.project.id)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual([result['id'] for result in response.data], [other.id])
+
+        search.execute.assert_called_once()
+        query = search.query.call_args.args[0].to_dict()['more_like_this']
+        self.assertEqual(query['like'], [{'_index': 'projects', '_id': str(self.project.id)}])
+
+        invalidate_related([self.project.id])
+        self.assertIsNone(cache.get(f'related-projects:{self.project.id}'))
+
+    def test_related_projects_of_missing_project_returns_404(self):
+        """
+        Test: asking for the related projects of an unknown project returns 404 without querying Elasticsearch.
+        """
+        view = ProjectRelatedView.as_view()
+
+        request = self.factory.get('/api/projects/999/related/')
+        force_authenticate(request, user=self.user)
+        with patch('projects.viewsets.ProjectDocument.search') as search:
+            response = view(request, pk=999)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        search.assert_not_called()
+
+    def test_suggest_requires_query(self):
+        """
+        Test: the suggest endpoint rejects requests without a prefix.
+        """
+        view = ProjectSuggestView.as_view()
+
+        request = self.factory.get('/api/projects/suggest/')
+        force_authenticate(request, user=self.user)
+        response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@patch('projects.tasks.flush_search_index')
+class ProjectIndexingTests(TestCase):
+
+    def setUp(self):
+        """
+        Setting up the test environment.
+        """
+        self.user = User.objects.create_user(
+            first_name="testuser",
+            last_name="testuser",
+            password="testpassword",
+            email="test@example.com",
+            is_startup="True"
+        )
+        self.startup = StartupProfile.objects.create(
+            user=self.user,
+            company_name="Test Startup",
+            description="A test startup.",
+            contact_email="teststartup@example.com"
+        )
+        self.buffer = get_index_buffer()
+        self.buffer.drain()
+
+    def _create_project(self, title="Test Project"):
+        return Project.objects.create(
+            startup=self.startup,
+            title=title,
+            description="A test project description.",
+            funding_goal=100000.00,
+            funding_needed=50000.00,
+            status="Seeking Funding",
+            duration=12
+        )
+
+    def test_changes_are_buffered_after_commit_and_coalesced(self, flush_task):
+        """
+        Test: repeated saves of a project leave a single pending entry, recorded only on commit.
+        """
+        with self.captureOnCommitCallbacks() as callbacks:
+            project = self._create_project()
+            project.title = "Renamed Project"
+            project.save()
+            self.assertEqual(len(self.buffer), 0)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(self.buffer.drain(), {f'project:{project.id}': INDEX})
+        flush_task.apply_async.assert_called_once()
+
+    def test_delete_supersedes_pending_update(self, flush_task):
+        """
+        Test: deleting a project replaces its pending update with a delete.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            project = self._create_project()
+            project_id = project.id
+            project.delete()
+
+        self.assertEqual(self.buffer.drain(), {f'project:{project_id}': DELETE})
+
+    def test_investment_change_reindexes_funded_percent(self, flush_task):
+        """
+        Test: tracking a project queues it for reindexing with the new funded percent.
+        """
+        project = self._create_project()
+        investor = InvestorProfile.objects.create(
+            user=self.user,
+            company_name="Test Investor",
+            investment_focus="Fintech",
+            contact_email="investor@example.com",
+            investment_range="$10000"
+        )
+        self.buffer.drain()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            InvestorTrackedProject.objects.create(investor=investor, project=project, share=12.5)
+
+        self.assertEqual(self.buffer.drain(), {f'project:{project.id}': INDEX})
+        document = ProjectDocument()
+        self.assertEqual(document.prepare(document.get_queryset().get(pk=project.pk))['funded_percent'], 12.5)
+
+    def test_flush_writes_buffered_projects_in_one_bulk_request(self, flush_task):
+        """
+        Test: a flush indexes existing projects, deletes missing ones and requeues rejected documents.
+        """
+        indexed = self._create_project()
+        rejected = self._create_project(title="Rejected Project")
+        self.buffer.add_many({
+            f'project:{indexed.id}': INDEX,
+            f'project:{rejected.id}': INDEX,
+            'project:999': INDEX,
+            f'startup:{self.startup.id}': INDEX,
+        })
+
+        errors = [{'index': {'_index': 'projects', '_id': str(rejected.id), 'status': 429}}]
+        with patch('projects.tasks.connections'), \
+                patch('projects.tasks.bulk', return_value=(3, errors)) as bulk:
+            self.assertEqual(flush_search_index.run(), 3)
+
+        bulk.assert_called_once()
+        actions = {
+            (action['_index'], action['_op_type'], int(action['_id']))
+            for action in bulk.call_args.args[1]
+        }
+        self.assertEqual(actions, {
+            ('projects', 'index', indexed.id),
+            ('projects', 'index', rejected.id),
+            ('projects', 'delete', 999),
+            ('startups', 'index', self.startup.id),
+        })
+        self.assertEqual(self.buffer.drain(), {f'project:{rejected.id}': INDEX})
+
+    def test_flush_requeues_documents_rejected_by_a_versioned_index(self, flush_task):
+        """
+        Test: errors naming the concrete index behind the alias requeue the rejected documents.
+        """
+        project = self._create_project()
+        self.buffer.add_many({f'project:{project.id}': INDEX, f'startup:{self.startup.id}': INDEX})
+
+        errors = [
+            {'index': {'_index': 'projects-20250101120000', '_id': str(project.id), 'status': 429}},
+            {'index': {'_index': 'startups-20250101120000', '_id': str(self.startup.id), 'status': 400}},
+        ]
+        with patch('projects.tasks.connections'), patch('projects.tasks.bulk', return_value=(0, errors)):
+            self.assertEqual(flush_search_index.run(), 0)
+
+        self.assertEqual(
+            self.buffer.drain(),
+            {f'project:{project.id}': INDEX, f'startup:{self.startup.id}': INDEX}
+        )
+
+    def test_incremental_sync_queues_changed_and_deleted_projects(self, flush_task):
+        """
+        Test: the incremental sync walks changed projects in chunks, advances the watermark and consumes tombstones.
+        """
+        first = self._create_project()
+        second = self._create_project(title="Second Project")
+
+        self.assertEqual(sync_projects(chunk_size=1), (2, 0))
+        self.assertEqual(self.buffer.drain(), {f'project:{first.id}': INDEX, f'project:{second.id}': INDEX})
+        second.refresh_from_db()
+        self.assertEqual(SearchSyncState.objects.get(name='projects').watermark, second.updated_at)
+
+        first_id = first.id
+        first.delete()
+        self.buffer.drain()
+
+        # The overlap window re-reads the recent change to `second`.
+        self.assertEqual(sync_projects(), (1, 1))
+        self.assertEqual(self.buffer.drain(), {f'project:{first_id}': DELETE, f'project:{second.id}': INDEX})
+        self.assertFalse(ProjectTombstone.objects.exists())
@@ -1,11 +1,13 @@
 from django.urls import path
 
 from .views import ProjectDetailAPIView, ProjectListCreateAPIView
-from .viewsets import ProjectSearchView
+from .viewsets import ProjectRelatedView, ProjectSearchView, ProjectSuggestView
 
 urlpatterns = [
     path('', ProjectListCreateAPIView.as_view(), name='project-list-create'),
     path('<int:pk>/', ProjectDetailAPIView.as_view(), name='project-detail'),
+    path('<int:pk>/related/', ProjectRelatedView.as_view(), name='project-related'),
     path('search/', ProjectSearchView.as_view(), name='project-search'),
+    path('suggest/', ProjectSuggestView.as_view(), name='project-suggest'),
 
 ]
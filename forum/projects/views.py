@@ -6,9 +6,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from forum.serializers import EXPAND_PARAMETER, FIELDS_PARAMETER, optimize_queryset
 from .models import Project
+from .pagination import ProjectCursorPagination
 from .serializers import (
     CreateProjectSerializer,
+    ProjectListFilterSerializer,
     ProjectSerializer,
     UpdateProjectSerializer,
 )
@@ -20,26 +23,81 @@ class ProjectListCreateAPIView(APIView):
     API for managing projects.
 
     Endpoints:
-    - GET: Retrieve all projects.
+    - GET: Retrieve projects, a cursor-paginated page at a time.
     - POST: Create a new project.
     """
 
+    pagination_class = ProjectCursorPagination
+
+    def get_queryset(self, filters, serializer):
+        """
+        Projects matching the validated `filters`, loading what `serializer`
+        renders (the startup, its user and its industries by default) in a
+        fixed number of queries per page.
+        """
+        ordering = [field.lstrip('-') for field in self.pagination_class.ordering]
+        queryset = optimize_queryset(Project.objects.all(), serializer, include=ordering)
+
+        if filters.get('status'):
+            queryset = queryset.filter(status=filters['status'])
+        if filters.get('startup'):
+            queryset = queryset.filter(startup_id=filters['startup'])
+        if filters.get('funding_goal_min') is not None:
+            queryset = queryset.filter(funding_goal__gte=filters['funding_goal_min'])
+        if filters.get('funding_goal_max') is not None:
+            queryset = queryset.filter(funding_goal__lte=filters['funding_goal_max'])
+        return queryset
+
     @swagger_auto_schema(
         operation_summary="Retrieve all projects",
-        operation_description="Get a list of all projects available in the system.",
+        operation_description="Get a page of the projects available in the system, newest first.",
         tags=["Projects"],
-        responses={200: ProjectSerializer(many=True)}
+        manual_parameters=[
+            openapi.Parameter('status', openapi.IN_QUERY, description="Filter by project status",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('startup', openapi.IN_QUERY, description="Filter by startup ID",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('funding_goal_min', openapi.IN_QUERY, description="Minimum funding goal",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('funding_goal_max', openapi.IN_QUERY, description="Maximum funding goal",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Cursor of the page to fetch",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of projects per page",
+                              type=openapi.TYPE_INTEGER),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
+        ],
+        responses={
+            200: ProjectSerializer(many=True),
+            400: "Bad Request: Invalid query parameters."
+        }
     )
     def get(self, request):
         """
-        Retrieve a list of all projects.
+        Retrieve a page of projects.
+
+        Query Parameters:
+            - status, startup, funding_goal_min, funding_goal_max: Optional filters.
+            - cursor (str): Cursor of the page to fetch, from the `next` link of the previous page.
+            - page_size (int): Number of projects per page (at most 100).
+            - fields (str): Comma separated fields to return, e.g. `id,title,startup.company_name`.
+            - expand (str): Comma separated nested objects to render, the others are returned as IDs.
 
         Responses:
-            - 200 OK: Successfully returns a list of all projects.
+            - 200 OK: Successfully returns a page of projects.
+            - 400 Bad Request: If the filters are invalid.
         """
-        projects = Project.objects.all()
-        serializer = ProjectSerializer(projects, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        filters = ProjectListFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+
+        context = {'request': request}
+        queryset = self.get_queryset(filters.validated_data, ProjectSerializer(many=True, context=context))
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = ProjectSerializer(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
 
     @swagger_auto_schema(
         operation_summary="Create a new project",
@@ -88,18 +146,19 @@ class ProjectDetailAPIView(APIView):
     - DELETE: Delete a project.
     """
 
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         """
         Retrieve a project by its ID.
 
         Args:
             - pk (int): The primary key of the project.
+            - queryset (QuerySet): The queryset to look it up in, all projects by default.
 
         Returns:
             - Project: The project instance if found.
             - None: If the project does not exist.
         """
-        return get_object_or_404(Project, pk=pk)
+        return get_object_or_404(Project if queryset is None else queryset, pk=pk)
 
     @swagger_auto_schema(
         operation_summary="Retrieve a specific project",
@@ -112,7 +171,9 @@ class ProjectDetailAPIView(APIView):
                 description="ID of the project",
                 type=openapi.TYPE_INTEGER,
                 required=True,
-            )
+            ),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
         responses={
             200: ProjectSerializer,
@@ -130,10 +191,12 @@ class ProjectDetailAPIView(APIView):
             - 200 OK: Successfully retrieves the project details.
             - 404 Not Found: If the project does not exist.
         """
-        project = self.get_object(pk)
+        context = {'request': request}
+        queryset = optimize_queryset(Project.objects.all(), ProjectSerializer(context=context))
+        project = self.get_object(pk, queryset)
         if project is None:
             return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = ProjectSerializer(project)
+        serializer = ProjectSerializer(project, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
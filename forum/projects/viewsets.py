@@ -1,77 +1,248 @@
-from django.db.models import Case, When
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from elasticsearch_dsl import Q
+from elasticsearch_dsl import MultiSearch
+from elasticsearch_dsl.query import MoreLikeThis
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from investors.models import InvestorPreferredIndustry
+from startups.documents import StartupDocument
+from .backends import SearchBackendUnavailable, get_search_backends, mark_unavailable
 from .documents import ProjectDocument
+from .indexing import RELATED_CACHE_KEY
 from .models import Project
-from .serializers import ProjectSearchSerializer
+from .pagination import SearchAfterPagination
+from .serializers import (
+    ProjectSearchFilterSerializer,
+    ProjectSearchHitSerializer,
+    ProjectSuggestQuerySerializer,
+)
+
+logger = logging.getLogger(__name__)
+
 
+class ProjectSearchView(APIView):
+    """
+    Full-text project search with filters, facets and cursor pagination.
 
-class ProjectSearchView(APIView, PageNumberPagination):
+    The query is answered by the backend configured in `SEARCH_BACKEND`. If it
+    times out or is unreachable, the request is retried on
+    `SEARCH_FALLBACK_BACKEND` and the primary backend is skipped for a while
+    (see `projects.backends`).
+    """
     permission_classes = [IsAuthenticated]
-    serializer_class = ProjectSearchSerializer
-    page_size = 10
-    document = ProjectDocument
+    pagination_class = SearchAfterPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = self.pagination_class()
+        return self._paginator
 
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter('q', openapi.IN_QUERY, description="Search query", type=openapi.TYPE_STRING),
-            openapi.Parameter('status', openapi.IN_QUERY, description="Filter by status", type=openapi.TYPE_STRING)
+            openapi.Parameter('status', openapi.IN_QUERY, description="Filter by status", type=openapi.TYPE_STRING),
+            openapi.Parameter('industry', openapi.IN_QUERY, description="Filter by industry names (comma separated)",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('startup', openapi.IN_QUERY, description="Filter by startup ID",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('funding_goal_min', openapi.IN_QUERY, description="Minimum funding goal",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('funding_goal_max', openapi.IN_QUERY, description="Maximum funding goal",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('industry_ids', openapi.IN_QUERY, description="Filter by industry IDs (comma separated)",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('preferred_industries', openapi.IN_QUERY,
+                              description="Filter by the preferred industries of the current investor",
+                              type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('funded_percent_min', openapi.IN_QUERY, description="Minimum percent funded",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('funded_percent_max', openapi.IN_QUERY, description="Maximum percent funded",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('ranking', openapi.IN_QUERY,
+                              description="Ranking profile (see PROJECT_SEARCH_RANKING_PROFILES)",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('facets', openapi.IN_QUERY, description="Include facet counts for status, industries, "
+                                                                      "funding goal and duration",
+                              type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque cursor returned as `next_cursor` "
+                                                                      "by the previous page", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of results per page",
+                              type=openapi.TYPE_INTEGER),
         ],
         responses={
-            200: ProjectSearchSerializer(many=True),
-            500: openapi.Response(description="Search failed")
+            200: ProjectSearchHitSerializer(many=True),
+            400: openapi.Response(description="Invalid query parameters"),
+            404: openapi.Response(description="Invalid cursor"),
+            500: openapi.Response(description="Search failed"),
+            503: openapi.Response(description="No search backend available")
         }
     )
     def get(self, request):
-        try:
-            query = request.GET.get('q', '')
-            status_filter = request.GET.get('status', None)
-
-            # Build Elasticsearch query
-            search = self.document.search()
-
-            # Multi-match with fuzziness for search
-            if query:
-                search = search.query(
-                    Q('multi_match',
-                      query=query,
-                      fields=['title^3', 'description'],
-                      fuzziness='AUTO')
+        filters = ProjectSearchFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        # Investors without preferred industries are not filtered by industry.
+        if params['preferred_industries']:
+            params['industry_ids'] = list(params.get('industry_ids', [])) + list(
+                InvestorPreferredIndustry.objects.filter(investor__user=request.user)
+                .values_list('industry_id', flat=True)
+            )
+
+        errors = []
+        for backend in get_search_backends():
+            try:
+                page = backend.search(params, self.paginator, request)
+            except SearchBackendUnavailable as e:
+                logger.warning(f"Search backend {backend.name} unavailable: {e}")
+                mark_unavailable(backend)
+                errors.append(f"{backend.name}: {e}")
+                continue
+            except APIException:
+                raise
+            except Exception as e:
+                logger.error(f"Search failed on {backend.name}: {e}")
+                return Response(
+                    {"error": "Search failed", "details": str(e)},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
 
-            # Apply status filter
-            if status_filter:
-                search = search.filter('term', status=status_filter.lower())
+            response = self.paginator.get_paginated_response(page.results)
+            if page.facets is not None:
+                response.data['facets'] = page.facets
+            return response
+
+        return Response(
+            {"error": "Search unavailable", "details": "; ".join(errors)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class ProjectSuggestView(APIView):
+    """
+    Type-ahead suggestions for projects and startups.
+
+    Both indices are queried through their completion fields in a single
+    multi-search request. Completion suggestions are served from an in-memory
+    FST, so unlike the fuzzy `multi_match` of the search endpoint they are
+    cheap enough to run on every keystroke.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def build_suggest(self, document, field, text, size):
+        return document.search() \
+            .source(document.SUGGEST_SOURCE_FIELDS) \
+            .suggest('suggestions', text, completion={'field': field, 'size': size, 'skip_duplicates': True}) \
+            .extra(size=0)
+
+    def get_options(self, response):
+        return response.suggest.suggestions[0].options
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Prefix typed by the user", type=openapi.TYPE_STRING,
+                              required=True),
+            openapi.Parameter('size', openapi.IN_QUERY, description="Maximum number of suggestions per type",
+                              type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: openapi.Response(description="Project and startup suggestions"),
+            400: openapi.Response(description="Invalid query parameters"),
+            500: openapi.Response(description="Suggest failed")
+        }
+    )
+    def get(self, request):
+        params = ProjectSuggestQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        text = params.validated_data['q']
+        size = params.validated_data['size']
+
+        try:
+            project_response, startup_response = MultiSearch() \
+                .add(self.build_suggest(ProjectDocument, 'title_suggest', text, size)) \
+                .add(self.build_suggest(StartupDocument, 'name_suggest', text, size)) \
+                .execute()
 
-            # Execute search and get ordered IDs
-            response = search.execute()
-            project_ids = [hit.meta.id for hit in response]
+            return Response({
+                'projects': [
+                    {
+                        'id': int(option._id),
+                        'title': option._source.title,
+                        'startup_name': option._source.startup_name,
+                    }
+                    for option in self.get_options(project_response)
+                ],
+                'startups': [
+                    {'id': int(option._id), 'company_name': option._source.company_name}
+                    for option in self.get_options(startup_response)
+                ],
+            }, status=status.HTTP_200_OK)
 
-            # Preserve Elasticsearch ordering using Case/When
-            preserved_order = Case(
-                *[When(id=id, then=pos) for pos, id in enumerate(project_ids)]
+        except Exception as e:
+            return Response(
+                {"error": "Suggest failed", "details": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-            # Get actual Django objects with proper ordering
-            queryset = Project.objects.filter(id__in=project_ids) \
-                .order_by(preserved_order) \
-                .select_related('startup')
 
-            # Paginate and serialize
-            paginated_queryset = self.paginate_queryset(queryset, request, view=self)
-            serializer = self.serializer_class(paginated_queryset, many=True)
+class ProjectRelatedView(APIView):
+    """
+    Projects similar to a given one.
 
-            return self.get_paginated_response(serializer.data)
+    Runs a `more_like_this` query over the title, description and industries
+    of the project's own document. Results are cached per project until its
+    document is reindexed (see `projects.tasks.flush_search_index`), or for
+    `PROJECT_RELATED_CACHE_TIMEOUT` seconds at most.
+    """
+    permission_classes = [IsAuthenticated]
 
+    def build_search(self, pk):
+        like = {'_index': ProjectDocument._index._name, '_id': str(pk)}
+        return ProjectDocument.search() \
+            .query(MoreLikeThis(
+                like=[like],
+                fields=['title', 'description', 'industries'],
+                min_term_freq=1,
+                min_doc_freq=1,
+            )) \
+            .source(ProjectDocument.SOURCE_FIELDS) \
+            .extra(size=getattr(settings, 'PROJECT_RELATED_SIZE', 10))
+
+    @swagger_auto_schema(
+        responses={
+            200: ProjectSearchHitSerializer(many=True),
+            404: openapi.Response(description="Project not found"),
+            500: openapi.Response(description="Related projects failed")
+        }
+    )
+    def get(self, request, pk):
+        cache_key = RELATED_CACHE_KEY.format(pk)
+        results = cache.get(cache_key)
+        if results is not None:
+            return Response(results, status=status.HTTP_200_OK)
+
+        get_object_or_404(Project, pk=pk)
+
+        try:
+            response = self.build_search(pk).execute()
         except Exception as e:
+            logger.error(f"Related projects search failed for project {pk}: {e}")
             return Response(
-                {"error": "Search failed", "details": str(e)},
+                {"error": "Related projects failed", "details": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+        hits = [{'id': int(hit.meta.id), **hit.to_dict(skip_empty=False)} for hit in response]
+        results = [dict(result) for result in ProjectSearchHitSerializer(hits, many=True).data]
+        cache.set(cache_key, results, getattr(settings, 'PROJECT_RELATED_CACHE_TIMEOUT', 60 * 60))
+        return Response(results, status=status.HTTP_200_OK)
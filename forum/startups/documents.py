@@ -0,0 +1,49 @@
+from django_elasticsearch_dsl import Document, fields
+from django_elasticsearch_dsl.registries import registry
+
+from .models import StartupProfile
+
+
+def completion_inputs(*values):
+    """
+    Build completion suggester inputs for the given phrases.
+
+    The completion suggester only matches from the start of an input, so every
+    word suffix of a phrase is indexed as well: "Green Energy Hub" can then be
+    suggested for "gre", "ene" and "hub" alike.
+    """
+    inputs = []
+    for value in values:
+        words = (value or '').split()
+        for position in range(len(words)):
+            suffix = ' '.join(words[position:])
+            if suffix not in inputs:
+                inputs.append(suffix)
+    return inputs
+
+
+@registry.register_document
+class StartupDocument(Document):
+    """
+    Elasticsearch document for startups, used for type-ahead suggestions.
+
+    Like `ProjectDocument`, it is kept in sync through the buffered bulk
+    indexer in `projects.indexing` rather than on every save.
+    """
+    id = fields.IntegerField(attr='id')
+    name_suggest = fields.CompletionField()
+
+    class Index:
+        name = 'startups'
+        settings = {'number_of_shards': 1, 'number_of_replicas': 0}
+
+    class Django:
+        model = StartupProfile
+        fields = ['company_name']
+        ignore_signals = True
+
+    # Fields returned in `_source` with every suggestion.
+    SUGGEST_SOURCE_FIELDS = ['company_name']
+
+    def prepare_name_suggest(self, instance):
+        return completion_inputs(instance.company_name)
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.19 on 2026-10-17 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartupNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='startups.startupprofile')),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='startups.startupprofile')),
+            ],
+            options={
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['startup', 'rank'], name='startup_neighbor_rank_idx')],
+                'unique_together': {('startup', 'neighbor')},
+            },
+        ),
+    ]
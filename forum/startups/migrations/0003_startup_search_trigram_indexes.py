@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Django runs `__icontains` as `UPPER(column::text) LIKE UPPER('%term%')` on
+# Postgres, so the trigram indexes are built on that same expression.
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS startups_startupprofile_company_name_trgm_idx
+    ON startups_startupprofile USING gin (UPPER(company_name::text) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS startups_startupprofile_description_trgm_idx
+    ON startups_startupprofile USING gin (UPPER(description::text) gin_trgm_ops)
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS startups_startupprofile_company_name_trgm_idx",
+    "DROP INDEX IF EXISTS startups_startupprofile_description_trgm_idx",
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+    """
+    Trigram indexes serving the substring searches of the saved startups
+    endpoint on Postgres. Other databases are left untouched.
+    """
+
+    dependencies = [
+        ('startups', '0002_startupneighbor'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'postgresql': POSTGRESQL_FORWARD}),
+            run({'postgresql': POSTGRESQL_BACKWARD}),
+        ),
+    ]
@@ -33,3 +33,24 @@ class StartupIndustry(models.Model):
 
     def __str__(self):
         return f"{self.startup.company_name} - {self.industry.name}"
+
+
+class StartupNeighbor(models.Model):
+    """
+    A startup often viewed or saved by the same investors as another one,
+    precomputed by `startups.neighbors.build_neighbors`.
+    """
+    startup = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name='neighbor_of')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ('startup', 'neighbor')
+        ordering = ['rank']
+        indexes = [
+            models.Index(fields=['startup', 'rank'], name='startup_neighbor_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.startup.company_name} - {self.neighbor.company_name} (#{self.rank})"
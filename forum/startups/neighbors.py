@@ -0,0 +1,137 @@
+import logging
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from scipy import sparse
+
+from investors.models import InvestorSavedStartup, ViewedStartup
+from .models import StartupNeighbor, StartupProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS = {'viewed': 1.0, 'saved': 2.0}
+
+
+def get_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'STARTUP_NEIGHBORS_WEIGHTS', {})}
+
+
+def iter_interactions(chunk_users):
+    """
+    Yield the views and saves of consecutive ranges of `chunk_users` user IDs,
+    as `(user ids, startup ids, weights)` arrays.
+
+    Every interaction of a user falls in the same chunk, so the chunks can be
+    turned into co-occurrences independently while only one is in memory.
+    """
+    weights = get_weights()
+    views = ViewedStartup.objects.aggregate(low=Min('user_id'), high=Max('user_id'))
+    saves = InvestorSavedStartup.objects.aggregate(low=Min('investor__user_id'), high=Max('investor__user_id'))
+    lows = [bound for bound in (views['low'], saves['low']) if bound is not None]
+    highs = [bound for bound in (views['high'], saves['high']) if bound is not None]
+    if not lows:
+        return
+
+    for start in range(min(lows), max(highs) + 1, chunk_users):
+        end = start + chunk_users
+        viewed = np.array(
+            list(
+                ViewedStartup.objects.filter(user_id__gte=start, user_id__lt=end)
+                .values_list('user_id', 'startup_id')
+            ),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        saved = np.array(
+            list(
+                InvestorSavedStartup.objects.filter(investor__user_id__gte=start, investor__user_id__lt=end)
+                .values_list('investor__user_id', 'startup_id')
+            ),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        if not len(viewed) and not len(saved):
+            continue
+
+        pairs = np.concatenate([viewed, saved])
+        values = np.concatenate([
+            np.full(len(viewed), weights['viewed']),
+            np.full(len(saved), weights['saved']),
+        ])
+        yield pairs[:, 0], pairs[:, 1], values
+
+
+def build_cooccurrence(interactions, size):
+    """
+    Sum the startup × startup co-occurrences of every chunk of interactions.
+
+    For a chunk, the user × startup matrix `A` holds the weight of each
+    interaction (a startup both viewed and saved adds both weights), and
+    `Aᵀ A` counts, for every pair of startups, the weighted interactions
+    of the users who touched both. `size` is one more than the highest
+    startup ID, startup IDs being used as matrix indexes.
+    """
+    cooccurrence = sparse.csr_matrix((size, size))
+    for users, startups, values in interactions:
+        rows = np.unique(users, return_inverse=True)[1]
+        matrix = sparse.csr_matrix((values, (rows, startups)), shape=(rows.max() + 1, size))
+        cooccurrence = cooccurrence + (matrix.T @ matrix).tocsr()
+    return cooccurrence
+
+
+def cosine(cooccurrence):
+    """
+    Turn co-occurrence counts into cosine similarities, so startups viewed by
+    everyone do not become the neighbors of every other startup, and drop
+    the self-similarities.
+    """
+    norms = np.sqrt(cooccurrence.diagonal())
+    norms[norms == 0] = 1
+    scaling = sparse.diags(1 / norms)
+    similarities = (scaling @ cooccurrence @ scaling).tocsr()
+    similarities = (similarities - sparse.diags(similarities.diagonal())).tocsr()
+    similarities.eliminate_zeros()
+    return similarities
+
+
+def build_neighbors():
+    """
+    Rebuild the `StartupNeighbor` table: the `STARTUP_NEIGHBORS_SIZE`
+    startups most often viewed or saved by the same users as each startup.
+
+    Interactions are streamed in chunks of `STARTUP_NEIGHBORS_CHUNK_USERS`
+    users and folded into a sparse co-occurrence matrix with vectorized
+    products, so memory is bounded by one chunk and the matrix itself rather
+    than by the number of views. Views and saves are weighted by
+    `STARTUP_NEIGHBORS_WEIGHTS`.
+
+    Returns:
+        int: The number of neighbors stored.
+    """
+    top_n = getattr(settings, 'STARTUP_NEIGHBORS_SIZE', 10)
+    chunk_users = getattr(settings, 'STARTUP_NEIGHBORS_CHUNK_USERS', 5000)
+
+    size = (StartupProfile.objects.aggregate(high=Max('pk'))['high'] or 0) + 1
+    similarities = cosine(build_cooccurrence(iter_interactions(chunk_users), size))
+
+    neighbors = []
+    for startup_id in np.flatnonzero(np.diff(similarities.indptr)).tolist():
+        start, end = similarities.indptr[startup_id], similarities.indptr[startup_id + 1]
+        values, columns = similarities.data[start:end], similarities.indices[start:end]
+        if len(values) > top_n:
+            keep = np.argpartition(-values, top_n - 1)[:top_n]
+            values, columns = values[keep], columns[keep]
+
+        # Most similar first, ties broken by startup ID.
+        order = np.lexsort((columns, -values))
+        neighbors += [
+            StartupNeighbor(startup_id=startup_id, neighbor_id=int(columns[i]), score=float(values[i]), rank=rank)
+            for rank, i in enumerate(order, start=1)
+        ]
+
+    with transaction.atomic():
+        StartupNeighbor.objects.all().delete()
+        StartupNeighbor.objects.bulk_create(neighbors, batch_size=1000)
+
+    logger.info(f"Stored {len(neighbors)} startup neighbors")
+    return len(neighbors)
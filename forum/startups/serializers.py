@@ -1,16 +1,17 @@
 from rest_framework import serializers
 
+from forum.serializers import DynamicFieldsMixin
 from users.serializers import UserSerializer
-from .models import Industry, StartupIndustry, StartupProfile
+from .models import Industry, StartupIndustry, StartupNeighbor, StartupProfile
 
 
-class IndustrySerializer(serializers.ModelSerializer):
+class IndustrySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Industry
         fields = ['id', 'name']
 
 
-class StartupProfileSerializer(serializers.ModelSerializer):
+class StartupProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     industries = IndustrySerializer(many=True, read_only=True)
 
@@ -30,6 +31,26 @@ class StartupProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class StartupSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Compact startup representation for lists that only need to name and link a startup.
+    """
+
+    class Meta:
+        model = StartupProfile
+        fields = ['id', 'company_name', 'website', 'startup_logo']
+        read_only_fields = fields
+
+
+class StartupNeighborSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    neighbor = StartupSummarySerializer(read_only=True)
+
+    class Meta:
+        model = StartupNeighbor
+        fields = ['neighbor', 'score', 'rank']
+        read_only_fields = fields
+
+
 class CreateStartupProfileSerializer(serializers.ModelSerializer):
     industries = serializers.PrimaryKeyRelatedField(
         many=True, queryset=Industry.objects.all()
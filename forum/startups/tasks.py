@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .neighbors import build_neighbors
+
+
+@shared_task
+def build_startup_neighbors():
+    """
+    Rebuilds the "investors who viewed this also viewed" neighbors of every
+    startup (see `startups.neighbors.build_neighbors`).
+    """
+    return build_neighbors()
@@ -1,8 +1,25 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
 
-from startups.models import Industry, StartupProfile
-from startups.views import StartupProfileDetailAPIView, StartupProfileListCreateAPIView
+from investors.models import ViewedStartup
+from investors.tasks import flush_viewed_startups
+from investors.viewing import SCHEDULED_FLUSH_KEY, get_view_buffer, record_view
+from investors.views import ClearViewedStartups, RecentlyViewedStartupsView
+from startups.models import Industry, StartupNeighbor, StartupProfile
+from startups.tasks import build_startup_neighbors
+from startups.views import (
+    StartupNeighborsAPIView,
+    StartupProfileDetailAPIView,
+    StartupProfileListCreateAPIView,
+)
 from users.models import User
 
 
@@ -97,6 +114,162 @@ class StartupProfileApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['company_name'], self.startup.company_name)
 
+    def test_startup_detail_buffers_investor_views(self):
+        """
+        Test: an investor viewing a startup writes nothing inline; the flush upserts one row per startup.
+        """
+        view = StartupProfileDetailAPIView.as_view()
+        investor = User.objects.create_user(
+            first_name="investor",
+            last_name="investor",
+            password="testpassword",
+            email="investor@example.com",
+            is_investor=True
+        )
+        get_view_buffer().drain()
+        cache.delete(SCHEDULED_FLUSH_KEY)
+
+        with patch('investors.tasks.flush_viewed_startups.apply_async') as apply_async, \
+                CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                request = self.factory.get(f'/api/startups/{self.startup.id}/')
+                force_authenticate(request, user=investor)
+                self.assertEqual(view(request, pk=self.startup.id).status_code, status.HTTP_200_OK)
+
+        self.assertTrue(all(query['sql'].lstrip().upper().startswith('SELECT') for query in queries))
+        apply_async.assert_called_once()
+        self.assertFalse(ViewedStartup.objects.exists())
+
+        self.assertEqual(flush_viewed_startups(), 1)
+        self.assertEqual(ViewedStartup.objects.get().startup, self.startup)
+
+        record_view(investor.pk, self.startup.pk)
+        with self.assertNumQueries(4):
+            self.assertEqual(flush_viewed_startups(), 1)
+        self.assertEqual(ViewedStartup.objects.count(), 1)
+
+    @override_settings(VIEWED_STARTUPS_HISTORY_SIZE=3)
+    def test_viewed_history_is_trimmed_and_paginated(self):
+        """
+        Test: the flush keeps the most recent views of each user and the history is paginated summaries.
+        """
+        investor = User.objects.create_user(
+            first_name="investor",
+            last_name="investor",
+            password="testpassword",
+            email="investor@example.com",
+            is_investor=True
+        )
+        startups = [
+            StartupProfile.objects.create(
+                user=User.objects.create_user(email=f"owner{i}@example.com", password="testpassword"),
+                company_name=f"Viewed Startup {i}",
+                contact_email=f"viewed{i}@example.com"
+            )
+            for i in range(5)
+        ]
+        get_view_buffer().drain()
+        now = timezone.now()
+        with patch('investors.tasks.flush_viewed_startups.apply_async'):
+            for i, startup in enumerate(startups):
+                record_view(investor.pk, startup.pk, now + timedelta(minutes=i))
+        flush_viewed_startups()
+
+        self.assertEqual(
+            list(ViewedStartup.objects.filter(user=investor).values_list('startup', flat=True)),
+            [startups[4].pk, startups[3].pk, startups[2].pk]
+        )
+
+        view = RecentlyViewedStartupsView.as_view()
+        request = self.factory.get('/api/investors/viewed-startups/', {'page_size': 2})
+        force_authenticate(request, user=investor)
+        response = view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'][0]['startup'],
+            {'id': startups[4].pk, 'company_name': "Viewed Startup 4", 'website': None, 'startup_logo': None}
+        )
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_clearing_history_drops_buffered_views(self):
+        """
+        Test: clearing the history leaves the buffer to the worker, which skips the views recorded before the clear.
+        """
+        investor = User.objects.create_user(
+            first_name="investor",
+            last_name="investor",
+            password="testpassword",
+            email="investor@example.com",
+            is_investor=True
+        )
+        other = User.objects.create_user(email="other@example.com", password="testpassword", is_investor=True)
+        get_view_buffer().drain()
+        now = timezone.now()
+        ViewedStartup.objects.create(user=investor, startup=self.startup)
+        with patch('investors.tasks.flush_viewed_startups.apply_async'):
+            record_view(investor.pk, self.startup.pk, now - timedelta(seconds=1))
+            record_view(other.pk, self.startup.pk, now - timedelta(seconds=1))
+
+        view = ClearViewedStartups.as_view()
+        request = self.factory.delete('/api/investors/viewed-startups/clear')
+        force_authenticate(request, user=investor)
+        with patch('investors.tasks.flush_viewed_startups.apply_async'):
+            self.assertEqual(view(request).status_code, status.HTTP_200_OK)
+
+        self.assertFalse(ViewedStartup.objects.exists())
+        self.assertEqual(len(get_view_buffer()), 2)
+
+        with patch('investors.tasks.flush_viewed_startups.apply_async'):
+            record_view(investor.pk, self.startup.pk, timezone.now() + timedelta(seconds=1))
+        self.assertEqual(flush_viewed_startups(), 2)
+        self.assertEqual(ViewedStartup.objects.filter(user=investor).count(), 1)
+        self.assertTrue(ViewedStartup.objects.filter(user=other).exists())
+
+    def test_also_viewed_neighbors_from_cooccurrences(self):
+        """
+        Test: the neighbors job ranks startups by co-occurring views, whatever the chunk size, and the endpoint reads them.
+        """
+        startups = [self.startup] + [
+            StartupProfile.objects.create(
+                user=User.objects.create_user(email=f"owner{i}@example.com", password="testpassword"),
+                company_name=f"Neighbor Startup {i}",
+                contact_email=f"neighbor{i}@example.com"
+            )
+            for i in range(2)
+        ]
+        viewers = [
+            User.objects.create_user(email=f"viewer{i}@example.com", password="testpassword", is_investor=True)
+            for i in range(3)
+        ]
+        for viewer, viewed in zip(viewers, [(0, 1), (0, 1, 2), (2,)]):
+            ViewedStartup.objects.bulk_create(ViewedStartup(user=viewer, startup=startups[i]) for i in viewed)
+
+        with override_settings(STARTUP_NEIGHBORS_CHUNK_USERS=1):
+            build_startup_neighbors()
+        chunked = list(StartupNeighbor.objects.order_by('startup', 'rank').values_list('startup', 'neighbor', 'score'))
+        build_startup_neighbors()
+        self.assertEqual(
+            list(StartupNeighbor.objects.order_by('startup', 'rank').values_list('startup', 'neighbor', 'score')),
+            chunked
+        )
+
+        view = StartupNeighborsAPIView.as_view()
+        request = self.factory.get(f'/api/startups/{self.startup.id}/also-viewed/')
+        force_authenticate(request, user=self.user)
+        with self.assertNumQueries(1):
+            response = view(request, pk=self.startup.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['neighbor']['id'] for item in response.data], [startups[1].pk, startups[2].pk])
+        self.assertAlmostEqual(response.data[0]['score'], 1.0)
+        self.assertAlmostEqual(response.data[1]['score'], 0.5)
+
+        request = self.factory.get('/api/startups/999999/also-viewed/')
+        force_authenticate(request, user=self.user)
+        self.assertEqual(view(request, pk=999999).status_code, status.HTTP_404_NOT_FOUND)
+
     def test_update_startup(self):
         """
         Test: update an existing startup.
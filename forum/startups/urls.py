@@ -1,8 +1,13 @@
 from django.urls import path
 
-from .views import StartupProfileDetailAPIView, StartupProfileListCreateAPIView
+from .views import (
+    StartupNeighborsAPIView,
+    StartupProfileDetailAPIView,
+    StartupProfileListCreateAPIView,
+)
 
 urlpatterns = [
     path('', StartupProfileListCreateAPIView.as_view(), name='startup-list-create'),
     path('<int:pk>/', StartupProfileDetailAPIView.as_view(), name='startup-detail'),
+    path('<int:pk>/also-viewed/', StartupNeighborsAPIView.as_view(), name='startup-neighbors'),
 ]
@@ -6,10 +6,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from forum.tasks import save_viewed_startup
-from investors.models import ViewedStartup
-from .models import StartupProfile
-from .serializers import CreateStartupProfileSerializer, StartupProfileSerializer
+from forum.serializers import EXPAND_PARAMETER, FIELDS_PARAMETER, optimize_queryset
+from investors.viewing import record_view
+from .models import StartupNeighbor, StartupProfile
+from .serializers import (
+    CreateStartupProfileSerializer,
+    StartupNeighborSerializer,
+    StartupProfileSerializer,
+)
 
 
 class StartupProfileListCreateAPIView(APIView):
@@ -26,6 +30,7 @@ class StartupProfileListCreateAPIView(APIView):
         operation_summary="Retrieve all startups",
         operation_description="Get a list of all startup profiles available in the system.",
         tags=["Startups"],
+        manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
         responses={200: StartupProfileSerializer(many=True)}
     )
     def get(self, request):
@@ -35,8 +40,9 @@ class StartupProfileListCreateAPIView(APIView):
         Responses:
             - 200 OK: Successfully returns a list of startup profiles.
         """
-        startups = StartupProfile.objects.all()
-        serializer = StartupProfileSerializer(startups, many=True)
+        context = {'request': request}
+        startups = optimize_queryset(StartupProfile.objects.all(), StartupProfileSerializer(many=True, context=context))
+        serializer = StartupProfileSerializer(startups, many=True, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -83,23 +89,25 @@ class StartupProfileDetailAPIView(APIView):
     - DELETE: Delete a specific startup profile.
     """
 
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         """
         Retrieve a startup profile by its ID.
 
         Args:
             - pk (int): The primary key of the startup profile.
+            - queryset (QuerySet): The queryset to look it up in, all startup profiles by default.
 
         Returns:
             - StartupProfile: The startup profile instance.
             - None: If the startup profile does not exist.
         """
-        return get_object_or_404(StartupProfile, pk=pk)
+        return get_object_or_404(StartupProfile if queryset is None else queryset, pk=pk)
 
     @swagger_auto_schema(
         operation_summary="Retrieve a specific startup",
         operation_description="Retrieve the details of a specific startup profile by its ID.",
         tags=["Startups"],
+        manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
         responses={
             200: StartupProfileSerializer,
             404: "Startup not found."
@@ -116,13 +124,16 @@ class StartupProfileDetailAPIView(APIView):
             - 200 OK: Successfully retrieves the startup profile details.
             - 404 Not Found: If the startup profile does not exist.
         """
-        startup = self.get_object(pk)
+        context = {'request': request}
+        queryset = optimize_queryset(StartupProfile.objects.all(), StartupProfileSerializer(context=context))
+        startup = self.get_object(pk, queryset)
         if startup is None:
             return Response({"error": "Startup not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        save_viewed_startup(request.user, startup)
+        if request.user.is_investor:
+            record_view(request.user.pk, startup.pk)
 
-        serializer = StartupProfileSerializer(startup)
+        serializer = StartupProfileSerializer(startup, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -159,3 +170,34 @@ class StartupProfileDetailAPIView(APIView):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class StartupNeighborsAPIView(APIView):
+    """
+    Startups often viewed or saved by the investors who viewed or saved a
+    given one, best first.
+
+    Neighbors are precomputed offline by the `build_startup_neighbors` task;
+    a request only reads them.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    @swagger_auto_schema(
+        operation_summary="Investors who viewed this startup also viewed",
+        tags=["Startups"],
+        manual_parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
+        responses={
+            200: StartupNeighborSerializer(many=True),
+            404: "Startup not found."
+        }
+    )
+    def get(self, request, pk):
+        context = {'request': request}
+        serializer = StartupNeighborSerializer(many=True, context=context)
+        neighbors = list(optimize_queryset(StartupNeighbor.objects.filter(startup_id=pk), serializer))
+
+        if not neighbors and not StartupProfile.objects.filter(pk=pk).exists():
+            return Response({"error": "Startup not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = StartupNeighborSerializer(neighbors, many=True, context=context)
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,112 @@
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+USER_CACHE_KEY = 'auth-user:{}'
+USER_VERSION_KEY = 'auth-user-version:{}'
+
+
+class LocalUserCache:
+    """
+    Process-local LRU cache of pickled users, whose entries expire after
+    `AUTH_USER_CACHE_TIMEOUT` seconds. At most `AUTH_USER_CACHE_SIZE` users
+    are kept; the least recently used ones are evicted first.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 5 * 60)
+        max_size = getattr(settings, 'AUTH_USER_CACHE_SIZE', 1000)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_users = LocalUserCache()
+
+
+def get_version(user_id):
+    """
+    Current cache version of a user, created on first use.
+
+    Versions live in the shared cache and are dropped when the user changes,
+    which turns the copies cached by every process into misses at once.
+    """
+    key = USER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 5 * 60))
+        version = cache.get(key)
+    return version
+
+
+def get_user(user_id, load):
+    """
+    Return the user `user_id`, calling `load()` to read it from the database
+    only when neither cache tier holds its current version.
+
+    Users are looked up in the process-local LRU cache first, then in the
+    shared cache (Redis when configured), and stored pickled so every caller
+    gets its own copy. Only the version lookup reaches the shared cache on
+    a local hit.
+
+    Without `AUTH_USER_CACHE_ENABLED` (no shared cache is configured) every
+    call loads the user.
+    """
+    if not getattr(settings, 'AUTH_USER_CACHE_ENABLED', False):
+        return load()
+
+    version = get_version(user_id)
+
+    entry = local_users.get(user_id)
+    if entry is None or entry[0] != version:
+        entry = cache.get(USER_CACHE_KEY.format(user_id))
+        if entry is None or entry[0] != version:
+            entry = (version, pickle.dumps(load()))
+            cache.set(USER_CACHE_KEY.format(user_id), entry, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 5 * 60))
+        local_users.set(user_id, entry)
+    return pickle.loads(entry[1])
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached copies of a user, right away and again once the
+    surrounding transaction commits, so a request reading the user in
+    between cannot cache the version being replaced.
+
+    Saves and deletes call it through signals; queryset `update()` and
+    `delete()` send none, so code changing users in bulk must call it itself.
+    """
+    keys = [USER_VERSION_KEY.format(user_id), USER_CACHE_KEY.format(user_id)]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,45 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.functional import SimpleLazyObject
+
+# Role profiles exposed on the request, by the reverse accessor they are read from.
+ROLE_PROFILES = {
+    'investor': 'investor_profile',
+    'startup': 'startup_profile',
+}
+
+
+def get_role_profile(user, accessor):
+    """
+    The profile of `user` behind the reverse one-to-one `accessor`, or None if
+    the user is anonymous or has no such profile.
+    """
+    if not user or not user.is_authenticated:
+        return None
+    try:
+        return getattr(user, accessor)
+    except ObjectDoesNotExist:
+        return None
+
+
+class RoleProfileMiddleware:
+    """
+    Expose the investor and startup profiles of the authenticated user as
+    `request.investor` and `request.startup`.
+
+    They are resolved on first access, from the user the view authenticated
+    (REST framework replaces `request.user` by the token's user), so unused
+    ones cost nothing. The JWT authentication class loads both profiles with
+    the user (see `users.utils.TokenAuthSupportCookie`), which then makes
+    them free. A missing profile is falsy: check with `if request.investor`,
+    not `is None`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for name, accessor in ROLE_PROFILES.items():
+            setattr(request, name, SimpleLazyObject(
+                lambda accessor=accessor: get_role_profile(request.user, accessor)
+            ))
+        return self.get_response(request)
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_user
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop the cached user when their roles, status or credentials may have changed.
+    """
+    invalidate_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender='investors.InvestorProfile')
+@receiver([post_save, post_delete], sender='startups.StartupProfile')
+def invalidate_cached_profile_owner(sender, instance, **kwargs):
+    # Cached users carry their role profiles (see users.utils.TokenAuthSupportCookie).
+    invalidate_user(instance.user_id)
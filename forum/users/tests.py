@@ -4,13 +4,18 @@ from unittest.mock import ANY, MagicMock, patch
 
 import jwt
 from django.db import DatabaseError
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import AccessToken
 
+from investors.models import InvestorProfile
+from users.cache import LocalUserCache
+from users.middleware import RoleProfileMiddleware
 from users.utils import (
+    TokenAuthSupportCookie,
     send_reset_password_email,
     send_verification_email,
     validate_password_policy,
@@ -252,6 +257,85 @@ class ResendVerificationEmailViewTests(APITestCase):
             self.assertEqual(response.status_code, status.HTTP_200_OK)
             self.assertEqual(response.data['message'], 'Email is already verified.')
 
+
+class RoleProfileTests(APITestCase):
+
+    def test_token_user_is_loaded_with_role_profiles(self):
+        """
+        Test: the token's user and their profiles are read in one query and exposed on the request.
+        """
+        user = User.objects.create_user(email='investor@example.com', password='SecurePassword123', is_investor=True)
+        investor = InvestorProfile.objects.create(
+            user=user,
+            company_name="Investor Company",
+            investment_focus="Technology",
+            contact_email="investor@example.com",
+            investment_range="100000-500000"
+        )
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        RoleProfileMiddleware(lambda request: None)(request)
+
+        with self.assertNumQueries(1):
+            request.user, _ = TokenAuthSupportCookie().authenticate(request)
+            self.assertEqual(request.investor, investor)
+            self.assertFalse(request.startup)
+
+    def test_token_user_is_not_cached_without_shared_cache(self):
+        """
+        Test: without a shared cache every authentication reads the user, so a deactivation applies at once.
+        """
+        user = User.objects.create_user(email='uncached@example.com', password='SecurePassword123', is_investor=True)
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        authentication = TokenAuthSupportCookie()
+
+        with override_settings(AUTH_USER_CACHE_ENABLED=False), self.assertNumQueries(1):
+            authentication.authenticate(request)
+
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        with override_settings(AUTH_USER_CACHE_ENABLED=False), self.assertRaises(AuthenticationFailed):
+            authentication.authenticate(request)
+
+    @override_settings(AUTH_USER_CACHE_ENABLED=True)
+    def test_token_user_is_cached_until_it_changes(self):
+        """
+        Test: authenticating a cached user costs no query, and changing the user's roles drops the cached copy.
+        """
+        user = User.objects.create_user(email='cached@example.com', password='SecurePassword123', is_investor=True)
+        token = AccessToken.for_user(user)
+        authentication = TokenAuthSupportCookie()
+
+        def authenticate():
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            return authentication.authenticate(request)[0]
+
+        with self.assertNumQueries(1):
+            authenticate()
+        with self.assertNumQueries(0):
+            cached = authenticate()
+        self.assertEqual(cached, user)
+        self.assertIsNot(cached, authenticate())
+
+        user.is_startup = True
+        user.save()
+        with self.assertNumQueries(1):
+            self.assertTrue(authenticate().is_startup)
+
+    @override_settings(AUTH_USER_CACHE_SIZE=2)
+    def test_local_user_cache_evicts_least_recently_used(self):
+        """
+        Test: the process-local user cache keeps its most recently used entries.
+        """
+        local = LocalUserCache()
+        local.set(1, 'first')
+        local.set(2, 'second')
+        local.get(1)
+        local.set(3, 'third')
+
+        self.assertEqual(len(local), 2)
+        self.assertIsNone(local.get(2))
+        self.assertEqual(local.get(1), 'first')
+
+
 class TestPasswordUtils(unittest.TestCase):
 
     @patch('users.utils.urlsafe_base64_encode')
@@ -7,11 +7,16 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
 from forum.tasks import send_email_task_no_ssl
+from .cache import get_user as get_cached_user
+from .middleware import ROLE_PROFILES
 
 logger = logging.getLogger(__name__)
 
@@ -107,4 +112,36 @@ class TokenAuthSupportCookie(JWTAuthentication):
             user = self.get_user(validated_token)
             return (user, validated_token)
 
-        return None
\ No newline at end of file
+        return None
+
+    def get_user(self, validated_token):
+        """
+        Load the token's user together with their investor and startup
+        profiles, in one joined query, so `request.investor` and
+        `request.startup` need no query of their own.
+
+        The user is cached (see `users.cache`), so authenticating a known
+        user costs no query at all until the user or their profiles change.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = get_cached_user(
+                user_id,
+                lambda: self.user_model.objects.select_related(*ROLE_PROFILES.values())
+                .get(**{api_settings.USER_ID_FIELD: user_id}),
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -18,6 +18,7 @@ from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from .cache import invalidate_user
 from .models import User
 from .serializers import (
     CustomRoleSerializer,
@@ -554,6 +555,7 @@ class LogoutView(APIView):
 
             token = RefreshToken(refresh_token)
             token.blacklist()
+            invalidate_user(request.user.pk)
 
             response = Response({"message": "User successfully logged out."}, status=status.HTTP_200_OK)
             response.delete_cookie('access_token')